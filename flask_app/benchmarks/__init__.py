@@ -0,0 +1,20 @@
+"""
+Benchmarks for the ordering system.
+
+Each module is runnable on its own, e.g. `python -m benchmarks.print_batching`
+from the flask_app directory, and never needs real printer hardware.
+"""
+import atexit
+import shutil
+import tempfile
+
+
+def setup_logging(level="WARNING"):
+    """
+    Console logging at `level` for a benchmark run. The log file goes to a
+    temp directory, so benchmark output never lands in the app's data/logs.
+    """
+    from utils.logging_config import setup_logging as setup_app_logging
+    log_dir = tempfile.mkdtemp(prefix="benchmark_logs_")
+    atexit.register(shutil.rmtree, log_dir, ignore_errors=True)
+    return setup_app_logging(level, log_dir)
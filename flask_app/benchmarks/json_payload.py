@@ -0,0 +1,139 @@
+"""
+Dashboard JSON payload benchmark
+
+Fills a temp DB with open orders and, for each JSON provider (stdlib,
+orjson if installed) and each serialization (full Order.to_dict, and
+?compact=1), reports for GET /orders/dashboard/food:
+
+- payload size, raw and gzipped
+- serialization time: Order.to_dict() for every order plus the provider's dumps()
+- request latency through the Flask test client (DB read included)
+
+as p50/p95/p99/max over --repeat runs.
+
+Usage:
+    python -m benchmarks.json_payload --open-orders 100,300,1000 --json payload.json
+"""
+import argparse
+import gzip
+import json
+import logging
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest.mock import patch
+
+from benchmarks.print_pipeline import make_order_factory, percentiles
+from config import Config
+from utils import json_provider
+
+logger = logging.getLogger("JsonPayloadBenchmark")
+
+
+def available_providers() -> List[str]:
+    return ["stdlib"] + (["orjson"] if json_provider.orjson is not None else [])
+
+
+def run(open_orders=(100, 300, 1000), providers=None, repeat: int = 20, max_items: int = 4,
+        seed: int = 1) -> List[Dict[str, Any]]:
+    providers = providers or available_providers()
+    workdir = Path(tempfile.mkdtemp(prefix="json_payload_"))
+    overrides = {
+        "DATABASE_PATH": str(workdir / "orders.db"),
+        "JOURNAL_DIR": str(workdir / "journal"),
+        "MOCK_PRINTER": True,
+        "PRINTER_STATIONS": None,
+        "METRICS_DIR": None,
+        "LOG_LEVEL": "WARNING",
+        "LOG_DIR": str(workdir / "logs"),
+    }
+    patches = [patch.object(Config, key, value) for key, value in overrides.items()]
+    for p in patches:
+        p.start()
+
+    app = None
+    results = []
+    try:
+        from main import create_app
+        app = create_app()
+        client = app.test_client()
+        order_logger = app.order_service.order_logger
+        make_order = make_order_factory("food", max_items, seed)
+
+        saved = 0
+        for count in sorted(open_orders):
+            # No stations: straight to the DB, nothing gets printed or closed
+            while saved < count:
+                order_logger.save_order(make_order(saved), stations=[])
+                saved += 1
+            orders = order_logger.get_unprocessed_orders("food")
+
+            for provider in providers:
+                json_provider.init_app(app, provider)
+                for compact in (False, True):
+                    url = "/orders/dashboard/food" + ("?compact=1" if compact else "")
+                    body = client.get(url).data
+
+                    serialize_times, request_times = [], []
+                    for _ in range(repeat):
+                        start = time.perf_counter()
+                        app.json.dumps({"orders": [order.to_dict(compact) for order in orders]})
+                        serialize_times.append(time.perf_counter() - start)
+
+                        start = time.perf_counter()
+                        client.get(url)
+                        request_times.append(time.perf_counter() - start)
+
+                    results.append({
+                        "open_orders": len(orders),
+                        "provider": provider,
+                        "compact": compact,
+                        "payload_bytes": len(body),
+                        "gzip_bytes": len(gzip.compress(body)),
+                        "serialize_ms": percentiles(serialize_times),
+                        "request_ms": percentiles(request_times),
+                    })
+        return results
+    finally:
+        if app is not None:
+            app.order_service.shutdown(timeout=1)
+        for p in reversed(patches):
+            p.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    from benchmarks import setup_logging
+    setup_logging("WARNING")
+    logger.setLevel(logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Dashboard payload size and JSON serialization time per provider")
+    parser.add_argument("--open-orders", type=str, default="100,300,1000", help="Comma-separated open order counts (default: 100,300,1000)")
+    parser.add_argument("--providers", type=str, default=None, help="Comma-separated providers (default: all installed)")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per measurement (default: 20)")
+    parser.add_argument("--max-items", type=int, default=4, help="Max distinct items per order (default: 4)")
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(
+        [int(n) for n in args.open_orders.split(",")],
+        args.providers.split(",") if args.providers else None,
+        args.repeat, args.max_items,
+    )
+    for r in results:
+        logger.info(
+            f"{r['open_orders']:>5} orders  {r['provider']:<6} {'compact' if r['compact'] else 'full':<7} "
+            f"{r['payload_bytes']:>8} B ({r['gzip_bytes']:>6} B gzip)  "
+            f"serialize p50={r['serialize_ms']['p50']} ms  request p50={r['request_ms']['p50']} ms"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
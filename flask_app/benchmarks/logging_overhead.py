@@ -0,0 +1,142 @@
+"""
+Logging overhead benchmark
+
+Times requests through the Flask test client (no network) with logging
+configured four ways:
+
+- off:        root level CRITICAL, nothing is formatted or written
+- sync:       handlers on the request thread (LOG_QUEUE_SIZE=0)
+- queue:      QueueHandler + background listener (the default)
+- queue_json: like queue, JSON lines
+
+For each variant it reports p50/p95/p99/max latency of POST /order (three
+INFO lines per order) and GET /orders/dashboard/food (one INFO line per
+poll). Printing is mocked, console output goes to /dev/null and the log
+file to a temp directory, so the numbers show what logging costs the
+request thread.
+
+Usage:
+    python -m benchmarks.logging_overhead --requests 500 --json logging.json
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import redirect_stderr
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest.mock import patch
+
+from benchmarks.print_pipeline import menu_items_by_type, percentiles
+from config import Config
+from utils.logging_config import setup_logging, stop_logging
+
+logger = logging.getLogger("LoggingOverheadBenchmark")
+
+VARIANTS = {
+    "off": {"log_level": "CRITICAL", "queue_size": 0, "json_format": False},
+    "sync": {"log_level": "INFO", "queue_size": 0, "json_format": False},
+    "queue": {"log_level": "INFO", "queue_size": 10000, "json_format": False},
+    "queue_json": {"log_level": "INFO", "queue_size": 10000, "json_format": True},
+}
+
+
+def run_variant(variant: str, requests: int = 500) -> Dict[str, Any]:
+    """Time `requests` orders and dashboard polls against a fresh app with logging set up as `variant`."""
+    settings = VARIANTS[variant]
+    workdir = Path(tempfile.mkdtemp(prefix="logging_overhead_"))
+    overrides = {
+        "DATABASE_PATH": str(workdir / "orders.db"),
+        "JOURNAL_DIR": str(workdir / "journal"),
+        "MOCK_PRINTER": True,
+        "PRINTER_STATIONS": None,
+        "METRICS_DIR": None,
+        # create_app() re-applies LOG_LEVEL to the already configured root logger
+        "LOG_LEVEL": settings["log_level"],
+    }
+    patches = [patch.object(Config, key, value) for key, value in overrides.items()]
+    for p in patches:
+        p.start()
+
+    item = menu_items_by_type()["food"][0]
+    body = {"table_number": 1, "items": [{**item, "quantity": 1}]}
+    app = None
+    try:
+        with open(os.devnull, "w") as devnull, redirect_stderr(devnull):
+            setup_logging(settings["log_level"], str(workdir / "logs"), settings["json_format"],
+                          settings["queue_size"], force=True)
+            from main import create_app
+            app = create_app()
+            client = app.test_client()
+
+            order_times: List[float] = []
+            poll_times: List[float] = []
+            start = time.perf_counter()
+            for _ in range(requests):
+                t0 = time.perf_counter()
+                response = client.post("/order", json=body)
+                order_times.append(time.perf_counter() - t0)
+                assert response.status_code == 200, response.get_data(as_text=True)
+
+                t0 = time.perf_counter()
+                client.get("/orders/dashboard/food")
+                poll_times.append(time.perf_counter() - t0)
+            elapsed = time.perf_counter() - start
+            stop_logging()  # flush the queue before counting what was written
+
+        log_file = workdir / "logs" / "app.log"
+        return {
+            "variant": variant,
+            **settings,
+            "requests": requests,
+            "requests_per_s": round(2 * requests / elapsed, 1),
+            "log_bytes": log_file.stat().st_size if log_file.exists() else 0,
+            "post_order_ms": percentiles(order_times),
+            "dashboard_poll_ms": percentiles(poll_times),
+        }
+    finally:
+        if app is not None:
+            app.order_service.shutdown(timeout=1)
+        for p in reversed(patches):
+            p.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run(requests: int = 500, variants=tuple(VARIANTS)) -> List[Dict[str, Any]]:
+    return [run_variant(variant, requests) for variant in variants]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Request latency with logging off, synchronous and queued")
+    parser.add_argument("--requests", type=int, default=500, help="Orders (and dashboard polls) per variant (default: 500)")
+    parser.add_argument("--variants", type=str, default=",".join(VARIANTS), help="Comma-separated variants (default: all)")
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(args.requests, [v.strip() for v in args.variants.split(",") if v.strip()])
+
+    # Each run reconfigures logging; report on a plain stdout handler instead
+    report = logging.StreamHandler(sys.stdout)
+    logger.addHandler(report)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    for result in results:
+        order, poll = result["post_order_ms"], result["dashboard_poll_ms"]
+        logger.info(
+            f"{result['variant']:<10} {result['requests_per_s']:>7} req/s  "
+            f"POST /order p50={order['p50']} p99={order['p99']}  "
+            f"dashboard p50={poll['p50']} p99={poll['p99']}  log {result['log_bytes']} B"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Offline sync benchmark
+
+Replays --orders orders (default 200) the way a tablet coming back online
+does, through the Flask test client against a temp DB with mock printers:
+
+- single: one POST /order (with Idempotency-Key) per order
+- batch:  POST /orders/batch with --batch-size orders per request
+
+and reports per variant the total time, the time per order and p50/p95/p99
+per request, plus the time spent in OrderLogger.save_order(s).
+
+Usage:
+    python -m benchmarks.order_batch --orders 200 --batch-size 20 --json batch.json
+"""
+import argparse
+import json
+import logging
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest.mock import patch
+
+from benchmarks.print_pipeline import make_order_factory, percentiles
+from config import Config
+from utils import metrics
+
+logger = logging.getLogger("OrderBatchBenchmark")
+
+
+def db_write_seconds() -> float:
+    """Time spent saving orders so far (not the print workers' bookkeeping)"""
+    return sum(total for (method,), (_, total, _) in metrics.DB_WRITE_SECONDS.samples().items()
+               if method in ("save_order", "save_orders"))
+
+
+def make_payloads(orders: int, max_items: int, seed: int) -> List[Dict[str, Any]]:
+    make_order = make_order_factory("mixed", max_items, seed)
+    payloads = []
+    for n in range(orders):
+        order = make_order(n)
+        payloads.append({"clientId": f"bench-{seed}-{n}", "tableNumber": order.table_number,
+                         "orderedItems": [{"id": item.id, "quantity": item.quantity} for item in order.items]})
+    return payloads
+
+
+def run_variant(name: str, payloads: List[Dict[str, Any]], batch_size: int) -> Dict[str, Any]:
+    workdir = Path(tempfile.mkdtemp(prefix="order_batch_"))
+    overrides = {
+        "DATABASE_PATH": str(workdir / "orders.db"),
+        "JOURNAL_DIR": str(workdir / "journal"),
+        "MOCK_PRINTER": True,
+        "PRINTER_STATIONS": None,
+        "METRICS_DIR": None,
+        "LOG_LEVEL": "WARNING",
+        "LOG_DIR": str(workdir / "logs"),
+        "ORDER_BATCH_MAX_SIZE": max(batch_size, Config.ORDER_BATCH_MAX_SIZE),
+    }
+    patches = [patch.object(Config, key, value) for key, value in overrides.items()]
+    for p in patches:
+        p.start()
+
+    app = None
+    try:
+        from main import create_app
+        app = create_app()
+        client = app.test_client()
+        db_before = db_write_seconds()
+
+        request_times = []
+        start = time.perf_counter()
+        if name == "single":
+            for payload in payloads:
+                body = {key: value for key, value in payload.items() if key != "clientId"}
+                t0 = time.perf_counter()
+                response = client.post("/order", json=body, headers={"Idempotency-Key": payload["clientId"]})
+                request_times.append(time.perf_counter() - t0)
+                assert response.status_code == 200, response.get_data(as_text=True)
+        else:
+            for offset in range(0, len(payloads), batch_size):
+                t0 = time.perf_counter()
+                response = client.post("/orders/batch", json={"orders": payloads[offset:offset + batch_size]})
+                request_times.append(time.perf_counter() - t0)
+                assert response.status_code == 200, response.get_data(as_text=True)
+        total = time.perf_counter() - start
+
+        return {
+            "variant": name,
+            "orders": len(payloads),
+            "batch_size": 1 if name == "single" else batch_size,
+            "requests": len(request_times),
+            "total_ms": round(total * 1000, 1),
+            "per_order_ms": round(total * 1000 / len(payloads), 3),
+            "request_ms": percentiles(request_times),
+            "db_write_ms": round((db_write_seconds() - db_before) * 1000, 1),
+        }
+    finally:
+        if app is not None:
+            app.order_service.shutdown(timeout=1)
+        for p in reversed(patches):
+            p.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run(orders: int = 200, batch_size: int = 20, max_items: int = 4, seed: int = 1) -> List[Dict[str, Any]]:
+    payloads = make_payloads(orders, max_items, seed)
+    return [run_variant(name, payloads, batch_size) for name in ("single", "batch")]
+
+
+def main():
+    from benchmarks import setup_logging
+    setup_logging("WARNING")
+    logger.setLevel(logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Syncing offline orders one POST /order at a time vs. POST /orders/batch")
+    parser.add_argument("--orders", type=int, default=200, help="Orders to sync (default: 200)")
+    parser.add_argument("--batch-size", type=int, default=20, help="Orders per batch request (default: 20)")
+    parser.add_argument("--max-items", type=int, default=4, help="Max distinct items per order (default: 4)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the order generator")
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(args.orders, args.batch_size, args.max_items, args.seed)
+    for r in results:
+        logger.info(
+            f"{r['variant']:<6} {r['orders']} orders in {r['requests']} request(s): {r['total_ms']} ms "
+            f"({r['per_order_ms']} ms/order, saving {r['db_write_ms']} ms)  "
+            f"request p50={r['request_ms']['p50']} ms p95={r['request_ms']['p95']} ms"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
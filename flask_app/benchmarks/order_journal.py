@@ -0,0 +1,136 @@
+"""
+Order journal benchmark
+
+Writes --orders orders (default 2000) from 1, 8 and 32 concurrent request
+threads to each fallback store, as process_order does when SQLite fails:
+
+- csv:                the previous fallback, a copy of save_order_csv (file
+                      reopened per order, no fsync, so not crash-safe)
+- journal_fsync_each: OrderJournal with JOURNAL_MAX_BATCH=1 (one fsync per order)
+- journal:            OrderJournal with group commit (default batch)
+
+and reports per variant and thread count the throughput, p50/p95/p99 per
+order and the number of fsyncs.
+
+Usage:
+    python -m benchmarks.order_journal --orders 2000 --threads 1,8,32 --json journal.json
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest.mock import patch
+
+from benchmarks.print_pipeline import make_order_factory, percentiles
+from services import order_journal
+from services.order_journal import OrderJournal
+
+logger = logging.getLogger("OrderJournalBenchmark")
+
+VARIANTS = ("csv", "journal_fsync_each", "journal")
+
+
+def save_order_csv(filename, data, user_type):
+    """The CSV fallback before the journal"""
+    write_header = not os.path.exists(filename)
+    with open(filename, mode='a', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        if write_header:
+            writer.writerow(['timestamp', 'table_number', 'user_agent', 'items', 'comment'])
+        writer.writerow([datetime.now().isoformat(), data.get('tableNumber', ''), user_type or '',
+                         json.dumps(data.get('orderedItems', [])), data.get('comment', '')])
+
+
+def run_variant(name: str, orders: List[Dict[str, Any]], threads: int, workdir: Path) -> Dict[str, Any]:
+    directory = workdir / f"{name}-{threads}"
+    directory.mkdir(parents=True)
+    journal = None
+    if name == "csv":
+        def write(order):
+            save_order_csv(str(directory / "data.csv"), order, "bench")
+    else:
+        journal = OrderJournal(directory, max_batch=1 if name == "journal_fsync_each" else 256)
+
+        def write(order):
+            journal.append({"order": order, "user_agent": "bench", "stations": ["food", "drinks"],
+                            "idempotency_key": None, "request_hash": None})
+
+    fsyncs = [0]
+    real_fsync = os.fsync
+
+    def counting_fsync(fd):
+        fsyncs[0] += 1
+        real_fsync(fd)
+
+    def timed(order):
+        start = time.perf_counter()
+        write(order)
+        return time.perf_counter() - start
+
+    with patch.object(order_journal.os, "fsync", side_effect=counting_fsync):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            latencies = list(pool.map(timed, orders))
+        total = time.perf_counter() - start
+        if journal is not None:
+            journal.close()
+
+    return {
+        "variant": name,
+        "threads": threads,
+        "orders": len(orders),
+        "orders_per_second": round(len(orders) / total),
+        "latency_ms": percentiles(latencies),
+        "fsyncs": fsyncs[0],
+    }
+
+
+def run(orders: int = 2000, threads=(1, 8, 32), variants=VARIANTS, max_items: int = 4, seed: int = 1,
+        workdir=None) -> List[Dict[str, Any]]:
+    make_order = make_order_factory("mixed", max_items, seed)
+    payloads = [make_order(n).to_dict() for n in range(orders)]
+    own_workdir = workdir is None
+    workdir = Path(tempfile.mkdtemp(prefix="order_journal_") if own_workdir else workdir)
+    try:
+        return [run_variant(name, payloads, count, workdir) for count in threads for name in variants]
+    finally:
+        if own_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    from benchmarks import setup_logging
+    setup_logging("WARNING")
+    logger.setLevel(logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Throughput and latency of the order fallback stores")
+    parser.add_argument("--orders", type=int, default=2000, help="Orders per run (default: 2000)")
+    parser.add_argument("--threads", type=str, default="1,8,32", help="Comma-separated writer thread counts (default: 1,8,32)")
+    parser.add_argument("--max-items", type=int, default=4, help="Max distinct items per order (default: 4)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the order generator")
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(args.orders, [int(n) for n in args.threads.split(",")], max_items=args.max_items, seed=args.seed)
+    for r in results:
+        logger.info(
+            f"{r['variant']:<18} {r['threads']:>3} thread(s)  {r['orders_per_second']:>7} orders/s  "
+            f"p50={r['latency_ms']['p50']} ms p99={r['latency_ms']['p99']} ms  fsyncs={r['fsyncs']}"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Order model benchmark
+
+Builds and serializes --orders orders (default 10000) with the slotted
+models.Order/OrderItem and with a copy of the previous plain-dataclass
+models (no slots, aggregates recomputed on every access), and reports
+per variant:
+
+- memory held by the built orders (tracemalloc)
+- build time from request-style dicts (Order.from_dict)
+- build time from DB rows (Order.from_row, before: from_dict on row dicts)
+- aggregate access as the print and dashboard paths do it (total 3x,
+  food/drink items 2x each)
+- serialization with to_dict()
+
+Usage:
+    python -m benchmarks.order_models --orders 10000 --json models.json
+"""
+import argparse
+import gc
+import json
+import logging
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.print_pipeline import menu_items_by_type
+from models import Order
+
+logger = logging.getLogger("OrderModelsBenchmark")
+
+
+@dataclass
+class DataclassOrderItem:
+    """OrderItem before slots"""
+    name: str
+    price: float
+    quantity: int = 1
+    type: str = "food"
+    id: Optional[int] = None
+
+    def __post_init__(self):
+        self.price = float(self.price)
+        self.quantity = int(self.quantity)
+
+    @property
+    def total_price(self) -> float:
+        return round(self.price * self.quantity, 2)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "name": self.name, "price": self.price, "quantity": self.quantity,
+                "type": self.type, "total_price": self.total_price}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(id=data.get("id"), name=data.get("name", ""), price=float(data.get("price", 0.0)),
+                   quantity=int(data.get("quantity", 1)), type=data.get("type", "food"))
+
+
+@dataclass
+class DataclassOrder:
+    """Order before slots and cached aggregates"""
+    table_number: int
+    items: List[DataclassOrderItem] = field(default_factory=list)
+    comment: str = ""
+    timestamp: Optional[int] = None
+    id: Optional[int] = None
+    status: str = "pending"
+    food_processed: bool = False
+    drink_processed: bool = False
+    created_at: Optional[str] = None
+    user_agent: Optional[str] = None
+    rush: bool = False
+
+    def __post_init__(self):
+        self.table_number = int(self.table_number)
+        self.items = [item if isinstance(item, DataclassOrderItem) else DataclassOrderItem.from_dict(item)
+                      for item in self.items]
+        if self.timestamp is None:
+            self.timestamp = int(datetime.now().timestamp())
+
+    @property
+    def total_price(self) -> float:
+        return round(sum(item.total_price for item in self.items), 2)
+
+    @property
+    def food_items(self):
+        return [item for item in self.items if item.type == "food"]
+
+    @property
+    def drink_items(self):
+        return [item for item in self.items if item.type == "drink"]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id, "order_id": self.id, "tableNumber": str(self.table_number),
+            "table_number": self.table_number,
+            "orderedItems": [item.to_dict() for item in self.items],
+            "items": [item.to_dict() for item in self.items],
+            "comment": self.comment, "timestamp": self.timestamp,
+            "totalCost": self.total_price, "total_price": self.total_price,
+            "status": self.status, "food_processed": self.food_processed,
+            "drink_processed": self.drink_processed, "created_at": self.created_at,
+            "user_agent": self.user_agent, "rush": self.rush,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            id=data.get("id") or data.get("order_id"),
+            table_number=data.get("tableNumber") or data.get("table_number") or 0,
+            items=[DataclassOrderItem.from_dict(item) for item in data.get("orderedItems") or data.get("items") or []],
+            comment=data.get("comment", ""), timestamp=data.get("timestamp"),
+            status=data.get("status", "pending"),
+            food_processed=bool(data.get("food_processed", False)),
+            drink_processed=bool(data.get("drink_processed", False)),
+            created_at=data.get("created_at"), user_agent=data.get("user_agent"),
+            rush=bool(data.get("rush", False)),
+        )
+
+
+def make_rows(count: int, max_items: int, seed: int):
+    """Request-style dicts plus the `orders`/`order_items` rows the DB would return for them"""
+    rng = random.Random(seed)
+    by_type = menu_items_by_type()
+    pool = by_type["food"] + by_type["drink"]
+    requests, order_rows, item_rows = [], [], []
+    for order_id in range(1, count + 1):
+        chosen = rng.sample(pool, k=rng.randint(1, max_items))
+        items = [{"id": m["id"], "name": m["name"], "price": m["price"], "type": m["type"],
+                  "quantity": rng.randint(1, 3)} for m in chosen]
+        requests.append({"tableNumber": order_id % 30 + 1, "orderedItems": items, "comment": ""})
+        order_rows.append({"id": order_id, "table_number": order_id % 30 + 1, "comment": "", "timestamp": 1700000000,
+                           "status": "printed", "food_processed": 0, "drink_processed": 0,
+                           "created_at": "2026-05-01 12:00:00", "user_agent": None, "rush": 0})
+        item_rows.append([{"item_id": i["id"], "item_name": i["name"], "price": float(i["price"]),
+                           "quantity": i["quantity"], "item_type": i["type"]} for i in items])
+    return requests, order_rows, item_rows
+
+
+def _seconds(fn: Callable[[], Any]):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def _held_bytes(build: Callable[[], List[Any]]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        orders = build()
+        held = tracemalloc.get_traced_memory()[0] - before
+        del orders
+        return held
+    finally:
+        tracemalloc.stop()
+
+
+def run_variant(name: str, requests, order_rows, item_rows) -> Dict[str, Any]:
+    if name == "slots":
+        from_dict = Order.from_dict
+
+        def from_rows():
+            return [Order.from_row(row, items) for row, items in zip(order_rows, item_rows)]
+    else:
+        from_dict = DataclassOrder.from_dict
+
+        def from_rows():
+            # The old OrderLogger._row_to_order: rows renamed into a dict, then from_dict()
+            return [DataclassOrder.from_dict({**row, "orderedItems": [
+                {"id": r["item_id"], "name": r["item_name"], "type": r["item_type"], "price": r["price"],
+                 "quantity": r["quantity"]} for r in items]}) for row, items in zip(order_rows, item_rows)]
+
+    def build_from_dicts():
+        return [from_dict(data) for data in requests]
+
+    held = _held_bytes(from_rows)
+    dict_seconds, _ = _seconds(build_from_dicts)
+    row_seconds, orders = _seconds(from_rows)
+
+    def aggregates():
+        for order in orders:
+            order.total_price, order.total_price, order.total_price
+            order.food_items, order.drink_items, order.food_items, order.drink_items
+
+    aggregate_seconds, _ = _seconds(aggregates)
+    serialize_seconds, _ = _seconds(lambda: [order.to_dict() for order in orders])
+    count = len(orders)
+    return {
+        "variant": name,
+        "orders": count,
+        "bytes_per_order": round(held / count),
+        "held_mb": round(held / 1e6, 2),
+        "from_dict_ms": round(dict_seconds * 1000, 1),
+        "from_rows_ms": round(row_seconds * 1000, 1),
+        "aggregates_ms": round(aggregate_seconds * 1000, 1),
+        "to_dict_ms": round(serialize_seconds * 1000, 1),
+    }
+
+
+def run(orders: int = 10000, max_items: int = 4, seed: int = 1) -> List[Dict[str, Any]]:
+    requests, order_rows, item_rows = make_rows(orders, max_items, seed)
+    return [run_variant(name, requests, order_rows, item_rows) for name in ("dataclass", "slots")]
+
+
+def main():
+    from benchmarks import setup_logging
+    setup_logging("WARNING")
+    logger.setLevel(logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Memory and time of building and serializing orders, slotted vs. plain dataclass models")
+    parser.add_argument("--orders", type=int, default=10000, help="Orders to build (default: 10000)")
+    parser.add_argument("--max-items", type=int, default=4, help="Max distinct items per order (default: 4)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the order generator")
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(args.orders, args.max_items, args.seed)
+    for r in results:
+        logger.info(
+            f"{r['variant']:<9} {r['bytes_per_order']:>5} B/order ({r['held_mb']} MB)  "
+            f"from_dict {r['from_dict_ms']} ms  from rows {r['from_rows_ms']} ms  "
+            f"aggregates {r['aggregates_ms']} ms  to_dict {r['to_dict_ms']} ms"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Order validation microbenchmark
+
+Measures what MenuCatalog.price_order() (menu lookup, quantity checks,
+repricing of every item) adds to each incoming order. For comparison it
+times the same check done as a linear scan over the menu lists, which is
+what validating without the id index would cost.
+
+Orders are random picks from menu.json with 1..--max-items distinct items,
+as in benchmarks.print_pipeline.
+
+Usage:
+    python -m benchmarks.order_validation --orders 10000 --max-items 8 --json validation.json
+"""
+import argparse
+import json
+import logging
+import time
+from typing import Any, Dict, List
+
+from benchmarks.print_pipeline import make_order_factory
+from services.menu_catalog import InvalidOrderError, MenuCatalog
+from utils.file_utils import load_menu
+
+logger = logging.getLogger("OrderValidationBenchmark")
+
+
+def scan_price_order(menu: Dict[str, List[Dict[str, Any]]], order):
+    """Baseline: find each item by walking the menu"""
+    for item in order.items:
+        for items in menu.values():
+            entry = next((candidate for candidate in items if candidate.get("id") == item.id), None)
+            if entry is not None:
+                break
+        else:
+            raise InvalidOrderError(f"Unknown menu item id {item.id!r}")
+        item.name, item.price, item.type = entry["name"], float(entry["price"]), entry.get("type", "food")
+    return order
+
+
+def _time_per_order(check, orders, rounds: int) -> float:
+    """Best-of-`rounds` seconds per order"""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for order in orders:
+            check(order)
+        best = min(best, (time.perf_counter() - start) / len(orders))
+    return best
+
+
+def run(orders: int = 10000, max_items: int = 4, rounds: int = 5, seed: int = 1) -> Dict[str, Any]:
+    menu = load_menu()
+    catalog = MenuCatalog(menu)
+    make_order = make_order_factory("mixed", max_items, seed)
+    batch = [make_order(sequence) for sequence in range(orders)]
+    items = sum(len(order.items) for order in batch)
+
+    # Repricing is idempotent, so the same orders can go through every round
+    indexed = _time_per_order(catalog.price_order, batch, rounds)
+    scanned = _time_per_order(lambda order: scan_price_order(menu, order), batch, rounds)
+    return {
+        "config": {"orders": orders, "max_items": max_items, "rounds": rounds, "seed": seed,
+                   "menu_items": len(catalog.index)},
+        "items_per_order": round(items / orders, 2),
+        "indexed_us_per_order": round(indexed * 1e6, 2),
+        "indexed_ns_per_item": round(indexed * orders / items * 1e9, 1),
+        "scan_us_per_order": round(scanned * 1e6, 2),
+        "scan_ns_per_item": round(scanned * orders / items * 1e9, 1),
+    }
+
+
+def main():
+    from benchmarks import setup_logging
+    setup_logging("WARNING")
+    logger.setLevel(logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Cost of validating and pricing an order against the menu")
+    parser.add_argument("--orders", type=int, default=10000, help="Orders per round (default: 10000)")
+    parser.add_argument("--max-items", type=int, default=4, help="Max distinct items per order (default: 4)")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds, the best one counts (default: 5)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the order generator")
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    result = run(args.orders, args.max_items, args.rounds, args.seed)
+    logger.info(
+        f"{result['items_per_order']} items/order: catalog {result['indexed_us_per_order']} µs/order "
+        f"({result['indexed_ns_per_item']} ns/item), menu scan {result['scan_us_per_order']} µs/order "
+        f"({result['scan_ns_per_item']} ns/item)"
+    )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        logger.info(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Print batching benchmark
+
+Measures tickets/second through PrinterService.print_orders for several
+batch sizes against the ESC/POS printer emulator. Like a TM-T20II on the
+network it serves one connection at a time, and it is given a fixed setup
+time per connection (including availability probes), so the cost of opening
+a session per ticket shows up the same way it does on paper.
+
+Usage:
+    python -m benchmarks.print_batching --orders 200 --batch-sizes 1,5,10,20
+"""
+import argparse
+import json
+import logging
+import time
+from typing import Any, Dict, List
+
+from models import Order, OrderItem
+from services.printer_service import PrinterService
+from utils.printer_emulator import EscPosEmulator
+
+logger = logging.getLogger("PrintBatchingBenchmark")
+
+def make_orders(count: int) -> List[Order]:
+    """Orders with one food and one drink item, i.e. one ticket per printer"""
+    return [
+        Order(
+            id=i + 1,
+            table_number=i % 20 + 1,
+            items=[
+                OrderItem(name="Keule Pommes", price=10.5, quantity=1, type="food", id=61),
+                OrderItem(name="Pils", price=3.5, quantity=2, type="drink", id=1),
+            ],
+        )
+        for i in range(count)
+    ]
+
+
+def run_batch_size(batch_size: int, orders: List[Order], session_overhead: float) -> Dict[str, Any]:
+    """Print all orders in chunks of batch_size, probing once per chunk like the worker does"""
+    food_printer = EscPosEmulator(port=0, connect_latency=session_overhead, name="food").start()
+    drinks_printer = EscPosEmulator(port=0, connect_latency=session_overhead, name="drinks").start()
+    service = PrinterService({
+        "mock": False,
+        "ip_food": food_printer.address,
+        "ip_drinks": drinks_printer.address,
+        "logo_path": None,
+    })
+    try:
+        start = time.perf_counter()
+        for offset in range(0, len(orders), batch_size):
+            chunk = orders[offset:offset + batch_size]
+            service.are_printers_available()
+            service.print_orders(chunk)
+        # Throughput counts tickets on paper, not tickets handed to the socket
+        food_printer.wait_for_tickets(len(orders), timeout=60)
+        drinks_printer.wait_for_tickets(len(orders), timeout=60)
+        elapsed = time.perf_counter() - start
+    finally:
+        food_printer.stop()
+        drinks_printer.stop()
+
+    tickets = len(food_printer.tickets) + len(drinks_printer.tickets)
+    return {
+        "batch_size": batch_size,
+        "orders": len(orders),
+        "tickets": tickets,
+        "elapsed_s": round(elapsed, 3),
+        "tickets_per_s": round(tickets / elapsed, 1) if elapsed else None,
+    }
+
+
+def run(order_count: int = 200, batch_sizes=(1, 2, 5, 10, 20), session_overhead: float = 0.02) -> List[Dict[str, Any]]:
+    orders = make_orders(order_count)
+    return [run_batch_size(size, orders, session_overhead) for size in batch_sizes]
+
+
+def main():
+    from benchmarks import setup_logging
+    # python-escpos logs every connect/close at INFO on the root logger
+    setup_logging("WARNING")
+    logger.setLevel(logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Tickets/second vs. print batch size against the ESC/POS printer emulator")
+    parser.add_argument("--orders", type=int, default=200, help="Orders per run; each yields a food and a drink ticket (default: 200)")
+    parser.add_argument("--batch-sizes", type=str, default="1,2,5,10,20", help="Comma-separated batch sizes (default: 1,2,5,10,20)")
+    parser.add_argument("--session-overhead", type=float, default=0.02, help="Printer setup time per connection in seconds (default: 0.02)")
+    parser.add_argument("--json", type=str, default=None, help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",")]
+    results = run(args.orders, batch_sizes, args.session_overhead)
+
+    for result in results:
+        logger.info(
+            f"batch_size={result['batch_size']:>3}  tickets={result['tickets']:>5}  "
+            f"elapsed={result['elapsed_s']:>7.3f}s  tickets/s={result['tickets_per_s']:>8}"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"session_overhead_s": args.session_overhead, "results": results}, f, indent=2)
+        logger.info(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Print dispatcher benchmark
+
+Compares the two PRINT_DISPATCHER modes end to end (OrderService ->
+station queues -> printers) with 2, 8 and 32 emulated printer stations:
+
+- threads: one blocking python-escpos worker thread per station
+- asyncio: every station driven from one event-loop thread
+
+Menu items are spread round-robin over the stations, so every order fans
+out into several station tickets. Reports tickets/s, order-to-paper latency
+(p50/p95/p99/max) and how many threads OrderService started (print
+workers or dispatcher, plus the leader-election thread).
+
+Usage:
+    python -m benchmarks.print_dispatch --printers 2,8,32 --orders 200 --json dispatch.json
+"""
+import argparse
+import json
+import logging
+import random
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest.mock import patch
+
+from benchmarks.print_pipeline import percentiles
+from config import Config
+from models import Order, OrderItem
+from utils.file_utils import load_menu
+from utils.printer_emulator import EscPosEmulator
+
+logger = logging.getLogger("PrintDispatchBenchmark")
+
+MODES = ("threads", "asyncio")
+
+
+def run(mode: str, printers: int, orders: int = 200, rate: float = 50.0, items_per_order: int = 4,
+        connect_latency: float = 0.01, print_latency: float = 0.02, timeout: float = 120.0,
+        seed: int = 1) -> Dict[str, Any]:
+    """Run one dispatcher mode against `printers` emulated stations on a fresh DB."""
+    menu_items = [item for items in load_menu().values() for item in items]
+    workdir = Path(tempfile.mkdtemp(prefix="print_dispatch_"))
+    emulators = [
+        EscPosEmulator(port=0, connect_latency=connect_latency, print_latency=print_latency, name=f"station_{i}").start()
+        for i in range(printers)
+    ]
+    stations = {
+        emulator.name: {"ip": emulator.address, "items": [item["id"] for item in menu_items[i::printers]]}
+        for i, emulator in enumerate(emulators)
+    }
+
+    overrides = {
+        "DATABASE_PATH": str(workdir / "orders.db"),
+        "JOURNAL_DIR": str(workdir / "journal"),
+        "MOCK_PRINTER": False,
+        "PRINTER_STATIONS": stations,
+        "PRINT_DISPATCHER": mode,
+        "PRINTER_HEALTH_INTERVAL_SECONDS": 0,
+        "PRINT_RETRY_DELAY_SECONDS": 0.5,
+    }
+    patches = [patch.object(Config, key, value) for key, value in overrides.items()]
+    for p in patches:
+        p.start()
+
+    service = None
+    try:
+        from services.order_service import OrderService
+        threads_before = threading.active_count()
+        service = OrderService()
+        print_threads = threading.active_count() - threads_before
+
+        rng = random.Random(seed)
+        submitted: Dict[int, float] = {}
+        expected = 0
+        start = time.time()
+        for sequence in range(orders):
+            delay = start + sequence / rate - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            chosen = rng.sample(menu_items, k=min(items_per_order, len(menu_items)))
+            order = Order(
+                table_number=sequence % 30 + 1,
+                items=[OrderItem(id=item["id"], name=item["name"], price=item["price"],
+                                 type=item.get("type", "food")) for item in chosen],
+            )
+            expected += len(service.printer_service.route(order))
+            submitted_at = time.time()
+            submitted[service.process_order(order)] = submitted_at
+
+        # Stations finish independently, so wait on the total
+        deadline = start + timeout
+        while time.time() < deadline and sum(len(e.tickets) for e in emulators) < expected:
+            time.sleep(0.02)
+        tickets = sum(len(e.tickets) for e in emulators)
+        complete = tickets >= expected
+
+        printed_at: Dict[int, float] = {}
+        for emulator in emulators:
+            for ticket in emulator.tickets:
+                if ticket.order_id in submitted:
+                    printed_at[ticket.order_id] = max(printed_at.get(ticket.order_id, 0.0), ticket.received_at)
+        last_ticket = max(printed_at.values(), default=start)
+
+        return {
+            "mode": mode,
+            "printers": printers,
+            "orders": orders,
+            "rate": rate,
+            "complete": complete,
+            "tickets_expected": expected,
+            "tickets_printed": tickets,
+            "print_threads": print_threads,
+            "tickets_per_s": round(tickets / (last_ticket - start), 1) if last_ticket > start else None,
+            "order_to_paper_ms": percentiles([printed_at[i] - s for i, s in submitted.items() if i in printed_at]),
+        }
+    finally:
+        # Stop the print workers, dispatcher, journal and lease before the printers go away
+        if service is not None:
+            service.shutdown(timeout=1.0)
+        for p in reversed(patches):
+            p.stop()
+        for emulator in emulators:
+            emulator.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run_all(printer_counts: List[int], modes=MODES, **kwargs) -> List[Dict[str, Any]]:
+    results = []
+    for printers in printer_counts:
+        for mode in modes:
+            result = run(mode, printers, **kwargs)
+            logger.info(
+                f"{mode:<8} {printers:>3} printers: {result['tickets_printed']}/{result['tickets_expected']} tickets, "
+                f"{result['tickets_per_s']} tickets/s, {result['print_threads']} print thread(s), "
+                f"order-to-paper p50={result['order_to_paper_ms']['p50']} p95={result['order_to_paper_ms']['p95']} ms"
+            )
+            results.append(result)
+    return results
+
+
+def main():
+    from benchmarks import setup_logging
+    setup_logging("WARNING")
+    logger.setLevel(logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Threaded vs asyncio print dispatcher against emulated printers")
+    parser.add_argument("--printers", type=str, default="2,8,32", help="Comma-separated station counts (default: 2,8,32)")
+    parser.add_argument("--modes", type=str, default=",".join(MODES), help="Comma-separated modes (default: threads,asyncio)")
+    parser.add_argument("--orders", type=int, default=200, help="Orders per run (default: 200)")
+    parser.add_argument("--rate", type=float, default=50.0, help="Orders per second (default: 50)")
+    parser.add_argument("--items", type=int, default=4, help="Distinct items per order (default: 4)")
+    parser.add_argument("--connect-latency", type=float, default=0.01, help="Emulated printer setup time per connection (s)")
+    parser.add_argument("--print-latency", type=float, default=0.02, help="Emulated print time per ticket (s)")
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = run_all(
+        [int(n) for n in args.printers.split(",")],
+        modes=args.modes.split(","),
+        orders=args.orders, rate=args.rate, items_per_order=args.items,
+        connect_latency=args.connect_latency, print_latency=args.print_latency,
+    )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
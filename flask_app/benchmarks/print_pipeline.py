@@ -0,0 +1,271 @@
+"""
+Print pipeline benchmark
+
+Drives the real pipeline end to end:
+
+    OrderService.process_order -> print queue -> PrinterService -> Printer
+    -> ESC/POS emulator
+
+at a configurable order rate and item mix, and reports
+
+- tickets/second actually printed
+- queue wait: process_order returned -> print worker picked the order up
+- order-to-paper latency: process_order called -> last ticket of the order cut
+
+as p50/p95/p99/max. Results can be written as JSON to compare runs. The
+"outage" scenario makes both printers refuse connections part-way through
+the run and then brings them back, to measure backlog recovery.
+
+Usage:
+    python -m benchmarks.print_pipeline --scenario steady --json steady.json
+    python -m benchmarks.print_pipeline --scenario outage --rate 20 --orders 300
+"""
+import argparse
+import json
+import logging
+import math
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from threading import Thread
+from typing import Any, Dict, List, Optional
+from unittest.mock import patch
+
+from config import Config
+from models import Order, OrderItem
+from utils.file_utils import load_menu
+from utils.printer_emulator import EscPosEmulator
+
+logger = logging.getLogger("PrintPipelineBenchmark")
+
+SCENARIOS = {
+    "steady": {"rate": 10.0, "orders": 200, "mix": "mixed"},
+    "burst": {"rate": 200.0, "orders": 300, "mix": "mixed"},
+    "outage": {"rate": 10.0, "orders": 200, "mix": "mixed", "outage_at": 5.0, "outage_for": 5.0},
+}
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    """p50/p95/p99/max in milliseconds (nearest-rank)"""
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    ordered = sorted(values)
+
+    def rank(p):
+        index = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+        return round(ordered[index] * 1000, 2)
+
+    return {"p50": rank(50), "p95": rank(95), "p99": rank(99), "max": round(ordered[-1] * 1000, 2)}
+
+
+def menu_items_by_type() -> Dict[str, List[Dict[str, Any]]]:
+    by_type = {"food": [], "drink": []}
+    for items in load_menu().values():
+        for item in items:
+            by_type.setdefault(item.get("type", "food"), []).append(item)
+    return by_type
+
+
+def make_order_factory(mix: str, max_items: int, seed: int):
+    """Returns a function producing random orders; mix is 'food', 'drinks' or 'mixed'"""
+    rng = random.Random(seed)
+    by_type = menu_items_by_type()
+    if mix == "food":
+        pool = by_type["food"]
+    elif mix == "drinks":
+        pool = by_type["drink"]
+    else:
+        pool = by_type["food"] + by_type["drink"]
+
+    def make(sequence):
+        chosen = rng.sample(pool, k=min(len(pool), rng.randint(1, max_items)))
+        return Order(
+            table_number=sequence % 30 + 1,
+            items=[
+                OrderItem(id=item["id"], name=item["name"], price=item["price"],
+                          type=item.get("type", "food"), quantity=rng.randint(1, 3))
+                for item in chosen
+            ],
+        )
+
+    return make
+
+
+def run_scenario(rate: float = 10.0, orders: int = 200, mix: str = "mixed", max_items: int = 4,
+                 outage_at: Optional[float] = None, outage_for: float = 0.0,
+                 connect_latency: float = 0.01, print_latency: float = 0.02,
+                 batch_size: Optional[int] = None, retry_delay: float = 1.0,
+                 timeout: float = 120.0, seed: int = 1) -> Dict[str, Any]:
+    """Run one benchmark scenario against a fresh DB and two emulated printers."""
+    workdir = Path(tempfile.mkdtemp(prefix="print_pipeline_"))
+    food_printer = EscPosEmulator(port=0, connect_latency=connect_latency, print_latency=print_latency, name="food").start()
+    drinks_printer = EscPosEmulator(port=0, connect_latency=connect_latency, print_latency=print_latency, name="drinks").start()
+
+    overrides = {
+        "DATABASE_PATH": str(workdir / "orders.db"),
+        "JOURNAL_DIR": str(workdir / "journal"),
+        "MOCK_PRINTER": False,
+        "PRINTER_STATIONS": None,
+        "FOOD_PRINTER_IP": food_printer.address,
+        "DRINKS_PRINTER_IP": drinks_printer.address,
+        "PRINT_RETRY_DELAY_SECONDS": retry_delay,
+        "PRINT_BATCH_SIZE": batch_size or Config.PRINT_BATCH_SIZE,
+    }
+    patches = [patch.object(Config, key, value) for key, value in overrides.items()]
+    for p in patches:
+        p.start()
+
+    service = None
+    try:
+        from services.order_service import OrderService
+        service = OrderService()
+
+        # First time a station worker hands an order to its printer = end of queue wait
+        dequeued_at: Dict[int, float] = {}
+        print_tickets = service.printer_service.print_tickets
+
+        def timed_print_tickets(station, tickets):
+            now = time.time()
+            for order, _ in tickets:
+                dequeued_at.setdefault(order.id, now)
+            return print_tickets(station, tickets)
+
+        service.printer_service.print_tickets = timed_print_tickets
+
+        outage = None
+        if outage_at is not None:
+            def run_outage():
+                time.sleep(outage_at)
+                logger.info(f"Outage: printers refusing connections for {outage_for}s")
+                food_printer.set_refusing(True)
+                drinks_printer.set_refusing(True)
+                time.sleep(outage_for)
+                food_printer.set_refusing(False)
+                drinks_printer.set_refusing(False)
+                logger.info("Outage over: printers accepting connections again")
+            outage = Thread(target=run_outage, daemon=True)
+
+        make_order = make_order_factory(mix, max_items, seed)
+        submitted: Dict[int, Dict[str, Any]] = {}
+        expected_food = expected_drinks = 0
+
+        start = time.time()
+        if outage:
+            outage.start()
+        for sequence in range(orders):
+            # Open-loop pacing: order n is due at start + n/rate
+            delay = start + sequence / rate - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            order = make_order(sequence)
+            submitted_at = time.time()
+            order_id = service.process_order(order)
+            submitted[order_id] = {
+                "submitted_at": submitted_at,
+                "accepted_at": time.time(),
+                "food": bool(order.food_items),
+                "drinks": bool(order.drink_items),
+            }
+            expected_food += bool(order.food_items)
+            expected_drinks += bool(order.drink_items)
+        ingest_done = time.time()
+
+        remaining = max(0.0, start + timeout - time.time())
+        complete = food_printer.wait_for_tickets(expected_food, remaining)
+        complete = drinks_printer.wait_for_tickets(expected_drinks, max(0.0, start + timeout - time.time())) and complete
+        if outage:
+            outage.join()
+
+        printed_at: Dict[int, float] = {}
+        for ticket in food_printer.tickets + drinks_printer.tickets:
+            if ticket.order_id in submitted:
+                printed_at[ticket.order_id] = max(printed_at.get(ticket.order_id, 0.0), ticket.received_at)
+
+        tickets = len(food_printer.tickets) + len(drinks_printer.tickets)
+        last_ticket = max(printed_at.values(), default=start)
+        queue_waits = [dequeued_at[i] - s["accepted_at"] for i, s in submitted.items() if i in dequeued_at]
+        paper_latencies = [printed_at[i] - s["submitted_at"] for i, s in submitted.items() if i in printed_at]
+        ingest_latencies = [s["accepted_at"] - s["submitted_at"] for s in submitted.values()]
+
+        return {
+            "config": {
+                "rate": rate, "orders": orders, "mix": mix, "max_items": max_items,
+                "outage_at": outage_at, "outage_for": outage_for,
+                "connect_latency": connect_latency, "print_latency": print_latency,
+                "batch_size": overrides["PRINT_BATCH_SIZE"], "retry_delay": retry_delay, "seed": seed,
+            },
+            "complete": complete,
+            "orders_submitted": len(submitted),
+            "orders_printed": len(printed_at),
+            "tickets_expected": expected_food + expected_drinks,
+            "tickets_printed": tickets,
+            "duplicate_tickets": tickets - (expected_food + expected_drinks) if complete else None,
+            "ingest_rate_per_s": round(len(submitted) / (ingest_done - start), 1) if ingest_done > start else None,
+            "tickets_per_s": round(tickets / (last_ticket - start), 1) if last_ticket > start else None,
+            "ingest_latency_ms": percentiles(ingest_latencies),
+            "queue_wait_ms": percentiles(queue_waits),
+            "order_to_paper_ms": percentiles(paper_latencies),
+        }
+    finally:
+        # Stop the print workers, dispatcher, journal and lease before the printers go away
+        if service is not None:
+            service.shutdown(timeout=1.0)
+        for p in reversed(patches):
+            p.stop()
+        food_printer.stop()
+        drinks_printer.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    from benchmarks import setup_logging
+    # The pipeline logs several lines per order at INFO; keep the report readable
+    setup_logging("WARNING")
+    logger.setLevel(logging.INFO)
+
+    parser = argparse.ArgumentParser(description="End-to-end print pipeline benchmark against emulated printers")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="steady", help="Preset to start from (default: steady)")
+    parser.add_argument("--rate", type=float, default=None, help="Orders per second")
+    parser.add_argument("--orders", type=int, default=None, help="Number of orders to submit")
+    parser.add_argument("--mix", choices=("food", "drinks", "mixed"), default=None, help="Item mix")
+    parser.add_argument("--max-items", type=int, default=4, help="Max distinct items per order (default: 4)")
+    parser.add_argument("--outage-at", type=float, default=None, help="Seconds into the run when the printers go away")
+    parser.add_argument("--outage-for", type=float, default=None, help="Outage duration in seconds")
+    parser.add_argument("--connect-latency", type=float, default=0.01, help="Emulated printer setup time per connection (s)")
+    parser.add_argument("--print-latency", type=float, default=0.02, help="Emulated print time per ticket (s)")
+    parser.add_argument("--batch-size", type=int, default=None, help="Override PRINT_BATCH_SIZE")
+    parser.add_argument("--retry-delay", type=float, default=1.0, help="Override PRINT_RETRY_DELAY_SECONDS (default: 1)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the order generator")
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    params = dict(SCENARIOS[args.scenario])
+    for key in ("rate", "orders", "mix", "outage_at", "outage_for"):
+        if getattr(args, key) is not None:
+            params[key] = getattr(args, key)
+
+    result = run_scenario(
+        max_items=args.max_items, connect_latency=args.connect_latency,
+        print_latency=args.print_latency, batch_size=args.batch_size,
+        retry_delay=args.retry_delay, seed=args.seed, **params,
+    )
+    result["scenario"] = args.scenario
+
+    logger.info(
+        f"[{args.scenario}] printed {result['tickets_printed']}/{result['tickets_expected']} tickets "
+        f"({result['tickets_per_s']} tickets/s, ingest {result['ingest_rate_per_s']} orders/s)"
+    )
+    for metric in ("ingest_latency_ms", "queue_wait_ms", "order_to_paper_ms"):
+        values = result[metric]
+        logger.info(f"  {metric:<18} p50={values['p50']}  p95={values['p95']}  p99={values['p99']}  max={values['max']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        logger.info(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
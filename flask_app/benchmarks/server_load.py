@@ -0,0 +1,220 @@
+"""
+Server load benchmark: Werkzeug dev server vs. gunicorn
+
+Starts the API as a subprocess on a free localhost port, against a fresh
+temp DB with mock printers, once per server:
+
+- dev:      python main.py (app.run, what the Docker image used to run)
+- gunicorn: gunicorn -c gunicorn.conf.py (--workers x --threads, gthread)
+
+and drives it with --clients concurrent keep-alive HTTP clients for
+--duration seconds. Each client sends the tablet/kitchen mix: GET /menu,
+GET /orders/dashboard/food (kitchen screen poll) and POST /order. Reported
+per server: requests/s, non-2xx responses and connection errors, and
+p50/p95/p99/max latency per endpoint and overall.
+
+The clients are threads of this process, so at high --clients the load
+generator itself competes for the GIL; compare servers at the same settings.
+
+Usage:
+    python -m benchmarks.server_load --clients 32 --duration 20 --json server_load.json
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from benchmarks.print_pipeline import menu_items_by_type, percentiles
+from config import BASE_DIR
+
+logger = logging.getLogger("ServerLoadBenchmark")
+
+SERVERS = ("dev", "gunicorn")
+# (name, method, path, weight)
+ENDPOINTS = (
+    ("menu", "GET", "/menu", 3),
+    ("dashboard", "GET", "/orders/dashboard/food", 5),
+    ("order", "POST", "/order", 2),
+)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def server_command(server: str) -> List[str]:
+    if server == "dev":
+        return [sys.executable, "main.py"]
+    return [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"]
+
+
+def start_server(server: str, workdir: Path, port: int, workers: int, threads: int, timeout: float = 30.0):
+    env = {
+        **os.environ,
+        "HOST": "127.0.0.1",
+        "PORT": str(port),
+        "DATABASE_PATH": str(workdir / "orders.db"),
+        "JOURNAL_DIR": str(workdir / "journal"),
+        "METRICS_DIR": str(workdir / "metrics"),
+        "LOG_DIR": str(workdir / "logs"),
+        "LOG_LEVEL": "WARNING",
+        "MOCK_PRINTER": "true",
+        "PRINTER_STATIONS": "",
+        "FLASK_DEBUG": "0",
+        "WEB_WORKERS": str(workers),
+        "WEB_THREADS": str(threads),
+    }
+    output = open(workdir / f"{server}.log", "wb")
+    process = subprocess.Popen(server_command(server), cwd=BASE_DIR, env=env, stdout=output,
+                               stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{server} server exited with {process.returncode}, see {output.name}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/menu")
+            if conn.getresponse().status == 200:
+                conn.close()
+                return process, output
+        except OSError:
+            pass
+        time.sleep(0.2)
+    stop_server(process, output)
+    raise RuntimeError(f"{server} server did not answer within {timeout} s")
+
+
+def stop_server(process, output, timeout: float = 30.0):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+    output.close()
+
+
+def client_loop(port: int, deadline: float, seed: int, results: Dict[str, List[float]], errors: Dict[str, int]):
+    rng = random.Random(seed)
+    items = menu_items_by_type()
+    names = [name for name, _, _, _ in ENDPOINTS]
+    weights = [weight for _, _, _, weight in ENDPOINTS]
+    routes = {name: (method, path) for name, method, path, _ in ENDPOINTS}
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    while time.monotonic() < deadline:
+        name = rng.choices(names, weights)[0]
+        method, path = routes[name]
+        body, headers = None, {}
+        if method == "POST":
+            chosen = rng.sample(items["food"] + items["drink"], k=rng.randint(1, 3))
+            body = json.dumps({"table_number": rng.randint(1, 30),
+                               "items": [{**item, "quantity": rng.randint(1, 3)} for item in chosen]})
+            headers = {"Content-Type": "application/json"}
+        t0 = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            elapsed = time.perf_counter() - t0
+        except (OSError, http.client.HTTPException):
+            # Closed keep-alive connection or refused: count it, reconnect
+            conn.close()
+            errors["connection"] += 1
+            continue
+        results[name].append(elapsed)
+        if not 200 <= response.status < 300:
+            errors["status"] += 1
+    conn.close()
+
+
+def run_server(server: str, clients: int = 16, duration: float = 10.0, workers: int = 2,
+               threads: int = 8, seed: int = 1) -> Dict[str, Any]:
+    """Start `server`, load it with `clients` keep-alive clients for `duration` seconds and stop it"""
+    workdir = Path(tempfile.mkdtemp(prefix="server_load_"))
+    port = free_port()
+    process, output = start_server(server, workdir, port, workers, threads)
+    try:
+        results = [{name: [] for name, _, _, _ in ENDPOINTS} for _ in range(clients)]
+        errors = [{"status": 0, "connection": 0} for _ in range(clients)]
+        deadline = time.monotonic() + duration
+        loaders = [threading.Thread(target=client_loop, args=(port, deadline, seed + i, results[i], errors[i]),
+                                     daemon=True) for i in range(clients)]
+        start = time.perf_counter()
+        for t in loaders:
+            t.start()
+        for t in loaders:
+            t.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        stop_server(process, output)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    per_endpoint = {name: [v for r in results for v in r[name]] for name, _, _, _ in ENDPOINTS}
+    every = [v for values in per_endpoint.values() for v in values]
+    return {
+        "server": server,
+        "clients": clients,
+        "workers": workers if server == "gunicorn" else 1,
+        "threads": threads if server == "gunicorn" else None,
+        "duration_s": round(elapsed, 1),
+        "requests": len(every),
+        "requests_per_s": round(len(every) / elapsed, 1),
+        "status_errors": sum(e["status"] for e in errors),
+        "connection_errors": sum(e["connection"] for e in errors),
+        "all_ms": percentiles(every),
+        **{f"{name}_ms": percentiles(values) for name, values in per_endpoint.items()},
+    }
+
+
+def run(servers=SERVERS, clients: int = 16, duration: float = 10.0, workers: int = 2, threads: int = 8,
+        seed: int = 1) -> List[Dict[str, Any]]:
+    return [run_server(server, clients, duration, workers, threads, seed) for server in servers]
+
+
+def main():
+    from benchmarks import setup_logging
+    setup_logging("WARNING")
+    logger.setLevel(logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Throughput and latency under concurrent load, Werkzeug dev server vs. gunicorn")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent keep-alive clients (default: 16)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per server (default: 10)")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn worker processes (default: 2)")
+    parser.add_argument("--threads", type=int, default=8, help="gunicorn threads per worker (default: 8)")
+    parser.add_argument("--servers", type=str, default=",".join(SERVERS), help="Comma-separated servers (default: all)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the request mix")
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    servers = [s.strip() for s in args.servers.split(",") if s.strip()]
+    results = run(servers, args.clients, args.duration, args.workers, args.threads, args.seed)
+    for r in results:
+        every, order, poll = r["all_ms"], r["order_ms"], r["dashboard_ms"]
+        logger.info(
+            f"{r['server']:<8} {r['requests_per_s']:>7} req/s  errors {r['status_errors']}+{r['connection_errors']}  "
+            f"all p50={every['p50']} p95={every['p95']} p99={every['p99']}  "
+            f"POST /order p99={order['p99']}  dashboard p99={poll['p99']}"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
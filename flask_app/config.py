@@ -1,6 +1,7 @@
 """
 Configuration settings for the Flask ordering system.
 """
+import json
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -15,28 +16,133 @@ class Config:
     
     # Flask settings
     DEBUG = False
-    HOST = '0.0.0.0'
-    PORT = 5000
+    HOST = os.getenv('HOST', '0.0.0.0')
+    PORT = int(os.getenv('PORT', '5000'))
+    # JSON for API responses/requests: 'orjson' (optional package), 'stdlib',
+    # or 'auto' = orjson when installed
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'auto')
 
     # Logging settings (override via LOG_LEVEL / LOG_DIR env vars)
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     LOG_DIR = os.getenv('LOG_DIR', str(BASE_DIR / "data" / "logs"))
+    # One JSON object per log line instead of the text format
+    LOG_JSON = os.getenv('LOG_JSON', 'false').lower() in ('1', 'true', 'yes')
+    # Log records waiting for the background log thread; beyond that INFO and
+    # DEBUG are dropped. 0 = write logs synchronously on the calling thread.
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+
+    # POST /order with an Idempotency-Key header: a retry with the same key
+    # within this many seconds gets the original response instead of a new
+    # order (services/idempotency.py)
+    IDEMPOTENCY_TTL_SECONDS = float(os.getenv('IDEMPOTENCY_TTL_SECONDS', '86400'))
+    # Recent keys answered from memory without a DB read
+    IDEMPOTENCY_CACHE_SIZE = int(os.getenv('IDEMPOTENCY_CACHE_SIZE', '10000'))
+    # Max orders per POST /orders/batch
+    ORDER_BATCH_MAX_SIZE = int(os.getenv('ORDER_BATCH_MAX_SIZE', '100'))
+
+    # Production server (gunicorn.conf.py): worker processes and request
+    # threads per worker. Several workers share the DB; one of them prints.
+    WEB_WORKERS = int(os.getenv('WEB_WORKERS', '2'))
+    WEB_THREADS = int(os.getenv('WEB_THREADS', '8'))
+    # Import the app's modules once in the master process and fork the workers
+    # from it (faster start, shared memory). Code changes then need a restart;
+    # with preload off, a reload (SIGHUP) also picks up new code.
+    WEB_PRELOAD = os.getenv('WEB_PRELOAD', 'true').lower() in ('1', 'true', 'yes')
+    # Idle keep-alive connections are closed after this long. Keep it above
+    # the upstream keepalive_timeout of the nginx proxy (60 s), so nginx never
+    # reuses a connection the server is just closing.
+    WEB_KEEPALIVE_SECONDS = int(os.getenv('WEB_KEEPALIVE_SECONDS', '75'))
+    # A worker that doesn't check in for this long is killed and replaced
+    WEB_TIMEOUT_SECONDS = int(os.getenv('WEB_TIMEOUT_SECONDS', '30'))
+    # Recycle a worker after this many requests (plus up to 10 % jitter); 0 = never
+    WEB_MAX_REQUESTS = int(os.getenv('WEB_MAX_REQUESTS', '0'))
 
     # Printer settings (override via FOOD_PRINTER_IP / DRINKS_PRINTER_IP env vars)
-    MOCK_PRINTER = False
+    MOCK_PRINTER = os.getenv('MOCK_PRINTER', 'false').lower() in ('1', 'true', 'yes')
     MINIMAL_PRINTER_OUTPUT = os.getenv('MINIMAL_PRINTER_OUTPUT', 'False').lower() in ('1', 'true', 'yes')
     DRINKS_PRINTER_IP = os.getenv('DRINKS_PRINTER_IP', '')
     FOOD_PRINTER_IP = os.getenv('FOOD_PRINTER_IP', '')
     LOGO_PATH = str(BASE_DIR / "resources" / "Rucksackberger_solo.png")
+    # Printer stations as JSON, e.g. '{"bar": {"ip": "10.0.0.5", "categories": ["Bier", "Wein"]}, ...}'
+    # (see services/printer_routing.py). Unset = FOOD_PRINTER_IP / DRINKS_PRINTER_IP by item type.
+    PRINTER_STATIONS = json.loads(os.getenv('PRINTER_STATIONS') or 'null')
+    # Max tickets the print worker sends over one printer connection
+    PRINT_BATCH_SIZE = int(os.getenv('PRINT_BATCH_SIZE', '10'))
+    # Background printer probe interval for /printer/status (0 = probe on every request)
+    PRINTER_HEALTH_INTERVAL_SECONDS = float(os.getenv('PRINTER_HEALTH_INTERVAL_SECONDS', '5'))
+    # Rolling windows for availability / latency histograms at /printer/health
+    PRINTER_HEALTH_WINDOWS_SECONDS = tuple(
+        float(w) for w in os.getenv('PRINTER_HEALTH_WINDOWS_SECONDS', '60,900,3600').split(',')
+    )
+    # Pause before retrying when a printer is unreachable or a print failed
+    PRINT_RETRY_DELAY_SECONDS = float(os.getenv('PRINT_RETRY_DELAY_SECONDS', '10'))
+    # 'threads' = one blocking print worker per station, 'asyncio' = all
+    # stations driven from one event-loop thread (services/async_dispatcher.py)
+    PRINT_DISPATCHER = os.getenv('PRINT_DISPATCHER', 'threads').lower()
+    # Print scheduling (services/print_scheduler.py): rush tickets are ordered as
+    # if they had arrived this much earlier, each further queued ticket of the
+    # same table this much later, and anything older than the max wait first
+    PRINT_RUSH_BOOST_SECONDS = float(os.getenv('PRINT_RUSH_BOOST_SECONDS', '60'))
+    PRINT_TABLE_SPACING_SECONDS = float(os.getenv('PRINT_TABLE_SPACING_SECONDS', '5'))
+    PRINT_MAX_WAIT_SECONDS = float(os.getenv('PRINT_MAX_WAIT_SECONDS', '120'))
+    # Max print jobs held in memory per station; a larger backlog stays in the
+    # DB and is paged in as the station catches up
+    PRINT_QUEUE_BOUND = int(os.getenv('PRINT_QUEUE_BOUND', '500'))
+    # A ticket that fails this many times while its printer is reachable is
+    # moved to the dead-letter queue (/admin/print-jobs/dead)
+    PRINT_MAX_ATTEMPTS = int(os.getenv('PRINT_MAX_ATTEMPTS', '5'))
+    # Admission control (services/admission.py): once a station has this many
+    # tickets pending, new orders for it are 'reject'ed (503 + Retry-After),
+    # 'flag'ged as delayed, or accepted as usual ('off')
+    ADMISSION_POLICY = os.getenv('ADMISSION_POLICY', 'flag').lower()
+    ADMISSION_MAX_BACKLOG = int(os.getenv('ADMISSION_MAX_BACKLOG', '50'))
+    # Assumed print time per ticket for wait estimates until it is measured
+    PRINT_TICKET_SECONDS = float(os.getenv('PRINT_TICKET_SECONDS', '3'))
+    # On SIGTERM/SIGINT, keep printing queued tickets for up to this long
+    # before exiting. gunicorn waits this + 5 s for a worker to exit; keep
+    # that below the container stop timeout (docker-compose.yml: 20 s).
+    # Whatever is left stays pending in the DB for the next print leader.
+    SHUTDOWN_DRAIN_SECONDS = float(os.getenv('SHUTDOWN_DRAIN_SECONDS', '8'))
 
     # File paths
     MENU_PATH = str(BASE_DIR / "resources" / "menu.json")
-    DATABASE_PATH = str(BASE_DIR / "data" / "orders.db")
-    CSV_FALLBACK_PATH = str(BASE_DIR / "data.csv")
+    DATABASE_PATH = os.getenv('DATABASE_PATH', str(BASE_DIR / "data" / "orders.db"))
+    # Orders that could not be saved to the database are journaled here and
+    # replayed once it works again (services/order_journal.py); empty = a
+    # 'journal' directory next to DATABASE_PATH
+    JOURNAL_DIR = os.getenv('JOURNAL_DIR', '')
+    # Max journal records written with one fsync
+    JOURNAL_MAX_BATCH = int(os.getenv('JOURNAL_MAX_BATCH', '256'))
+    # How often journaled orders are retried into the database
+    JOURNAL_REPLAY_INTERVAL_SECONDS = float(os.getenv('JOURNAL_REPLAY_INTERVAL_SECONDS', '5'))
+
+    # /metrics with several worker processes: each one writes a snapshot of
+    # its metrics to this directory every METRICS_FLUSH_SECONDS, and /metrics
+    # adds them up. Unset = this process' metrics only.
+    METRICS_DIR = os.getenv('METRICS_DIR')
+    METRICS_FLUSH_SECONDS = float(os.getenv('METRICS_FLUSH_SECONDS', '5'))
+
+    # Requests slower than this are logged with their DB time and SQL
+    # statement count; per-route percentiles keep this many recent requests
+    SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', '500'))
+    ROUTE_TIMING_SAMPLES = int(os.getenv('ROUTE_TIMING_SAMPLES', '1000'))
+
+    # /admin/profile: upper bounds for the sampling duration and rate
+    PROFILER_MAX_SECONDS = float(os.getenv('PROFILER_MAX_SECONDS', '60'))
+    PROFILER_MAX_HZ = float(os.getenv('PROFILER_MAX_HZ', '1000'))
+
+    # Admin endpoints (/admin/...) require this value in the X-Admin-Token
+    # header; they are disabled while it is unset
+    ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
 
     # Order processing settings
     DEFAULT_ORDER_LIMIT = 50
 
+    # Print worker leader election (several API worker processes share one DB;
+    # only the lease holder prints, the others hand orders over via the DB)
+    PRINT_LEADER_LEASE_SECONDS = float(os.getenv('PRINT_LEADER_LEASE_SECONDS', '5'))
+    PRINT_LEADER_RENEW_SECONDS = float(os.getenv('PRINT_LEADER_RENEW_SECONDS', '1'))
+
     @classmethod
     def get_printer_config(cls):
         """Get printer configuration"""
@@ -44,5 +150,6 @@ class Config:
             'mock': cls.MOCK_PRINTER,
             'ip_drinks': cls.DRINKS_PRINTER_IP,
             'ip_food': cls.FOOD_PRINTER_IP,
+            'stations': cls.PRINTER_STATIONS,
             'logo_path': cls.LOGO_PATH
         }
@@ -0,0 +1,81 @@
+"""
+gunicorn settings for the production server. From flask_app/:
+
+    gunicorn -c gunicorn.conf.py
+
+WEB_WORKERS processes with WEB_THREADS request threads each (gthread
+worker). With WEB_PRELOAD the master imports the app's modules once and
+forks the workers from it. Each worker then builds its own app
+(wsgi.init()). The workers share the DB, and the print lease decides which
+one prints. /metrics adds up all workers via METRICS_DIR, which defaults to
+a 'metrics' directory next to the database when there are several workers.
+The master clears it on start and folds the snapshot of every exited worker
+into one retired total (utils/metrics.py).
+
+Idle connections stay open for WEB_KEEPALIVE_SECONDS. A gthread worker
+parks them in its poller, so they don't hold a request thread.
+
+Signals to the master:
+- TERM/INT: stop accepting, finish running requests, then each worker
+  drains its print queue (OrderService.shutdown) before it exits
+- HUP: graceful reload. New workers are started before the old ones are
+  stopped, so no request is dropped. With WEB_PRELOAD off, the new workers
+  also load the current code.
+"""
+import math
+import os
+import sys
+from pathlib import Path
+
+from config import Config
+
+wsgi_app = "wsgi:application"
+proc_name = "bestellsystem"
+
+bind = f"{Config.HOST}:{Config.PORT}"
+workers = Config.WEB_WORKERS
+worker_class = "gthread"
+threads = Config.WEB_THREADS
+preload_app = Config.WEB_PRELOAD
+
+keepalive = Config.WEB_KEEPALIVE_SECONDS
+timeout = Config.WEB_TIMEOUT_SECONDS
+# Running requests plus the print drain on shutdown
+graceful_timeout = math.ceil(Config.SHUTDOWN_DRAIN_SECONDS) + 5
+max_requests = Config.WEB_MAX_REQUESTS
+max_requests_jitter = Config.WEB_MAX_REQUESTS // 10
+
+# Worker heartbeat files in memory, not on the container's overlay disk
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+if workers > 1 and not Config.METRICS_DIR:
+    Config.METRICS_DIR = str(Path(Config.DATABASE_PATH).parent / "metrics")
+
+
+def on_starting(server):
+    from utils import metrics
+
+    if Config.METRICS_DIR:
+        metrics.clear_snapshots(Config.METRICS_DIR)
+
+
+def post_worker_init(worker):
+    import wsgi
+    wsgi.init()
+
+
+def worker_exit(server, worker):
+    from utils import metrics
+
+    wsgi = sys.modules.get("wsgi")
+    if wsgi is not None and wsgi.app is not None:
+        wsgi.app.order_service.shutdown()
+    metrics.REGISTRY.stop_flusher()
+
+
+def child_exit(server, worker):
+    from utils import metrics
+
+    if Config.METRICS_DIR:
+        metrics.retire_snapshot(Config.METRICS_DIR, worker.pid)
@@ -4,15 +4,22 @@ Refactored to use modular architecture with separate routes and services.
 """
 import os
 import logging
+import signal
+import sys
+import threading
 
-from flask import Flask
+from flask import Flask, request
 from flask_cors import CORS
 from flasgger import Swagger
 from config import Config
 from routes.menu_routes import menu_bp
 from routes.order_routes import order_bp
 from routes.analytics_routes import analytics_bp
+from routes.admin_routes import admin_bp
+from routes.metrics_routes import metrics_bp
 from services.order_service import OrderService
+from utils import json_provider, metrics, request_timing
+from utils.menu_cache import MenuCache
 from utils.logging_config import setup_logging
 
 
@@ -21,26 +28,57 @@ def create_app():
 
     # Configured here too (not just in main()) so app factory works standalone
     # under WSGI servers like gunicorn that never call main().
-    setup_logging(Config.LOG_LEVEL, Config.LOG_DIR)
+    setup_logging(Config.LOG_LEVEL, Config.LOG_DIR, Config.LOG_JSON, Config.LOG_QUEUE_SIZE)
 
     app = Flask(__name__)
     app.config.from_object(Config)
+    json_provider.init_app(app, Config.JSON_PROVIDER)
     CORS(app)
 
     log = logging.getLogger(__name__)
-    if not Config.MOCK_PRINTER and (not Config.FOOD_PRINTER_IP or not Config.DRINKS_PRINTER_IP):
+    if Config.PRINTER_STATIONS:
+        missing = [name for name, station in Config.PRINTER_STATIONS.items() if not station.get('ip')]
+        if not Config.MOCK_PRINTER and missing:
+            log.warning(
+                f"PRINTER_STATIONS has no ip for {', '.join(missing)} — printing to these "
+                "stations will stay unavailable until configured."
+            )
+    elif not Config.MOCK_PRINTER and (not Config.FOOD_PRINTER_IP or not Config.DRINKS_PRINTER_IP):
         log.warning(
             "FOOD_PRINTER_IP and/or DRINKS_PRINTER_IP is not set — printing will stay "
             "unavailable until configured (see .env.example)."
         )
 
-    # Single shared OrderService instance — one queue, one print thread
+    # Single shared OrderService instance — a print queue and worker thread per
+    # printer station (or one asyncio dispatcher thread for all of them)
     app.order_service = OrderService()
 
+    # Menu served from memory; an edited menu.json is picked up by the next
+    # GET /menu, POST /order or /orders/batch (each stats the file), and is
+    # then re-routed to the printer stations and used for pricing
+    app.menu_cache = MenuCache(Config.MENU_PATH)
+    app.menu_cache.get()
+    app.menu_cache.subscribe(app.order_service.printer_service.router.load_menu)
+    app.menu_cache.subscribe(app.order_service.menu_catalog.load_menu)
+
     # Register blueprints BEFORE Swagger init so all routes are discovered
     app.register_blueprint(menu_bp)
     app.register_blueprint(order_bp)
     app.register_blueprint(analytics_bp)
+    app.register_blueprint(admin_bp)
+    app.register_blueprint(metrics_bp)
+
+    # Wall/DB time per route: Server-Timing header, rolling percentiles, slow-request log
+    request_timing.init_app(app)
+
+    @app.after_request
+    def count_request(response):
+        metrics.HTTP_REQUESTS.inc(endpoint=request.endpoint or 'unmatched', method=request.method,
+                                  status=response.status_code)
+        return response
+
+    if Config.METRICS_DIR:
+        metrics.REGISTRY.start_flusher(Config.METRICS_DIR, Config.METRICS_FLUSH_SECONDS)
 
     # Configure Swagger UI — must come after blueprint registration
     swagger_config = {
@@ -76,14 +114,38 @@ def create_app():
     return app
 
 
+def install_shutdown_handlers(app):
+    """
+    On SIGTERM (docker stop) or SIGINT (Ctrl+C), drain the print queues
+    before exiting instead of abandoning them with the daemon print threads.
+    Signal handlers can only be set from the main thread.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+
+    log = logging.getLogger(__name__)
+
+    def handle(signum, frame):
+        log.info(f"Received {signal.Signals(signum).name}, shutting down")
+        app.order_service.shutdown()
+        metrics.REGISTRY.stop_flusher()
+        if signum == signal.SIGINT:
+            raise KeyboardInterrupt
+        sys.exit(0)
+
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, handle)
+
+
 def main():
     """Main application entry point"""
 
-    setup_logging(Config.LOG_LEVEL, Config.LOG_DIR)
+    setup_logging(Config.LOG_LEVEL, Config.LOG_DIR, Config.LOG_JSON, Config.LOG_QUEUE_SIZE)
     log = logging.getLogger(__name__)
     log.info("App started")
 
     app = create_app()
+    install_shutdown_handlers(app)
     debug_mode = Config.DEBUG or os.getenv("FLASK_DEBUG", "0").lower() in ("1", "true", "yes")
 
     app.run(
@@ -1,3 +1,4 @@
 from .order import Order, OrderItem
+from .print_job import PrintJob
 
-__all__ = ["Order", "OrderItem"]
+__all__ = ["Order", "OrderItem", "PrintJob"]
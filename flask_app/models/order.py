@@ -1,12 +1,18 @@
 """
-Order and OrderItem dataclasses for structured order data management.
+Order and OrderItem models for structured order data management.
+
+Both use __slots__: the dashboards and the print leader hold hundreds to
+thousands of them. An Order caches its total and its food/drink item lists
+on first access. Replacing or mutating `order.items` drops the cache; after
+changing an item in place (price, quantity, type) call `order.invalidate()`.
+`from_row()` builds both straight from SQLite rows without re-validating.
 """
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from typing import List, Optional, Dict, Any, Union
 from datetime import datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class OrderItem:
     """Represents an item in an order"""
     name: str
@@ -23,15 +29,29 @@ class OrderItem:
     def total_price(self) -> float:
         return round(self.price * self.quantity, 2)
 
-    def to_dict(self) -> Dict[str, Any]:
-        return {
+    def to_dict(self, compact: bool = False) -> Dict[str, Any]:
+        """compact leaves out the derived total_price"""
+        data = {
             "id": self.id,
             "name": self.name,
             "price": self.price,
             "quantity": self.quantity,
             "type": self.type,
-            "total_price": self.total_price,
         }
+        if not compact:
+            data["total_price"] = self.total_price
+        return data
+
+    @classmethod
+    def from_row(cls, row) -> "OrderItem":
+        """From an `order_items` row; the DB already holds the right types"""
+        item = cls.__new__(cls)
+        item.id = row["item_id"]
+        item.name = row["item_name"]
+        item.price = row["price"]
+        item.quantity = row["quantity"]
+        item.type = row["item_type"]
+        return item
 
     @classmethod
     def from_dict(cls, data: Union[Dict[str, Any], "OrderItem"]) -> "OrderItem":
@@ -59,70 +79,198 @@ class OrderItem:
             return default
 
 
-@dataclass
+class ItemList(list):
+    """An order's items; any change drops the order's cached aggregates"""
+    __slots__ = ("_order",)
+
+    def _changed(self):
+        self._order.invalidate()
+
+    def append(self, item):
+        super().append(item)
+        self._changed()
+
+    def extend(self, items):
+        super().extend(items)
+        self._changed()
+
+    def insert(self, index, item):
+        super().insert(index, item)
+        self._changed()
+
+    def pop(self, index=-1):
+        item = super().pop(index)
+        self._changed()
+        return item
+
+    def remove(self, item):
+        super().remove(item)
+        self._changed()
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def __setitem__(self, index, item):
+        super().__setitem__(index, item)
+        self._changed()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._changed()
+
+    def __iadd__(self, items):
+        result = super().__iadd__(items)
+        self._changed()
+        return result
+
+
 class Order:
     """Represents a complete order with table number, items, comment, and status"""
-    table_number: int
-    items: List[OrderItem] = field(default_factory=list)
-    comment: str = ""
-    timestamp: Optional[int] = None
-    id: Optional[int] = None
-    status: str = "pending"
-    food_processed: bool = False
-    drink_processed: bool = False
-    created_at: Optional[str] = None
-    user_agent: Optional[str] = None
+    FIELDS = ("table_number", "items", "comment", "timestamp", "id", "status", "food_processed",
+              "drink_processed", "created_at", "user_agent", "rush")
+    __slots__ = FIELDS[:1] + ("_items",) + FIELDS[2:] + ("_total_price", "_food_items", "_drink_items")
 
-    def __post_init__(self):
+    def __init__(self, table_number: int, items: Optional[List[OrderItem]] = None, comment: str = "",
+                 timestamp: Optional[int] = None, id: Optional[int] = None, status: str = "pending",
+                 food_processed: bool = False, drink_processed: bool = False,
+                 created_at: Optional[str] = None, user_agent: Optional[str] = None, rush: bool = False):
         try:
-            self.table_number = int(self.table_number)
+            self.table_number = int(table_number)
         except (ValueError, TypeError):
             self.table_number = 0
 
-        # Convert dict items to OrderItem dataclass instances if needed
-        self.items = [
+        # Convert dict items to OrderItem instances if needed
+        self._set_items(
             item if isinstance(item, OrderItem) else OrderItem.from_dict(item)
-            for item in self.items
-        ]
+            for item in items or ()
+        )
+        self.comment = comment
+        self.timestamp = int(datetime.now().timestamp()) if timestamp is None else timestamp
+        self.id = id
+        self.status = status
+        self.food_processed = food_processed
+        self.drink_processed = drink_processed
+        self.created_at = created_at
+        self.user_agent = user_agent
+        self.rush = rush
+
+    @property
+    def items(self) -> List[OrderItem]:
+        return self._items
+
+    @items.setter
+    def items(self, items):
+        self._set_items(items)
+
+    def _set_items(self, items):
+        item_list = ItemList(items)
+        item_list._order = self
+        self._items = item_list
+        self._total_price = self._food_items = self._drink_items = None
+
+    def invalidate(self):
+        """Forget the cached total and item lists (call after changing an item in place)"""
+        self._total_price = None
+        self._food_items = None
+        self._drink_items = None
 
-        if self.timestamp is None:
-            self.timestamp = int(datetime.now().timestamp())
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.FIELDS)
+        return f"Order({fields})"
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.FIELDS)
+
+    __hash__ = None
 
     @property
     def total_price(self) -> float:
-        return round(sum(item.total_price for item in self.items), 2)
+        if self._total_price is None:
+            self._total_price = round(sum(item.total_price for item in self._items), 2)
+        return self._total_price
 
     @property
     def food_items(self) -> List[OrderItem]:
-        return [item for item in self.items if item.type == "food"]
+        if self._food_items is None:
+            self._food_items = [item for item in self._items if item.type == "food"]
+        return self._food_items
 
     @property
     def drink_items(self) -> List[OrderItem]:
-        return [item for item in self.items if item.type == "drink"]
+        if self._drink_items is None:
+            self._drink_items = [item for item in self._items if item.type == "drink"]
+        return self._drink_items
 
     def has_item_type(self, item_type: str) -> bool:
-        return any(item.type == item_type for item in self.items)
+        if item_type == "food":
+            return bool(self.food_items)
+        if item_type == "drink":
+            return bool(self.drink_items)
+        return any(item.type == item_type for item in self._items)
 
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert Order to dict for JSON responses & database methods"""
+    def to_dict(self, compact: bool = False) -> Dict[str, Any]:
+        """
+        Convert Order to dict for JSON responses & database methods.
+
+        The full form carries every field under both its frontend and its
+        database name (tableNumber/table_number, orderedItems/items, ...).
+        compact=True keeps only the frontend names, for the dashboards.
+        """
+        items = [item.to_dict(compact) for item in self.items]
+        total_price = self.total_price
+        if compact:
+            return {
+                "id": self.id,
+                "tableNumber": self.table_number,
+                "orderedItems": items,
+                "comment": self.comment,
+                "timestamp": self.timestamp,
+                "totalCost": total_price,
+                "status": self.status,
+                "food_processed": self.food_processed,
+                "drink_processed": self.drink_processed,
+                "created_at": self.created_at,
+                "rush": self.rush,
+            }
         return {
             "id": self.id,
             "order_id": self.id,
             "tableNumber": str(self.table_number),
             "table_number": self.table_number,
-            "orderedItems": [item.to_dict() for item in self.items],
-            "items": [item.to_dict() for item in self.items],
+            "orderedItems": items,
+            "items": items,
             "comment": self.comment,
             "timestamp": self.timestamp,
-            "totalCost": self.total_price,
-            "total_price": self.total_price,
+            "totalCost": total_price,
+            "total_price": total_price,
             "status": self.status,
             "food_processed": self.food_processed,
             "drink_processed": self.drink_processed,
             "created_at": self.created_at,
             "user_agent": self.user_agent,
+            "rush": self.rush,
         }
 
+    @classmethod
+    def from_row(cls, row, item_rows) -> "Order":
+        """From an `orders` row and its `order_items` rows, skipping from_dict()'s conversions"""
+        order = cls.__new__(cls)
+        order.id = row["id"]
+        order.table_number = row["table_number"]
+        order.comment = row["comment"]
+        order.timestamp = row["timestamp"]
+        order.status = row["status"]
+        order.food_processed = bool(row["food_processed"])
+        order.drink_processed = bool(row["drink_processed"])
+        order.created_at = row["created_at"]
+        order.user_agent = row["user_agent"]
+        order.rush = bool(row["rush"])
+        order._set_items([OrderItem.from_row(item_row) for item_row in item_rows])
+        return order
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Order":
         raw_items = data.get("orderedItems") or data.get("items") or []
@@ -144,6 +292,7 @@ class Order:
             drink_processed=bool(data.get("drink_processed", False)),
             created_at=data.get("created_at"),
             user_agent=data.get("user_agent"),
+            rush=bool(data.get("rush", False)),
         )
 
     def __getitem__(self, key: str) -> Any:
@@ -0,0 +1,23 @@
+"""
+PrintJob dataclass: the part of an order that goes to one printer station.
+"""
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from .order import Order, OrderItem
+
+
+@dataclass
+class PrintJob:
+    """One ticket to print: an order's items for a single station"""
+    id: int
+    order_id: int
+    station: str
+    order: Optional[Order] = None
+    items: List[OrderItem] = field(default_factory=list)
+    table_number: int = 0
+    rush: bool = False
+    # Scheduling (see services/print_scheduler.py): creation as unix time
+    # and the virtual arrival time the queue orders by
+    created_ts: Optional[float] = None
+    priority: Optional[float] = None
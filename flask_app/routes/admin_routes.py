@@ -0,0 +1,302 @@
+"""
+Admin routes for the ordering system (operations, not used by the frontend).
+
+Every route requires the X-Admin-Token header to match Config.ADMIN_TOKEN;
+while ADMIN_TOKEN is unset they answer 403.
+"""
+import hmac
+import logging
+from functools import wraps
+from flask import Blueprint, Response, jsonify, request, current_app
+from config import Config
+from utils import profiler
+
+admin_bp = Blueprint('admin', __name__)
+log = logging.getLogger(__name__)
+
+
+def require_admin(view):
+    """Reject requests without the right X-Admin-Token header"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not Config.ADMIN_TOKEN:
+            return jsonify({"error": "Admin API disabled, set ADMIN_TOKEN to enable it"}), 403
+        token = request.headers.get("X-Admin-Token", "")
+        if not hmac.compare_digest(token.encode(), Config.ADMIN_TOKEN.encode()):
+            return jsonify({"error": "Invalid admin token"}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@admin_bp.route("/admin/print-jobs/dead", methods=["GET"])
+@require_admin
+def get_dead_print_jobs():
+    """
+    List the dead-letter queue
+    ---
+    tags:
+      - Admin
+    summary: Print jobs that failed PRINT_MAX_ATTEMPTS times while their printer was reachable
+    parameters:
+      - in: header
+        name: X-Admin-Token
+        type: string
+        required: true
+      - in: query
+        name: limit
+        type: integer
+        default: 100
+        required: false
+    responses:
+      200:
+        description: Dead print jobs, oldest first
+        schema:
+          type: object
+          properties:
+            print_jobs:
+              type: array
+              items:
+                type: object
+                properties:
+                  id:
+                    type: integer
+                  order_id:
+                    type: integer
+                  station:
+                    type: string
+                    example: "food"
+                  attempts:
+                    type: integer
+                    example: 5
+                  last_error:
+                    type: string
+                  table_number:
+                    type: integer
+      403:
+        description: Missing or wrong admin token
+      500:
+        description: Server error
+    """
+    limit = request.args.get('limit', default=100, type=int)
+
+    try:
+        jobs = current_app.order_service.get_dead_print_jobs(limit)
+        return jsonify({"print_jobs": jobs})
+    except Exception as e:
+        log.exception("Error fetching dead print jobs")
+        return jsonify({"error": str(e)}), 500
+
+
+@admin_bp.route("/admin/print-jobs/<int:job_id>", methods=["GET"])
+@require_admin
+def get_print_job(job_id):
+    """
+    Inspect a print job
+    ---
+    tags:
+      - Admin
+    summary: Status, attempts and last error of a print job, with its order and items
+    parameters:
+      - in: header
+        name: X-Admin-Token
+        type: string
+        required: true
+      - in: path
+        name: job_id
+        type: integer
+        required: true
+    responses:
+      200:
+        description: The print job
+      403:
+        description: Missing or wrong admin token
+      404:
+        description: Print job not found
+      500:
+        description: Server error
+    """
+    try:
+        job = current_app.order_service.get_print_job(job_id)
+        if job:
+            return jsonify(job)
+        else:
+            return jsonify({"error": "Print job not found"}), 404
+    except Exception as e:
+        log.exception(f"Error fetching print job {job_id}")
+        return jsonify({"error": str(e)}), 500
+
+
+@admin_bp.route("/admin/print-jobs/<int:job_id>/retry", methods=["POST"])
+@require_admin
+def retry_print_job(job_id):
+    """
+    Retry a dead print job
+    ---
+    tags:
+      - Admin
+    summary: Put a dead print job back into the print queue with a fresh attempt count
+    parameters:
+      - in: header
+        name: X-Admin-Token
+        type: string
+        required: true
+      - in: path
+        name: job_id
+        type: integer
+        required: true
+    responses:
+      200:
+        description: Job is pending again
+      403:
+        description: Missing or wrong admin token
+      404:
+        description: No dead print job with this id
+      500:
+        description: Server error
+    """
+    try:
+        if current_app.order_service.retry_print_job(job_id):
+            log.info(f"Dead print job {job_id} sent back to the print queue")
+            return jsonify({"message": "Print job queued for retry"})
+        else:
+            return jsonify({"error": "Dead print job not found"}), 404
+    except Exception as e:
+        log.exception(f"Error retrying print job {job_id}")
+        return jsonify({"error": str(e)}), 500
+
+
+@admin_bp.route("/admin/print-jobs/<int:job_id>", methods=["DELETE"])
+@require_admin
+def discard_print_job(job_id):
+    """
+    Discard a dead print job
+    ---
+    tags:
+      - Admin
+    summary: Give up on a dead print job; its order counts as printed once nothing else is left to print
+    parameters:
+      - in: header
+        name: X-Admin-Token
+        type: string
+        required: true
+      - in: path
+        name: job_id
+        type: integer
+        required: true
+    responses:
+      200:
+        description: Job discarded
+      403:
+        description: Missing or wrong admin token
+      404:
+        description: No dead print job with this id
+      500:
+        description: Server error
+    """
+    try:
+        if current_app.order_service.discard_print_job(job_id):
+            log.info(f"Dead print job {job_id} discarded")
+            return jsonify({"message": "Print job discarded"})
+        else:
+            return jsonify({"error": "Dead print job not found"}), 404
+    except Exception as e:
+        log.exception(f"Error discarding print job {job_id}")
+        return jsonify({"error": str(e)}), 500
+
+
+@admin_bp.route("/admin/timing", methods=["GET"])
+@require_admin
+def get_route_timings():
+    """
+    Per-route request timing
+    ---
+    tags:
+      - Admin
+    summary: Rolling wall-time and DB-time percentiles (ms) per route over the last ROUTE_TIMING_SAMPLES requests of this worker process
+    parameters:
+      - in: header
+        name: X-Admin-Token
+        type: string
+        required: true
+    responses:
+      200:
+        description: Percentiles keyed by route endpoint
+        schema:
+          type: object
+          properties:
+            slow_request_ms:
+              type: number
+              example: 500
+            routes:
+              type: object
+              example: {"order.place_order": {"blueprint": "order", "wall_ms": {"count": 120, "p50": 8.1, "p95": 21.4, "p99": 40.2, "max": 55.0}, "db_ms": {"count": 120, "p50": 5.2, "p95": 15.0, "p99": 30.1, "max": 41.7}}}
+      403:
+        description: Missing or wrong admin token
+      500:
+        description: Server error
+    """
+    try:
+        return jsonify({"slow_request_ms": Config.SLOW_REQUEST_MS, "routes": current_app.route_timings.stats()})
+    except Exception as e:
+        log.exception("Error fetching route timings")
+        return jsonify({"error": str(e)}), 500
+
+
+@admin_bp.route("/admin/profile", methods=["GET"])
+@require_admin
+def get_profile():
+    """
+    Sample all thread stacks
+    ---
+    tags:
+      - Admin
+    summary: Sampling profile of every thread (requests, print workers, health monitor) in collapsed-stack format for flamegraph tools
+    description: Blocks for the requested duration. Only one profile runs at a time, and nothing is sampled outside a request.
+    produces:
+      - text/plain
+    parameters:
+      - in: header
+        name: X-Admin-Token
+        type: string
+        required: true
+      - in: query
+        name: seconds
+        type: number
+        default: 10
+        description: Sampling duration, at most PROFILER_MAX_SECONDS
+      - in: query
+        name: hz
+        type: number
+        default: 100
+        description: Samples per second, at most PROFILER_MAX_HZ
+      - in: query
+        name: thread
+        type: string
+        description: Only threads whose name contains this (e.g. "print")
+    responses:
+      200:
+        description: One "frame;frame;... count" line per distinct stack
+      400:
+        description: Invalid seconds or hz
+      403:
+        description: Missing or wrong admin token
+      409:
+        description: Another profile is running
+      500:
+        description: Server error
+    """
+    seconds = request.args.get('seconds', default=10.0, type=float)
+    hz = request.args.get('hz', default=100.0, type=float)
+    if not 0 < seconds <= Config.PROFILER_MAX_SECONDS or not 0 < hz <= Config.PROFILER_MAX_HZ:
+        return jsonify({"error": f"seconds must be in (0, {Config.PROFILER_MAX_SECONDS}], hz in (0, {Config.PROFILER_MAX_HZ}]"}), 400
+
+    try:
+        log.info(f"Profiling all threads for {seconds} s at {hz} Hz")
+        stacks = profiler.sample_stacks(seconds, hz, request.args.get('thread'))
+        return Response(profiler.collapse(stacks), content_type="text/plain; charset=utf-8",
+                        headers={"X-Profile-Samples": str(sum(stacks.values()))})
+    except profiler.ProfilerBusy as e:
+        return jsonify({"error": str(e)}), 409
+    except Exception as e:
+        log.exception("Error taking profile")
+        return jsonify({"error": str(e)}), 500
@@ -2,8 +2,7 @@
 Menu-related routes for the ordering system.
 """
 import logging
-from flask import Blueprint, jsonify, make_response
-from utils.file_utils import load_menu
+from flask import Blueprint, Response, current_app, request
 
 menu_bp = Blueprint('menu', __name__)
 log = logging.getLogger(__name__)
@@ -16,15 +15,29 @@ def get_menu():
     tags:
       - Menu
     summary: Fetch full menu categorized into Food, Drinks, etc.
+    description: Served from memory, gzip-compressed when the client accepts it. Send the ETag back in If-None-Match to get a 304 while the menu is unchanged.
+    parameters:
+      - in: header
+        name: If-None-Match
+        type: string
+        required: false
     responses:
       200:
         description: Categorized JSON dictionary of menu items
+      304:
+        description: Menu unchanged since the ETag in If-None-Match
     """
-    menu = load_menu()
-    if not menu:
+    snapshot = current_app.menu_cache.get()
+    if not snapshot.menu:
         log.warning("Menu is empty or failed to load")
-    response = make_response(jsonify(menu))
-    response.headers["Content-Type"] = "application/json; charset=utf-8"
-    return response
 
+    headers = {"ETag": f'"{snapshot.etag}"', "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if request.if_none_match.contains_weak(snapshot.etag):
+        return Response(status=304, headers=headers)
 
+    if request.accept_encodings["gzip"]:
+        headers["Content-Encoding"] = "gzip"
+        body = snapshot.gzip_body
+    else:
+        body = snapshot.body
+    return Response(body, content_type="application/json; charset=utf-8", headers=headers)
@@ -0,0 +1,33 @@
+"""
+Metrics route for the ordering system (scraped by Prometheus).
+"""
+import logging
+from flask import Blueprint, Response
+from utils import metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+log = logging.getLogger(__name__)
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def get_metrics():
+    """
+    Prometheus metrics
+    ---
+    tags:
+      - Monitoring
+    summary: Order ingest, DB write latency, print queue and printer metrics in the Prometheus text format
+    description: With METRICS_DIR set, the values of all worker processes are added up.
+    produces:
+      - text/plain
+    responses:
+      200:
+        description: Metrics in text exposition format 0.0.4
+      500:
+        description: Server error
+    """
+    try:
+        return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+    except Exception as e:
+        log.exception("Error rendering metrics")
+        return Response(f"# error: {e}\n", status=500, content_type=metrics.CONTENT_TYPE)
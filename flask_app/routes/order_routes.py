@@ -3,8 +3,12 @@ Order-related routes for the ordering system.
 """
 import datetime
 import logging
-from flask import Blueprint, jsonify, request, current_app
+from flask import Blueprint, Response, jsonify, request, current_app
+from config import Config
 from models import Order
+from services.admission import BacklogFull
+from services.idempotency import MAX_KEY_LENGTH, IdempotencyKeyExists, request_hash
+from services.menu_catalog import InvalidOrderError
 
 order_bp = Blueprint('order', __name__)
 log = logging.getLogger(__name__)
@@ -18,7 +22,13 @@ def place_order():
     tags:
       - Orders
     summary: Create a new order and queue for thermal printing
+    description: Only item ids and quantities are taken from the client; name, price and type come from the menu.
     parameters:
+      - in: header
+        name: Idempotency-Key
+        type: string
+        required: false
+        description: Unique per order (e.g. a UUID), reused on retries. A retry within IDEMPOTENCY_TTL_SECONDS gets the original response (header Idempotent-Replayed true) instead of placing the order again.
       - in: body
         name: body
         required: true
@@ -34,6 +44,10 @@ def place_order():
             comment:
               type: string
               example: "ohne Eis"
+            rush:
+              type: boolean
+              description: Print this order's tickets ahead of normal orders (bounded by PRINT_MAX_WAIT_SECONDS for everyone else)
+              example: false
             orderedItems:
               type: array
               items:
@@ -56,10 +70,39 @@ def place_order():
                     example: "drink"
     responses:
       200:
-        description: Order successfully created and queued
+        description: >
+          Order successfully created and queued, with the items priced from the menu. If the database
+          was unavailable the order is journaled (order_id null, status journaled) and printed once it is back.
+          estimated_wait_seconds is how long its tickets are expected to wait for the printer; delayed is
+          true when a station's backlog is at ADMISSION_MAX_BACKLOG (ADMISSION_POLICY flag).
+      400:
+        description: Order doesn't match the menu (unknown item id, quantity below 1, no items, bad table number), or an empty or too long Idempotency-Key
+      422:
+        description: The Idempotency-Key was already used for a different order
+      503:
+        description: The print backlog is full (ADMISSION_POLICY reject); retry after the Retry-After header's seconds
       500:
         description: Error processing order
     """
+    key = request.headers.get("Idempotency-Key")
+    req_hash = None
+    if key is not None:
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return jsonify({"error": f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"}), 400
+        req_hash = request_hash(request.get_json(silent=True))
+        try:
+            replay = replay_idempotent(key, req_hash)
+        except Exception:
+            # The database is down: the order goes to the journal with its
+            # key, and the journal replay saves it at most once
+            log.exception(f"Could not look up Idempotency-Key {key!r}, placing the order without the replay check")
+            replay = None
+        if replay is not None:
+            return replay
+
+    # One stat of menu.json: an edited menu is re-indexed for pricing and
+    # printer routing before this order uses it
+    current_app.menu_cache.get()
     data = request.json or {}
     if 'timestamp' not in data or not data['timestamp']:
         data['timestamp'] = int(datetime.datetime.now().timestamp())
@@ -68,14 +111,158 @@ def place_order():
     try:
         order = Order.from_dict(data)
         order.user_agent = user_agent
-        result = current_app.order_service.process_order(order, user_agent)
+        result = current_app.order_service.process_order(order, user_agent, key, req_hash)
         log.info(f"Order placed for table {order.table_number} (order_id={result})")
-        return jsonify({"message": "Order received!", "order": order.to_dict(), "order_id": result})
+        response = jsonify({**order_received(order, result), **wait_estimate(order)})
+        if key is not None and result is not None:
+            # A journaled order has no key row yet; a retry is answered once it is replayed
+            record_response(key, result, req_hash, response)
+        return response
+    except IdempotencyKeyExists:
+        # A concurrent request with the same key saved its order first
+        log.info(f"Order with Idempotency-Key {key!r} was placed by a concurrent request")
+        return replay_idempotent(key, req_hash) or (jsonify({"error": "Idempotency key expired"}), 409)
+    except BacklogFull as e:
+        return backlog_full(e)
+    except (InvalidOrderError, TypeError, ValueError) as e:
+        log.warning(f"Order rejected: {e}")
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         log.exception("Error placing order")
         return jsonify({"error": str(e)}), 500
 
 
+@order_bp.route("/orders/batch", methods=["POST"])
+def place_orders_batch():
+    """
+    Place several orders at once
+    ---
+    tags:
+      - Orders
+    summary: Sync orders a tablet took while offline
+    description: >
+      All valid orders are saved in one transaction and queued for printing together.
+      Each order's clientId is its idempotency key (as the Idempotency-Key header of POST /order),
+      so sending the same batch again places nothing twice. Invalid orders are rejected one by one
+      without affecting the others.
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          required:
+            - orders
+          properties:
+            orders:
+              type: array
+              description: Orders as for POST /order, each with a unique clientId (at most ORDER_BATCH_MAX_SIZE)
+              items:
+                type: object
+                required:
+                  - clientId
+                  - tableNumber
+                  - orderedItems
+                properties:
+                  clientId:
+                    type: string
+                    example: "3f2c9a1e-tablet7-0042"
+    responses:
+      200:
+        description: >
+          One result per order, in request order, with clientId, status (created, duplicate, rejected,
+          or journaled if the database was unavailable) and order_id or error, plus estimated_wait_seconds
+          and delayed as for POST /order
+      400:
+        description: No orders, too many orders, or a missing or repeated clientId
+      503:
+        description: The print backlog is full (ADMISSION_POLICY reject), nothing was saved; retry after the Retry-After header's seconds
+      500:
+        description: Error processing the batch
+    """
+    data = request.get_json(silent=True)
+    orders = data.get("orders") if isinstance(data, dict) else data
+    if not isinstance(orders, list) or not orders:
+        return jsonify({"error": "orders must be a non-empty array"}), 400
+    if len(orders) > Config.ORDER_BATCH_MAX_SIZE:
+        return jsonify({"error": f"At most {Config.ORDER_BATCH_MAX_SIZE} orders per batch"}), 400
+
+    batch, seen = [], set()
+    for position, order in enumerate(orders):
+        client_id = order.get("clientId") if isinstance(order, dict) else None
+        if not isinstance(client_id, str) or not client_id or len(client_id) > MAX_KEY_LENGTH:
+            return jsonify({"error": f"orders[{position}]: clientId must be a string of 1 to {MAX_KEY_LENGTH} characters"}), 400
+        if client_id in seen:
+            return jsonify({"error": f"orders[{position}]: clientId {client_id!r} is repeated"}), 400
+        seen.add(client_id)
+        batch.append((client_id, {key: value for key, value in order.items() if key != "clientId"}))
+
+    current_app.menu_cache.get()  # pick up an edited menu.json, as in place_order
+    try:
+        results = current_app.order_service.process_orders(batch, request.headers.get("User-Agent"))
+        counts = {status: sum(r["status"] == status for r in results) for status in ("created", "duplicate", "rejected", "journaled")}
+        log.info(f"Order batch of {len(batch)}: {counts}")
+        return jsonify({"results": results, **counts, **wait_estimate()})
+    except BacklogFull as e:
+        return backlog_full(e)
+    except Exception as e:
+        log.exception("Error placing order batch")
+        return jsonify({"error": str(e)}), 500
+
+
+def backlog_full(e):
+    log.warning(f"Order refused: {e}")
+    body = {"error": str(e), "retry_after": e.retry_after, "estimated_wait_seconds": round(e.wait_seconds, 1)}
+    return jsonify(body), 503, {"Retry-After": str(e.retry_after)}
+
+
+def record_response(key, order_id, req_hash, response):
+    """Store the response for retries; if that fails, a retry is answered from the saved order instead"""
+    try:
+        current_app.order_service.idempotency.record_response(key, order_id, req_hash, response.get_data(as_text=True))
+    except Exception:
+        log.exception(f"Could not store the response for Idempotency-Key {key!r}")
+
+
+def wait_estimate(order=None):
+    """
+    estimated_wait_seconds and delayed for the response, or nothing if they
+    can't be worked out: the order is already saved or journaled, so it must
+    not turn into a 500 the tablet would resubmit
+    """
+    try:
+        return current_app.order_service.estimate_wait(order)
+    except Exception:
+        log.exception("Error estimating the print wait")
+        return {}
+
+
+def order_received(order, order_id):
+    return {"message": "Order received!", "order": order.to_dict(), "order_id": order_id}
+
+
+def replay_idempotent(key, req_hash):
+    """The stored response for a known Idempotency-Key, a 422 if it was used for another body, or None"""
+    service = current_app.order_service
+    result = service.idempotency.lookup(key)
+    if result is None:
+        return None
+    if result.request_hash is not None and result.request_hash != req_hash:
+        log.warning(f"Idempotency-Key {key!r} reused for a different order (order_id={result.order_id})")
+        return jsonify({"error": "Idempotency-Key was already used for a different order",
+                        "order_id": result.order_id}), 422
+    body = result.response
+    if body is None:
+        # The first request saved the order but hasn't stored its response
+        # (yet, or it died in between): answer from the saved order
+        orders = service.order_logger.get_orders_by_ids([result.order_id])
+        if not orders:
+            return None
+        body = jsonify(order_received(orders[0], result.order_id)).get_data(as_text=True)
+    log.info(f"Replayed order_id={result.order_id} for Idempotency-Key {key!r}")
+    return Response(body, mimetype="application/json", headers={"Idempotent-Replayed": "true"})
+
+
 
 @order_bp.route("/orders", methods=["GET"])
 def get_orders():
@@ -90,13 +277,17 @@ def get_orders():
         log.exception("Error fetching orders")
         return jsonify({"error": str(e)}), 500
 
+def compact_requested():
+    """?compact=1: orders without duplicate fields (see Order.to_dict)"""
+    return request.args.get('compact', '').lower() in ('1', 'true', 'yes')
+
 @order_bp.route("/orders/dashboard/food", methods=["GET"])
 def get_dashboard_orders_food():
     """Get orders for the dashboard"""
     try:
         log.debug("Fetching dashboard orders")
         filter = {"key": "type", "value": "food"}
-        orders = current_app.order_service.get_dashboard_orders(filter)
+        orders = current_app.order_service.get_dashboard_orders(filter, compact_requested())
         return jsonify({"orders": orders})
     except Exception as e:
         log.exception("Error fetching dashboard orders")
@@ -109,7 +300,7 @@ def get_dashboard_orders_drinks():
         log.debug("Fetching dashboard orders")
         # item type in order_items is recorded as 'drink' (singular)
         filter = {"key": "type", "value": "drink"}
-        orders = current_app.order_service.get_dashboard_orders(filter)
+        orders = current_app.order_service.get_dashboard_orders(filter, compact_requested())
         return jsonify({"orders": orders})
     except Exception as e:
         log.exception("Error fetching dashboard orders")
@@ -216,17 +407,35 @@ def get_printer_status():
     tags:
       - Printer
     summary: Check online availability of food and drink printers and queue size
+    description: Printer availability comes from a background probe cache and never blocks on the network.
     responses:
       200:
-        description: Returns status of food_printer, drinks_printer, and pending order count
+        description: Returns status of every station printer (food_printer, drinks_printer by default) and pending order count
         schema:
           type: object
           properties:
             pending_orders:
               type: integer
               example: 0
+            pending_tickets:
+              type: object
+              description: Tickets queued per printer station (print leader only)
+              example: {"food": 0, "drinks": 1}
+            ticket_wait_ms:
+              type: object
+              description: Wait from order to printed ticket per priority class (print leader only)
+              example: {"rush": {"count": 3, "p50": 850.0, "p95": 1200.0, "max": 1200.0}, "normal": {"count": 40, "p50": 2100.0, "p95": 9800.0, "max": 11000.0}, "max_wait_seconds": 120.0}
+            admission:
+              type: object
+              description: Admission policy and threshold, and per station the pending tickets (all worker processes), measured seconds per ticket and estimated wait
+              example: {"policy": "flag", "max_backlog": 50, "estimated_wait_seconds": 36.0, "stations": {"food": {"pending": 12, "ticket_seconds": 3.0, "measured": true, "estimated_wait_seconds": 36.0}}}
+            print_leader:
+              type: boolean
+              description: Whether this worker process currently owns printing
+              example: true
             printer_status:
               type: object
+              description: One '<station>_printer' entry per configured printer station
               properties:
                 food_printer:
                   type: object
@@ -237,6 +446,14 @@ def get_printer_status():
                     type:
                       type: string
                       example: "physical"
+                    latency_ms:
+                      type: number
+                      description: Connect latency of the last background probe
+                      example: 4.2
+                    last_change:
+                      type: number
+                      description: Unix time the availability last flipped
+                      example: 1760000000.0
                 drinks_printer:
                   type: object
                   properties:
@@ -254,4 +471,35 @@ def get_printer_status():
         return jsonify(status)
     except Exception as e:
         log.exception("Error fetching printer status")
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+
+@order_bp.route("/printer/health", methods=["GET"])
+def get_printer_health():
+    """
+    Get rolling printer health statistics
+    ---
+    tags:
+      - Printer
+    summary: Availability percentage and connect-latency histogram per printer and time window
+    responses:
+      200:
+        description: Per-printer stats keyed by window (e.g. "60s", "900s", "3600s")
+        schema:
+          type: object
+          properties:
+            monitoring:
+              type: boolean
+              description: False when printers are mocked or background probing is disabled
+              example: true
+            printers:
+              type: object
+      500:
+        description: Server error
+    """
+    try:
+        health = current_app.order_service.get_printer_health()
+        return jsonify({"monitoring": health is not None, "printers": health or {}})
+    except Exception as e:
+        log.exception("Error fetching printer health")
+        return jsonify({"error": str(e)}), 500
@@ -16,6 +16,10 @@ class MockPrinter:
     def print_order(self, *args, **kwargs):
         log.info("Mock: Printing order")
 
+    def print_orders(self, tickets):
+        log.info(f"Mock: Printing {len(tickets)} order(s) in one session")
+        return [True] * len(tickets)
+
     def is_available(self) -> bool:
         """
         Mock method to simulate printer availability.
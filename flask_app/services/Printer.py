@@ -17,17 +17,30 @@ class DeviceNotFoundError(Error):
 import escpos.exceptions
 escpos.exceptions.DeviceNotFoundError = DeviceNotFoundError
 
-from escpos.printer import Network
+from escpos.printer import Dummy, Network
+
+
+def split_address(address:str, default_port:int=9100):
+    """Split "host" or "host:port" into (host, port)"""
+    host, sep, port = (address or '').rpartition(':')
+    if sep and port.isdigit():
+        return host, int(port)
+    return address, default_port
+
 
 class Printer:
     """
     Printer Class which enables printing of Order Data on a EPSON order printer
     """
 
-    def __init__(self, ip_address:str, logo_path:str=None) -> None:
-        self.ip_address = ip_address
+    def __init__(self, ip_address:str, logo_path:str=None, port:int=9100) -> None:
+        # ip_address may carry its own port ("10.0.0.5:9101"), e.g. for an emulator
+        self.ip_address, self.port = split_address(ip_address, port)
         # self.printer_handle = Network(ip_address, profile='TM-T20II', timeout=3.0)
         self.logo_path = logo_path       
+        # Why the last print_orders() session aborted (None if it didn't), for
+        # the dead-letter queue
+        self.last_error = None
             
     def is_available(self) -> bool:
         """
@@ -35,7 +48,7 @@ class Printer:
         Returns True if printer is online and reachable.
         """
         try:
-            with socket.create_connection((self.ip_address, 9100), 1.0):
+            with socket.create_connection((self.ip_address, self.port), 1.0):
                 return True
         except (socket.timeout, OSError) as e:
             log.debug(f"Printer {self.ip_address} unreachable: {e}")
@@ -58,7 +71,7 @@ class Printer:
         Parameters
             image_path:str      Path of the Image
         """
-        printer = Network(self.ip_address, profile='TM-T20II', timeout=3.0)
+        printer = self._network()
         printer.open()
         printer.image(image_path, impl='graphics', center=True)
         printer.close()
@@ -82,20 +95,17 @@ class Printer:
         printer.textln(f'Gesamt: {total_order_price:>20.2f}€')
 
 
-    def print_order(self, order:Order, items):
+    def _network(self):
+        return Network(self.ip_address, port=self.port, profile='TM-T20II', timeout=3.0)
+
+    def write_ticket(self, printer, order:Order, items) -> None:
+        """Write one ticket to an already opened printer handle (no cut)"""
         table_number = order.table_number
         id = order.id
-        items = items
         comment = order.comment
         timestamp = order.timestamp
 
-        printer = Network(self.ip_address, profile='TM-T20II', timeout=3.0)
-        printer.open()
-
-
-        if items == []:
-            return
-        elif Config.MINIMAL_PRINTER_OUTPUT:
+        if Config.MINIMAL_PRINTER_OUTPUT:
             log.debug(f"Bestellnummer: {id}")
             log.debug(f"Tisch Nr. {table_number}")
             log.debug(f"Kommentar: {comment}")
@@ -116,10 +126,60 @@ class Printer:
                 printer.textln()
                 printer.textln(f'Kommentar:\n{comment}')
 
+    def render_ticket(self, order:Order, items) -> bytes:
+        """ESC/POS bytes of one ticket including its cut, for sending over any transport"""
+        dummy = Dummy(profile='TM-T20II')
+        self.write_ticket(dummy, order, items)
+        dummy.cut()
+        return dummy.output
+
+    def print_order(self, order:Order, items):
+        if items == []:
+            return
+
+        self.last_error = None
+        printer = self._network()
+        printer.open()
+        self.write_ticket(printer, order, items)
+        if not Config.MINIMAL_PRINTER_OUTPUT:
             printer.cut()
         printer.close()
 
         return True
 
+    def print_orders(self, tickets) -> list:
+        """
+        Print several tickets back-to-back over a single connection, with a
+        cut after each one, so a backlog pays connect/close only once.
+
+        Parameters
+            tickets     List of (order, items) tuples
+
+        Returns a list of booleans, one per ticket. Once the connection fails,
+        that ticket and every ticket after it are reported as not printed.
+        """
+        results = [False] * len(tickets)
+        self.last_error = None
+        if not tickets:
+            return results
+
+        printer = self._network()
+        try:
+            printer.open()
+            for index, (order, items) in enumerate(tickets):
+                self.write_ticket(printer, order, items)
+                printer.cut()
+                results[index] = True
+        except Exception as e:
+            self.last_error = repr(e)
+            log.exception(f"Print session to {self.ip_address} aborted after {sum(results)}/{len(tickets)} ticket(s)")
+        finally:
+            try:
+                printer.close()
+            except Exception:
+                log.debug(f"Error closing print session to {self.ip_address}", exc_info=True)
+
+        return results
+
     def __del__(self) -> None:
         pass
@@ -0,0 +1,185 @@
+"""
+Admission control for new orders, based on the print backlog.
+
+While a printer is down, orders keep coming in and their tickets pile up.
+Once the printer is back, the kitchen gets all of them at once. This module
+estimates how long a new order's tickets will wait, and decides what to do
+once a station's backlog reaches ADMISSION_MAX_BACKLOG pending tickets:
+
+- 'reject': refuse the order with BacklogFull. POST /order answers 503 with
+  a Retry-After that covers printing the backlog down below the threshold.
+- 'flag':   accept the order but mark it `delayed` in the response, so the
+  tablet can tell the guest (default)
+- 'off':    accept everything and just report the estimate
+
+The backlog is the number of pending print jobs per station in the
+database. That count is the same for every worker process, and it includes
+jobs spilled out of the in-memory queues. It is cached for a second.
+
+The print time per ticket is measured by the print leader. On every lease
+tick it reads the print session time and the number of tickets printed per
+station from the metrics registry. It folds the new values into a moving
+average and stores that in the `print_throughput` table, so the other
+workers use the same figure. Until a station has printed anything,
+PRINT_TICKET_SECONDS is assumed.
+"""
+import logging
+import math
+import time
+from threading import Lock
+from typing import Dict, Iterable, Optional
+
+from utils import metrics
+
+log = logging.getLogger(__name__)
+
+POLICIES = ("off", "flag", "reject")
+
+
+class BacklogFull(Exception):
+    """The order was refused because a printer station's backlog is over the threshold"""
+
+    def __init__(self, station: str, pending: int, retry_after: int, wait_seconds: float):
+        super().__init__(f"Print backlog of station '{station}' is full ({pending} tickets), retry in {retry_after} seconds")
+        self.station = station
+        self.pending = pending
+        self.retry_after = retry_after
+        self.wait_seconds = wait_seconds
+
+
+class AdmissionControl:
+    """Estimates print waits from the DB backlog and measured throughput, and applies the admission policy"""
+
+    def __init__(self, order_logger, policy: str = "flag", max_backlog: int = 50,
+                 default_ticket_seconds: float = 3.0, smoothing: float = 0.3,
+                 refresh_seconds: float = 1.0, clock=time.monotonic):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown admission policy '{policy}', expected one of {', '.join(POLICIES)}")
+        self.order_logger = order_logger
+        self.policy = policy
+        self.max_backlog = max_backlog
+        self.default_ticket_seconds = default_ticket_seconds
+        self.smoothing = smoothing
+        self.refresh_seconds = refresh_seconds
+        self.clock = clock
+
+        self._lock = Lock()
+        self._backlog: Dict[str, dict] = {}
+        self._refreshed_at = None
+        # Leader only: metric totals at the last throughput update, and the averages
+        self._last_totals: Dict[str, tuple] = self._metric_totals()
+        self._ticket_seconds: Dict[str, float] = {}
+
+    # -- estimate -----------------------------------------------------------
+
+    def _stations(self) -> Dict[str, dict]:
+        """
+        station -> {'pending', 'ticket_seconds' (None until measured)}, refreshed
+        at most every refresh_seconds; the last known values if the DB read fails
+        """
+        with self._lock:
+            now = self.clock()
+            if self._refreshed_at is None or now - self._refreshed_at >= self.refresh_seconds:
+                try:
+                    self._backlog = self.order_logger.get_print_backlog()
+                except Exception as e:
+                    # The database is down: go on with the last known backlog,
+                    # so orders still reach the journal
+                    log.warning(f"Could not read the print backlog, using the last known one: {e}")
+                self._refreshed_at = now
+            return self._backlog
+
+    def _ticket_time(self, info: Optional[dict]) -> float:
+        measured = info.get('ticket_seconds') if info else None
+        return measured if measured else self.default_ticket_seconds
+
+    def _wait(self, info: Optional[dict]) -> float:
+        return (info['pending'] if info else 0) * self._ticket_time(info)
+
+    def estimate(self, stations: Optional[Iterable[str]] = None) -> dict:
+        """
+        Estimated wait until tickets for `stations` (default: every station)
+        are printed, and whether that counts as delayed
+        """
+        backlog = self._stations()
+        stations = list(backlog) if stations is None else list(stations)
+        wait = max((self._wait(backlog.get(station)) for station in stations), default=0.0)
+        delayed = any((backlog.get(station) or {}).get('pending', 0) >= self.max_backlog for station in stations)
+        return {
+            'estimated_wait_seconds': round(wait, 1),
+            'delayed': self.policy != 'off' and delayed,
+        }
+
+    def admit(self, stations: Iterable[str], ahead: Optional[Dict[str, int]] = None):
+        """
+        Apply the policy to an order with tickets for `stations`. Raises
+        BacklogFull under 'reject' if any of them is at the threshold.
+        `ahead` are the tickets per station of earlier orders in the same
+        batch, which are not counted yet. Nothing is counted here: call
+        count() once the order is saved or journaled.
+        """
+        backlog = self._stations()
+        ahead = ahead or {}
+        if self.policy == 'off':
+            return
+        for station in stations:
+            info = backlog.get(station)
+            pending = (info['pending'] if info else 0) + ahead.get(station, 0)
+            if pending < self.max_backlog:
+                continue
+            if self.policy == 'reject':
+                metrics.ORDERS_THROTTLED.inc(action='rejected')
+                retry_after = max(1, math.ceil((pending - self.max_backlog + 1) * self._ticket_time(info)))
+                raise BacklogFull(station, pending, retry_after, pending * self._ticket_time(info))
+            metrics.ORDERS_THROTTLED.inc(action='delayed')
+            break
+
+    def count(self, stations: Iterable[str]):
+        """Count an accepted order's tickets into the cached backlog, until the next refresh"""
+        with self._lock:
+            for station in stations:
+                info = self._backlog.setdefault(station, {'pending': 0, 'ticket_seconds': None})
+                info['pending'] += 1
+
+    def status(self, stations: Iterable[str] = ()) -> dict:
+        """Policy, threshold and the per-station backlog and estimated wait for /printer/status"""
+        backlog = dict(self._stations())
+        for station in stations:
+            backlog.setdefault(station, {'pending': 0, 'ticket_seconds': None})
+        return {
+            'policy': self.policy,
+            'max_backlog': self.max_backlog,
+            'estimated_wait_seconds': self.estimate()['estimated_wait_seconds'],
+            'stations': {
+                station: {
+                    'pending': info['pending'],
+                    'ticket_seconds': round(self._ticket_time(info), 2),
+                    'measured': bool(info.get('ticket_seconds')),
+                    'estimated_wait_seconds': round(self._wait(info), 1),
+                }
+                for station, info in sorted(backlog.items())
+            },
+        }
+
+    # -- throughput (print leader) ------------------------------------------
+
+    @staticmethod
+    def _metric_totals() -> Dict[str, tuple]:
+        """station -> (print session seconds, tickets printed) in this process so far"""
+        seconds = {key[0]: value[1] for key, value in metrics.PRINT_SESSION_SECONDS.samples().items()}
+        return {key[0]: (seconds.get(key[0], 0.0), printed)
+                for key, printed in metrics.TICKETS_PRINTED.samples().items()}
+
+    def update_throughput(self):
+        """Fold the print sessions since the last call into each station's seconds per ticket and store them"""
+        for station, total in self._metric_totals().items():
+            last = self._last_totals.get(station, (0.0, 0.0))
+            self._last_totals[station] = total
+            delta_seconds, delta_tickets = total[0] - last[0], total[1] - last[1]
+            if delta_tickets <= 0 or delta_seconds <= 0:
+                continue
+            sample = delta_seconds / delta_tickets
+            previous = self._ticket_seconds.get(station)
+            average = sample if previous is None else self.smoothing * sample + (1 - self.smoothing) * previous
+            self._ticket_seconds[station] = average
+            self.order_logger.set_print_throughput(station, average)
@@ -0,0 +1,238 @@
+"""
+asyncio print dispatcher: drives every printer station from one event-loop
+thread instead of one blocking worker thread per station.
+
+Jobs are handed over from any thread with `submit()` onto the station's
+thread-safe PrintScheduler queue, waking the station's coroutine through
+`loop.call_soon_threadsafe`. Each coroutine batches its queue, opens a
+non-blocking stream to the printer and writes the tickets, waiting for the
+stream to drain after each one so a slow printer only ever has one ticket
+in flight (per-printer backpressure). Connect and write timeouts, and a reconnect after
+PRINT_RETRY_DELAY_SECONDS, are handled per station, so one dead printer
+never delays the others.
+
+Completions are reported through a single bookkeeping thread, keeping the
+SQLite writes off the event loop. A ticket that cannot even be rendered is
+reported through `on_failed` and skipped, so the rest of the batch still
+goes out.
+"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from queue import Empty
+from threading import Event, Thread
+from typing import Callable, Dict, List
+
+from models import PrintJob
+from services.print_scheduler import PrintScheduler
+from utils import metrics
+
+log = logging.getLogger(__name__)
+
+
+class AsyncPrintDispatcher:
+    """Prints PrintJobs on any number of station printers from one asyncio thread"""
+
+    def __init__(self, printers: Dict[str, object], batch_size: int = 10, connect_timeout: float = 3.0,
+                 write_timeout: float = 10.0, retry_delay: float = 10.0):
+        """
+        Parameters
+            printers        station name -> Printer (address and ticket rendering)
+            batch_size      max tickets sent over one connection
+            connect_timeout seconds to wait for a printer to accept the connection
+            write_timeout   seconds to wait for a printer to take one ticket
+            retry_delay     seconds before reconnecting after a failure
+        """
+        self.printers = dict(printers)
+        self.batch_size = batch_size
+        self.connect_timeout = connect_timeout
+        self.write_timeout = write_timeout
+        self.retry_delay = retry_delay
+
+        self.load: Callable[[str, List[PrintJob]], None] = None
+        self.on_printed: Callable[[PrintJob], None] = lambda job: None
+        self.on_dropped: Callable[[PrintJob], None] = lambda job: None
+        self.on_failed: Callable[[PrintJob, str], bool] = lambda job, error: False
+        self.should_print: Callable[[], bool] = lambda: True
+
+        self.queues = {station: PrintScheduler() for station in self.printers}
+        self._loop = None
+        self._wakeups: Dict[str, asyncio.Event] = {}
+        self._thread = None
+        self._ready = Event()
+        self._bookkeeping = ThreadPoolExecutor(max_workers=1, thread_name_prefix="print-bookkeeping")
+
+    def start(self, on_printed=None, on_dropped=None, should_print=None, load=None, on_failed=None):
+        """
+        Start the event-loop thread.
+
+        load(station, jobs) fills in job.order / job.items before printing,
+        on_printed(job) runs after a ticket went out, on_dropped(job) for
+        tickets discarded because should_print() returned False (e.g. lost
+        print leadership), on_failed(job, error) for a ticket that failed to
+        render, returning True if it should be given up on (dead-lettered);
+        all of them run on the bookkeeping thread.
+        """
+        if load:
+            self.load = load
+        if on_failed:
+            self.on_failed = on_failed
+        if on_printed:
+            self.on_printed = on_printed
+        if on_dropped:
+            self.on_dropped = on_dropped
+        if should_print:
+            self.should_print = should_print
+        self._thread = Thread(target=self._run, daemon=True, name="print-dispatcher")
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._wakeups = {station: asyncio.Event() for station in self.printers}
+        tasks = [self._loop.create_task(self._station_worker(station)) for station in self.printers]
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+            self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self._loop.close()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the event loop; queued tickets are dropped (they stay pending in the DB)"""
+        if self._loop is not None and self._thread is not None and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout)
+        self._bookkeeping.shutdown(wait=True)
+
+    def submit(self, job: PrintJob):
+        """Queue a job on its station; safe to call from any thread"""
+        self.queues[job.station].put(job)
+        self._loop.call_soon_threadsafe(self._wakeups[job.station].set)
+
+    def submit_many(self, station: str, jobs: List[PrintJob]):
+        """Queue several jobs of one station and wake it once"""
+        self.queues[station].put_many(jobs)
+        self._loop.call_soon_threadsafe(self._wakeups[station].set)
+
+    def qsize(self, station: str) -> int:
+        """Tickets waiting for a station"""
+        return self.queues[station].qsize()
+
+    def clear(self) -> List[PrintJob]:
+        """Remove and return every queued job"""
+        return [job for queue in self.queues.values() for job in queue.drain()]
+
+    def _report(self, callback, job):
+        def run():
+            try:
+                callback(job)
+            except Exception:
+                log.exception(f"Error handling print job {job.id} (order #{job.order_id})")
+        self._bookkeeping.submit(run)
+
+    def _top_up(self, queue: PrintScheduler, batch: List[PrintJob]) -> List[PrintJob]:
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(queue.get_nowait())
+            except Empty:
+                break
+        return batch
+
+    async def _next_batch(self, station: str, batch: List[PrintJob]) -> List[PrintJob]:
+        """Top up the retained batch, waiting for a submit() while there is nothing to print"""
+        queue = self.queues[station]
+        wakeup = self._wakeups[station]
+        while True:
+            wakeup.clear()
+            batch = self._top_up(queue, batch)
+            if batch:
+                return batch
+            await wakeup.wait()
+
+    async def _station_worker(self, station: str):
+        """Print one station's queue forever, keeping failed tickets at the head"""
+        queue = self.queues[station]
+        printer = self.printers[station]
+        pending: List[PrintJob] = []
+        while True:
+            try:
+                pending = await self._next_batch(station, pending)
+
+                if not self.should_print():
+                    for job in pending:
+                        self._report(self.on_dropped, job)
+                    pending = []
+                    continue
+
+                if self.load:
+                    await self._loop.run_in_executor(self._bookkeeping, self.load, station, pending)
+                tickets, failed = await self._render(printer, pending)
+                sent = 0
+                if tickets:
+                    with metrics.PRINT_SESSION_SECONDS.time(station=station):
+                        sent = await self._send(station, printer, [data for _, data in tickets])
+                    metrics.TICKETS_PRINTED.inc(sum(data is not None for _, data in tickets[:sent]), station=station)
+                for job, _ in tickets[:sent]:
+                    queue.task_done(job)
+                    self._report(self.on_printed, job)
+                unsent = [job for job, _ in tickets[sent:]]
+                pending = failed + unsent
+
+                if unsent:
+                    metrics.PRINT_RETRIES.inc(len(unsent), station=station, reason='print_failed')
+                    log.warning(f"Printer '{station}': {len(unsent)} ticket(s) not printed, reconnecting in {self.retry_delay} seconds")
+                    await asyncio.sleep(self.retry_delay)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception(f"Error in print dispatcher for station '{station}'")
+                await asyncio.sleep(self.retry_delay)
+
+    async def _render(self, printer, jobs: List[PrintJob]):
+        """
+        ESC/POS bytes per job (None for jobs without items). Returns
+        ([(job, bytes)], [jobs to retry]); jobs whose rendering failed are
+        reported to on_failed and dropped once it gives up on them.
+        """
+        tickets, failed = [], []
+        for job in jobs:
+            try:
+                tickets.append((job, printer.render_ticket(job.order, job.items) if job.items else None))
+            except Exception as e:
+                log.exception(f"Could not render print job {job.id} (order #{job.order_id})")
+                if not await self._loop.run_in_executor(self._bookkeeping, self.on_failed, job, repr(e)):
+                    failed.append(job)
+        return tickets, failed
+
+    async def _send(self, station: str, printer, tickets: List[bytes]) -> int:
+        """Write rendered tickets back-to-back over one connection; returns how many went out"""
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(printer.ip_address, printer.port), self.connect_timeout
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            log.warning(f"Printer '{station}' ({printer.ip_address}:{printer.port}) unreachable: {e!r}")
+            return 0
+
+        sent = 0
+        try:
+            for data in tickets:
+                if data is not None:
+                    writer.write(data)
+                    # Backpressure: the next ticket waits until the printer took this one
+                    await asyncio.wait_for(writer.drain(), self.write_timeout)
+                sent += 1
+        except (OSError, asyncio.TimeoutError) as e:
+            log.warning(f"Print session to '{station}' aborted after {sent}/{len(tickets)} ticket(s): {e!r}")
+        finally:
+            writer.close()
+            try:
+                await asyncio.wait_for(writer.wait_closed(), self.write_timeout)
+            except (OSError, asyncio.TimeoutError):
+                pass
+        return sent
@@ -0,0 +1,114 @@
+"""
+Idempotency keys for POST /order.
+
+A tablet that retries a request whose response got lost sends the same
+`Idempotency-Key` header again. The key is saved with the order in the same
+transaction (unique index in the `idempotency_keys` table), so a retry
+can never insert or print the order twice, not even when both requests run
+at once in different worker processes. The response body is stored once it
+is known, and a retry gets exactly that response back.
+
+Recent keys are also kept in an in-memory LRU of IDEMPOTENCY_CACHE_SIZE
+entries, so most retries are answered without touching SQLite. Keys expire
+after IDEMPOTENCY_TTL_SECONDS. After that the same key places a new order.
+"""
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+log = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyKeyExists(Exception):
+    """An order was already saved under this key (e.g. by a concurrent retry)"""
+
+    def __init__(self, key: str):
+        super().__init__(f"Idempotency key {key!r} is already used")
+        self.key = key
+
+
+class IdempotentResult:
+    """What a key was used for: the order and, once stored, the response body"""
+    __slots__ = ("order_id", "request_hash", "response", "created_at")
+
+    def __init__(self, order_id: int, request_hash: Optional[str], response: Optional[str], created_at: float):
+        self.order_id = order_id
+        self.request_hash = request_hash
+        self.response = response
+        self.created_at = created_at
+
+
+def request_hash(data) -> str:
+    """
+    Fingerprint of a parsed JSON order, to detect a key reused for a different
+    order. Key order and whitespace don't matter, so POST /order and
+    /orders/batch agree on the same order.
+    """
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class IdempotencyStore:
+    """Idempotency keys in SQLite (authoritative) fronted by a bounded LRU"""
+
+    def __init__(self, order_logger, ttl_seconds: float = 86400.0, cache_size: int = 10000):
+        self.order_logger = order_logger
+        self.ttl = ttl_seconds
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, IdempotentResult]" = OrderedDict()
+        self._lock = Lock()
+        self._next_purge = 0.0
+
+    def lookup(self, key: str) -> Optional[IdempotentResult]:
+        """The unexpired result stored under `key`, if any"""
+        now = time.time()
+        with self._lock:
+            result = self._cache.get(key)
+            if result is not None:
+                if result.created_at >= now - self.ttl:
+                    self._cache.move_to_end(key)
+                    if result.response is not None:
+                        return result
+                else:
+                    del self._cache[key]
+                    result = None
+        # Not cached, or saved by another request/process whose response
+        # wasn't known yet
+        row = self.order_logger.get_idempotency_key(key, now - self.ttl)
+        if row is None:
+            return None
+        result = IdempotentResult(row['order_id'], row['request_hash'], row['response'], row['created_at'])
+        self._remember(key, result)
+        return result
+
+    def record_response(self, key: str, order_id: int, req_hash: Optional[str], response: str):
+        """Store the response of the request that placed the order under `key`"""
+        self.order_logger.set_idempotency_response(key, response)
+        self._remember(key, IdempotentResult(order_id, req_hash, response, time.time()))
+        self._purge_expired()
+
+    def _remember(self, key: str, result: IdempotentResult):
+        with self._lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _purge_expired(self):
+        """Delete expired keys from the DB, at most every tenth of the TTL"""
+        now = time.time()
+        if now < self._next_purge:
+            return
+        self._next_purge = now + max(self.ttl / 10, 1.0)
+        try:
+            removed = self.order_logger.delete_expired_idempotency_keys(now - self.ttl)
+            if removed:
+                log.info(f"Removed {removed} expired idempotency key(s)")
+        except Exception:
+            log.exception("Error removing expired idempotency keys")
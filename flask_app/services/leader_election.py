@@ -0,0 +1,168 @@
+"""
+Lease-based leader election backed by SQLite.
+
+When the API runs under several worker processes (e.g. gunicorn with
+--workers > 1) every process builds its own OrderService. Only one of them
+may own the print queue, otherwise each process would print every pending
+ticket. The processes compete for a single named row in the `leases` table:
+whoever holds an unexpired lease is the leader and keeps renewing it; if the
+leader dies, its lease runs out and another process takes over on its next
+renewal tick.
+"""
+import logging
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Event, Thread
+
+log = logging.getLogger(__name__)
+
+
+def make_holder_id():
+    """Unique id for one lease holder: host, pid and a per-instance suffix."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LeaderElection:
+    """Acquires and renews a named lease row; tracks whether we are the leader."""
+
+    def __init__(self, db_path, name="print_worker", lease_seconds=5.0,
+                 renew_interval=1.0, holder_id=None):
+        self.db_path = db_path
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.renew_interval = renew_interval
+        self.holder_id = holder_id or make_holder_id()
+        self.is_leader = False
+
+        self._on_elected = None
+        self._on_demoted = None
+        self._on_tick = None
+        self._stop_event = Event()
+        self._thread = None
+        self.init_database()
+
+    def init_database(self):
+        """Create the leases table if it doesn't exist"""
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self.get_connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS leases (
+                    name TEXT PRIMARY KEY,
+                    holder TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+            conn.commit()
+
+    @contextmanager
+    def get_connection(self):
+        """Context manager for database connections"""
+        conn = sqlite3.connect(self.db_path, timeout=self.lease_seconds)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def try_acquire(self):
+        """Acquire the lease, or renew it if we already hold it.
+
+        The upsert only overwrites the row when it is ours or has expired, so
+        two processes racing for an expired lease can't both win.
+
+        Returns:
+            bool: True if we hold the lease after this call.
+        """
+        now = time.time()
+        with self.get_connection() as conn:
+            cursor = conn.execute('''
+                INSERT INTO leases (name, holder, expires_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT(name) DO UPDATE
+                    SET holder = excluded.holder, expires_at = excluded.expires_at
+                    WHERE leases.holder = excluded.holder OR leases.expires_at < ?
+            ''', (self.name, self.holder_id, now + self.lease_seconds, now))
+            conn.commit()
+            return cursor.rowcount > 0
+
+    def release(self):
+        """Give up the lease immediately so a standby can take over without waiting for expiry"""
+        with self.get_connection() as conn:
+            conn.execute(
+                'DELETE FROM leases WHERE name = ? AND holder = ?',
+                (self.name, self.holder_id)
+            )
+            conn.commit()
+        self._set_leader(False)
+
+    def current_holder(self):
+        """Return (holder_id, expires_at) of the current lease, or None"""
+        with self.get_connection() as conn:
+            row = conn.execute(
+                'SELECT holder, expires_at FROM leases WHERE name = ?', (self.name,)
+            ).fetchone()
+            return tuple(row) if row else None
+
+    def tick(self):
+        """Run one acquire/renew round and fire callbacks on role changes"""
+        try:
+            acquired = self.try_acquire()
+        except sqlite3.Error as e:
+            # Can't tell whether our lease is still valid — step down rather
+            # than risk two leaders printing the same tickets.
+            log.warning(f"Lease '{self.name}' renewal failed: {e}")
+            acquired = False
+
+        self._set_leader(acquired)
+        if self.is_leader and self._on_tick:
+            self._on_tick()
+
+    def _set_leader(self, leader):
+        if leader == self.is_leader:
+            return
+        self.is_leader = leader
+        if leader:
+            log.info(f"Acquired lease '{self.name}' as {self.holder_id}")
+            if self._on_elected:
+                self._on_elected()
+        else:
+            log.info(f"Lost lease '{self.name}' ({self.holder_id})")
+            if self._on_demoted:
+                self._on_demoted()
+
+    def start(self, on_elected=None, on_demoted=None, on_tick=None):
+        """Try to acquire right away, then keep renewing in a background thread.
+
+        Args:
+            on_elected: Called when this instance becomes leader.
+            on_demoted: Called when this instance loses the lease.
+            on_tick: Called after every successful renewal while leader.
+        """
+        self._on_elected = on_elected
+        self._on_demoted = on_demoted
+        self._on_tick = on_tick
+        self.tick()
+        self._thread = Thread(target=self._run, daemon=True, name=f"lease-{self.name}")
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop_event.wait(self.renew_interval):
+            try:
+                self.tick()
+            except Exception:
+                log.exception(f"Error in lease loop for '{self.name}'")
+
+    def stop(self, release=True):
+        """Stop the renewal thread and (by default) release the lease"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=self.renew_interval + 1)
+        if release:
+            try:
+                self.release()
+            except sqlite3.Error as e:
+                log.warning(f"Could not release lease '{self.name}': {e}")
@@ -0,0 +1,88 @@
+"""
+Menu catalog: server-side validation and pricing of incoming orders.
+
+Clients send each item's id together with its name, price and type, but
+only the id and quantity are trusted. The catalog indexes menu.json by item
+id once per menu load, so checking an order is one dict lookup per item:
+
+    catalog = MenuCatalog(load_menu())
+    catalog.price_order(order)  # raises InvalidOrderError, else fixes up the items
+
+Name, price and type of every item are overwritten from the menu.
+The catalog doesn't watch menu.json itself. The app subscribes
+`load_menu()` to the MenuCache (utils/menu_cache.py), and a new index is
+swapped in when MenuCache.get() notices an edit. GET /menu, POST /order and
+POST /orders/batch call get(), so an order is priced from the current menu.
+"""
+import logging
+from typing import Any, Dict, List, NamedTuple
+
+from models import Order
+
+log = logging.getLogger(__name__)
+
+
+class InvalidOrderError(ValueError):
+    """The order doesn't match the menu (unknown item, bad quantity, no items, ...)"""
+
+
+class CatalogEntry(NamedTuple):
+    name: str
+    price: float
+    type: str
+    category: str
+
+
+class MenuCatalog:
+    """Menu items indexed by id"""
+
+    def __init__(self, menu: Dict[str, List[Dict[str, Any]]] = None):
+        self.index: Dict[int, CatalogEntry] = {}
+        if menu:
+            self.load_menu(menu)
+
+    def load_menu(self, menu: Dict[str, List[Dict[str, Any]]]):
+        """Rebuild the id index for a (re)loaded menu"""
+        index = {}
+        for category, items in menu.items():
+            for item in items:
+                item_id = item.get("id")
+                if item_id is None or item_id in index:
+                    log.warning(f"Menu item without id or with duplicate id skipped: {item}")
+                    continue
+                index[item_id] = CatalogEntry(item["name"], float(item["price"]), item.get("type", "food"), category)
+        self.index = index  # swapped whole, readers never see a partial index
+        log.info(f"Menu catalog: {len(index)} item(s)")
+
+    def price_order(self, order: Order) -> Order:
+        """
+        Check the order against the menu and take name, price and type of
+        each item from the menu. Raises InvalidOrderError without changing
+        the order if anything doesn't match.
+        """
+        if order.table_number <= 0:
+            raise InvalidOrderError("tableNumber must be a positive integer")
+        if not order.items:
+            raise InvalidOrderError("Order must contain at least one item")
+
+        index = self.index
+        entries = []
+        for item in order.items:
+            entry = index.get(item.id)
+            if entry is None:
+                raise InvalidOrderError(f"Unknown menu item id {item.id!r} ({item.name!r})")
+            if item.quantity < 1:
+                raise InvalidOrderError(f"Quantity of {entry.name!r} must be at least 1")
+            entries.append(entry)
+
+        repriced = 0
+        for item, entry in zip(order.items, entries):
+            if item.price != entry.price:
+                repriced += 1
+            item.name = entry.name
+            item.price = entry.price
+            item.type = entry.type
+        order.invalidate()
+        if repriced:
+            log.info(f"Order for table {order.table_number}: {repriced} item price(s) taken from the menu instead of the client")
+        return order
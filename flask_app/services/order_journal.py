@@ -0,0 +1,248 @@
+"""
+Durable append-only journal for orders that could not be saved to SQLite.
+
+When the database write fails, process_order appends the order to the
+journal instead and only answers the tablet once the record is on disk. The
+order is later replayed into SQLite and the print queue, so it is printed
+as soon as the database works again, and it is never lost.
+
+Records are NDJSON lines prefixed with the CRC32 of the JSON:
+
+    <crc32 as 8 hex digits> {"id": ..., "ts": ..., "order": {...}, ...}
+
+A writer thread owns the open segment file. Callers hand records over and
+block until the line is fsynced. Everything queued while one fsync is
+running goes out with the next single write + fsync (group commit). Under
+load that is one fsync for up to JOURNAL_MAX_BATCH orders, not one per order.
+
+Each process writes its own segment files, `<ms timestamp>-<pid>.ndjson`,
+and holds an flock on the one it is writing (POSIX only). A replay first
+rotates the active segment. It then applies closed segments oldest first
+and deletes each segment once it is applied. Segments left behind by a dead
+process are replayed by any other process. Replay is idempotent: every
+record is saved under an idempotency key (the client's Idempotency-Key, or
+the record id), so replaying a segment twice, e.g. after a crash halfway
+through, saves nothing twice. A torn last line was never fsynced, so its
+request was never answered, and it is skipped. A line with a bad CRC is
+logged. Its segment is kept as `.bad` for inspection.
+"""
+import json
+import logging
+import os
+import time
+import uuid
+import zlib
+from pathlib import Path
+from queue import Empty, Queue
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows: single process, no segment locking
+    fcntl = None
+
+log = logging.getLogger(__name__)
+
+SUFFIX = ".ndjson"
+
+
+class JournalError(Exception):
+    """A record could not be written to the journal"""
+
+
+def encode_record(record: Dict[str, Any]) -> bytes:
+    body = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return b"%08x %s\n" % (zlib.crc32(body), body)
+
+
+def decode_line(line: bytes) -> Optional[Dict[str, Any]]:
+    """The record in a journal line, or None if the line is torn or its CRC doesn't match"""
+    if not line.endswith(b"\n") or len(line) < 10 or line[8:9] != b" ":
+        return None
+    body = line[9:-1]
+    try:
+        if int(line[:8], 16) != zlib.crc32(body):
+            return None
+        return json.loads(body)
+    except ValueError:
+        return None
+
+
+def read_segment(path) -> Tuple[List[Dict[str, Any]], int]:
+    """Records of a segment file and the number of corrupt lines (a torn last line doesn't count)"""
+    records, corrupt = [], 0
+    with open(path, "rb") as f:
+        lines = f.readlines()
+    for number, line in enumerate(lines):
+        record = decode_line(line)
+        if record is not None:
+            records.append(record)
+        elif number == len(lines) - 1 and not line.endswith(b"\n"):
+            log.warning(f"Ignoring torn last record of journal segment {path} (it was never acknowledged)")
+        else:
+            corrupt += 1
+            log.error(f"Corrupt record in journal segment {path}, line {number + 1}")
+    return records, corrupt
+
+
+class _Pending:
+    __slots__ = ("line", "done", "error")
+
+    def __init__(self, line: bytes):
+        self.line = line
+        self.done = Event()
+        self.error = None
+
+
+class OrderJournal:
+    """Append-only, fsynced order journal with a group-committing writer thread"""
+
+    def __init__(self, directory, max_batch: int = 256):
+        self.directory = Path(directory)
+        self.max_batch = max_batch
+        self._queue: "Queue[_Pending]" = Queue()
+        self._file = None
+        self._file_lock = Lock()     # the open segment: writer thread vs. rotate()
+        self._replay_lock = Lock()
+        self._stopped = Event()
+        self._thread = None
+
+    def append(self, record: Dict[str, Any], timeout: Optional[float] = None) -> str:
+        """
+        Write a record and wait until it is fsynced. Adds an "id" and "ts"
+        unless the record has them, and returns the id.
+        Raises JournalError if the record could not be written.
+        """
+        return self.append_many([record], timeout)[0]
+
+    def append_many(self, records: List[Dict[str, Any]], timeout: Optional[float] = None) -> List[str]:
+        """Like append() for several records, written together"""
+        pending = []
+        for record in records:
+            record.setdefault("id", uuid.uuid4().hex)
+            record.setdefault("ts", time.time())
+            pending.append(_Pending(encode_record(record)))
+        self._ensure_writer()
+        for p in pending:
+            self._queue.put(p)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for p in pending:
+            if not p.done.wait(None if deadline is None else max(deadline - time.monotonic(), 0)):
+                raise JournalError(f"Journal write of {len(records)} record(s) timed out")
+            if p.error is not None:
+                raise JournalError(f"Journal write failed: {p.error}") from p.error
+        return [record["id"] for record in records]
+
+    def _ensure_writer(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._file_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._stopped.clear()
+                    self._thread = Thread(target=self._run, daemon=True, name="order-journal")
+                    self._thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set() or not self._queue.empty():
+            try:
+                batch = [self._queue.get(timeout=0.2)]
+            except Empty:
+                continue
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except Empty:
+                    break
+            error = None
+            try:
+                with self._file_lock, metrics.JOURNAL_FSYNC_SECONDS.time():
+                    f = self._open_segment()
+                    f.write(b"".join(p.line for p in batch))
+                    f.flush()
+                    os.fsync(f.fileno())
+            except Exception as e:
+                log.exception(f"Error writing {len(batch)} record(s) to the order journal")
+                error = e
+            for p in batch:
+                p.error = error
+                p.done.set()
+
+    def _open_segment(self):
+        if self._file is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / f"{int(time.time() * 1000):013d}-{os.getpid()}{SUFFIX}"
+            self._file = open(path, "ab")
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            # Make the new file's directory entry durable too
+            if hasattr(os, "O_DIRECTORY"):
+                fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+        return self._file
+
+    def rotate(self):
+        """Close the segment being written (if any) so it can be replayed"""
+        with self._file_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def has_segments(self) -> bool:
+        """Whether any records are waiting for replay (cheap: one directory listing)"""
+        try:
+            return any(entry.name.endswith(SUFFIX) for entry in os.scandir(self.directory))
+        except FileNotFoundError:
+            return False
+
+    def replay(self, apply: Callable[[List[Dict[str, Any]]], None]) -> int:
+        """
+        Hand the records of every closed segment (this process' and those of
+        dead processes) to `apply`, oldest segment first, and delete each
+        segment once `apply` returned. If `apply` raises, that segment and the
+        later ones stay for the next replay. Returns the number of records applied.
+        """
+        if not self._replay_lock.acquire(blocking=False):
+            return 0
+        try:
+            self.rotate()
+            applied = 0
+            for path in sorted(self.directory.glob(f"*{SUFFIX}")):
+                try:
+                    handle = open(path, "rb")
+                except FileNotFoundError:
+                    continue  # Another process just finished it
+                with handle:
+                    if fcntl is not None:
+                        try:
+                            # Held by a live writer or another replay: skip
+                            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        except OSError:
+                            continue
+                    if not path.exists():
+                        continue
+                    records, corrupt = read_segment(path)
+                    if records:
+                        apply(records)
+                    if corrupt:
+                        bad = path.with_suffix(".bad")
+                        path.rename(bad)
+                        log.error(f"Journal segment {path.name} had {corrupt} corrupt record(s), kept as {bad.name}")
+                    else:
+                        path.unlink()
+                applied += len(records)
+                metrics.JOURNAL_RECORDS_REPLAYED.inc(len(records))
+            return applied
+        finally:
+            self._replay_lock.release()
+
+    def close(self, timeout: float = 5.0):
+        """Write what is queued, stop the writer thread and close the segment"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.rotate()
@@ -1,10 +1,23 @@
 import sqlite3
+import time
 from datetime import datetime, timedelta
 from contextlib import contextmanager
 from pathlib import Path
 from config import Config
+from utils import metrics
+from utils.request_timing import track_db
 import logging
 
+
+# Max order ids per `IN (...)` when loading items; SQLite caps bound parameters
+ITEMS_QUERY_CHUNK = 500
+
+
+def timed_write(method):
+    """Record the latency of a write method in the db_write_seconds histogram"""
+    return metrics.DB_WRITE_SECONDS.timed(method=method.__name__)(method)
+
+
 class OrderLogger:
     """SQLite-based order logging system"""
 
@@ -20,6 +33,10 @@ class OrderLogger:
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
 
+            # WAL lets several worker processes read while one writes, instead
+            # of every dashboard poll blocking on an order insert.
+            cursor.execute('PRAGMA journal_mode=WAL')
+
             # Create orders table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS orders (
@@ -32,13 +49,14 @@ class OrderLogger:
                     status TEXT DEFAULT 'pending',
                     food_processed BOOLEAN DEFAULT FALSE,
                     drink_processed BOOLEAN DEFAULT FALSE,
+                    rush BOOLEAN DEFAULT FALSE,
                     created_at DATETIME DEFAULT CURRENT_TIMESTAMP
                 )
             ''')
 
             # Migration: add new columns to existing databases that still use the
             # old single `processed` column (or are missing the new ones entirely).
-            for col in ('food_processed', 'drink_processed'):
+            for col in ('food_processed', 'drink_processed', 'rush'):
                 try:
                     cursor.execute(
                         f'ALTER TABLE orders ADD COLUMN {col} BOOLEAN DEFAULT FALSE'
@@ -76,25 +94,108 @@ class OrderLogger:
                 ON orders (status)
             ''')
 
+            # Items are loaded per order (dashboards, print leader)
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_order_items_order_id
+                ON order_items (order_id)
+            ''')
+
+            # One print job per (order, printer station); the order counts as
+            # printed once all of its jobs are
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS print_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    order_id INTEGER NOT NULL,
+                    station TEXT NOT NULL,
+                    status TEXT DEFAULT 'pending',
+                    created_at DATETIME DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now')),
+                    printed_at DATETIME,
+                    FOREIGN KEY (order_id) REFERENCES orders (id)
+                )
+            ''')
+
+            # Migration: failure tracking for the dead-letter queue
+            for col, definition in (('attempts', 'INTEGER DEFAULT 0'), ('last_error', 'TEXT')):
+                try:
+                    cursor.execute(f'ALTER TABLE print_jobs ADD COLUMN {col} {definition}')
+                except Exception:
+                    pass  # column already exists – that's fine
+
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_print_jobs_status
+                ON print_jobs (status)
+            ''')
+
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_print_jobs_order_id
+                ON print_jobs (order_id)
+            ''')
+
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_print_jobs_status_station
+                ON print_jobs (status, station)
+            ''')
+
+            # Seconds per printed ticket per station, measured by the print
+            # leader (see services/admission.py); updated_at is unix time
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS print_throughput (
+                    station TEXT PRIMARY KEY,
+                    ticket_seconds REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            ''')
+
+            # Idempotency-Key of POST /order -> the order it placed (see
+            # services/idempotency.py); created_at is unix time
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS idempotency_keys (
+                    key TEXT NOT NULL,
+                    order_id INTEGER NOT NULL,
+                    request_hash TEXT,
+                    response TEXT,
+                    created_at REAL NOT NULL
+                )
+            ''')
+
+            cursor.execute('''
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_idempotency_keys_key
+                ON idempotency_keys (key)
+            ''')
+
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_idempotency_keys_created_at
+                ON idempotency_keys (created_at)
+            ''')
+
             conn.commit()
 
     @contextmanager
     def get_connection(self):
-        """Context manager for database connections"""
+        """Context manager for database connections (timed for the current HTTP request, if any)"""
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row  # Enable dict-like access to rows
         try:
-            yield conn
+            with track_db(conn):
+                yield conn
         finally:
             conn.close()
 
-    def save_order(self, data, user_agent=None):
+    @timed_write
+    def save_order(self, data, user_agent=None, stations=None, idempotency_key=None,
+                   request_hash=None, idempotency_ttl=None):
         """
         Save an order to the database
 
         Args:
             data (Order or dict): Order instance or dict containing order details
             user_agent (str): User agent string from request headers
+            stations (list): Printer stations to create print jobs for, in the
+                same transaction as the order
+            idempotency_key (str): Saved with the order in the same transaction;
+                raises IdempotencyKeyExists (and saves nothing) if an order with
+                this key was saved less than idempotency_ttl seconds ago
+            request_hash (str): Fingerprint of the request, kept with the key
 
         Returns:
             int: The ID of the created order
@@ -102,52 +203,133 @@ class OrderLogger:
         from models import Order
         order = data if isinstance(data, Order) else Order.from_dict(data)
 
-        timestamp = datetime.now().isoformat()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            order_id = self._insert_order(cursor, order, user_agent, stations)
+            if idempotency_key is not None:
+                self._insert_idempotency_key(cursor, idempotency_key, order_id, request_hash, idempotency_ttl)
+            conn.commit()
+            return order_id
+
+    @timed_write
+    def save_orders(self, entries, idempotency_ttl=None):
+        """
+        Save several orders in a single transaction (POST /orders/batch)
+
+        Args:
+            entries (list): (order, user_agent, stations, idempotency_key,
+                request_hash) per order, as for save_order
+            idempotency_ttl (float): As for save_order
 
+        Returns:
+            list: (order_id, created) per entry, in the same order. An entry
+            whose idempotency key was already used isn't saved again;
+            it gets the id of the order saved under that key and False.
+        """
+        from services.idempotency import IdempotencyKeyExists
+        results = []
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            # Explicit, so releasing a savepoint doesn't commit; IMMEDIATE
+            # takes the write lock before the first insert
+            cursor.execute('BEGIN IMMEDIATE')
+            for order, user_agent, stations, idempotency_key, request_hash in entries:
+                cursor.execute('SAVEPOINT batch_order')
+                order_id = self._insert_order(cursor, order, user_agent, stations)
+                created = True
+                if idempotency_key is not None:
+                    try:
+                        self._insert_idempotency_key(cursor, idempotency_key, order_id, request_hash, idempotency_ttl)
+                    except IdempotencyKeyExists:
+                        cursor.execute('ROLLBACK TO batch_order')
+                        cursor.execute('SELECT order_id FROM idempotency_keys WHERE key = ?', (idempotency_key,))
+                        order_id, created = cursor.fetchone()[0], False
+                        order.id = order_id
+                cursor.execute('RELEASE batch_order')
+                results.append((order_id, created))
+            conn.commit()
+        return results
+
+    def _insert_order(self, cursor, order, user_agent, stations):
+        """Insert an order with its items and print jobs; returns its id"""
+        # Determine which item types are present in this order so we can
+        # pre-set the non-relevant processed flag to TRUE right away.
+        item_types = {item.type for item in order.items}
+        food_processed = 0 if 'food' in item_types else 1
+        drink_processed = 0 if 'drink' in item_types else 1
+
+        # Insert order
+        cursor.execute('''
+            INSERT INTO orders
+                (timestamp, table_number, user_agent, comment, total_price,
+                 food_processed, drink_processed, rush)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            datetime.now().isoformat(),
+            order.table_number,
+            user_agent or order.user_agent,
+            order.comment,
+            order.total_price,
+            food_processed,
+            drink_processed,
+            order.rush,
+        ))
+
+        order_id = cursor.lastrowid
+        order.id = order_id
+
+        # Insert order items
+        cursor.executemany('''
+            INSERT INTO order_items (order_id, item_id, item_name, item_type, price, quantity)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', [(order_id, item.id, item.name, item.type, item.price, item.quantity) for item in order.items])
+
+        cursor.executemany(
+            'INSERT INTO print_jobs (order_id, station) VALUES (?, ?)',
+            [(order_id, station) for station in stations or []]
+        )
+        return order_id
+
+    def _insert_idempotency_key(self, cursor, key, order_id, request_hash, ttl):
+        from services.idempotency import IdempotencyKeyExists
+        now = time.time()
+        if ttl is not None:
+            # An expired key may be used again
+            cursor.execute('DELETE FROM idempotency_keys WHERE key = ? AND created_at < ?', (key, now - ttl))
+        try:
+            cursor.execute(
+                'INSERT INTO idempotency_keys (key, order_id, request_hash, created_at) VALUES (?, ?, ?, ?)',
+                (key, order_id, request_hash, now)
+            )
+        except sqlite3.IntegrityError:
+            raise IdempotencyKeyExists(key) from None
 
-            # Determine which item types are present in this order so we can
-            # pre-set the non-relevant processed flag to TRUE right away.
-            item_types = {item.type for item in order.items}
-            food_processed = 0 if 'food' in item_types else 1
-            drink_processed = 0 if 'drink' in item_types else 1
+    def get_idempotency_key(self, key, created_after=0.0):
+        """order_id, request_hash, response (None until stored) and created_at of an unexpired key, or None"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT order_id, request_hash, response, created_at FROM idempotency_keys '
+                'WHERE key = ? AND created_at >= ?',
+                (key, created_after)
+            )
+            row = cursor.fetchone()
+            return dict(row) if row else None
 
-            # Insert order
-            cursor.execute('''
-                INSERT INTO orders
-                    (timestamp, table_number, user_agent, comment, total_price,
-                     food_processed, drink_processed)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                timestamp,
-                order.table_number,
-                user_agent or order.user_agent,
-                order.comment,
-                order.total_price,
-                food_processed,
-                drink_processed,
-            ))
-
-            order_id = cursor.lastrowid
-            order.id = order_id
-
-            # Insert order items
-            for item in order.items:
-                cursor.execute('''
-                    INSERT INTO order_items (order_id, item_id, item_name, item_type, price, quantity)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
-                    order_id,
-                    item.id,
-                    item.name,
-                    item.type,
-                    item.price,
-                    item.quantity
-                ))
+    @timed_write
+    def set_idempotency_response(self, key, response):
+        """Store the response body sent for the order placed under `key`"""
+        with self.get_connection() as conn:
+            conn.execute('UPDATE idempotency_keys SET response = ? WHERE key = ?', (response, key))
+            conn.commit()
 
+    @timed_write
+    def delete_expired_idempotency_keys(self, created_before):
+        """Delete keys created before the given unix time; returns how many"""
+        with self.get_connection() as conn:
+            cursor = conn.execute('DELETE FROM idempotency_keys WHERE created_at < ?', (created_before,))
             conn.commit()
-            return order_id
+            return cursor.rowcount
 
 
     def get_order(self, order_id):
@@ -201,6 +383,7 @@ class OrderLogger:
 
             return [dict(row) for row in cursor.fetchall()]
 
+    @timed_write
     def update_order_status(self, order_id, status):
         """Update the status of an order.
         When status is 'completed', both processed flags are also set so the
@@ -222,6 +405,7 @@ class OrderLogger:
             conn.commit()
             return cursor.rowcount > 0
 
+    @timed_write
     def update_type_processed_status(self, order_id, item_type, processed=True):
         """
         Mark the food or drink portion of an order as processed.
@@ -282,38 +466,22 @@ class OrderLogger:
                 ''')
             rows = cursor.fetchall()
             self.log.info(f"Retrieved {len(rows)} unprocessed order(s) from database.")
-            return [self._row_to_order(row, cursor) for row in rows]
+            return self._rows_to_orders(rows, cursor)
 
-    def _row_to_order(self, order_row, cursor):
-        """Build an Order (with items) from an `orders` row using the given cursor"""
+    def _rows_to_orders(self, order_rows, cursor):
+        """Build Orders (with items) from `orders` rows; items are fetched in one query per ITEMS_QUERY_CHUNK orders"""
         from models import Order
-        order_dict = dict(order_row)
-        cursor.execute('SELECT * FROM order_items WHERE order_id = ?', (order_dict['id'],))
-        items_rows = cursor.fetchall()
-
-        items = []
-        for item_row in items_rows:
-            ir = dict(item_row)
-            items.append({
-                'id': ir.get('item_id'),
-                'name': ir.get('item_name'),
-                'type': ir.get('item_type'),
-                'price': ir.get('price'),
-                'quantity': ir.get('quantity'),
-            })
-
-        return Order.from_dict({
-            'id': order_dict['id'],
-            'table_number': order_dict['table_number'],
-            'comment': order_dict.get('comment', ''),
-            'timestamp': order_dict.get('timestamp'),
-            'status': order_dict.get('status', 'pending'),
-            'food_processed': order_dict.get('food_processed', False),
-            'drink_processed': order_dict.get('drink_processed', False),
-            'created_at': order_dict.get('created_at'),
-            'user_agent': order_dict.get('user_agent'),
-            'orderedItems': items
-        })
+        order_ids = [row['id'] for row in order_rows]
+        items_by_order = {}
+        for start in range(0, len(order_ids), ITEMS_QUERY_CHUNK):
+            chunk = order_ids[start:start + ITEMS_QUERY_CHUNK]
+            cursor.execute(
+                f"SELECT * FROM order_items WHERE order_id IN ({','.join('?' * len(chunk))}) ORDER BY id",
+                chunk
+            )
+            for item_row in cursor.fetchall():
+                items_by_order.setdefault(item_row['order_id'], []).append(item_row)
+        return [Order.from_row(row, items_by_order.get(row['id'], ())) for row in order_rows]
 
     def get_pending_orders(self):
         """Get all pending (unprinted) orders from DB with their items for recovery"""
@@ -325,9 +493,226 @@ class OrderLogger:
                 ORDER BY id ASC
             ''')
             rows = cursor.fetchall()
-            return [self._row_to_order(row, cursor) for row in rows]
+            return self._rows_to_orders(rows, cursor)
+
+    def count_pending_orders(self):
+        """Number of pending (unprinted) orders, counted on the status index"""
+        with self.get_connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM orders WHERE status = 'pending'").fetchone()[0]
+
+    def get_orders_by_ids(self, order_ids):
+        """Get the given orders (with items) as Order objects, in id order"""
+        if not order_ids:
+            return []
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            placeholders = ','.join('?' * len(order_ids))
+            cursor.execute(
+                f'SELECT * FROM orders WHERE id IN ({placeholders}) ORDER BY id ASC',
+                list(order_ids)
+            )
+            rows = cursor.fetchall()
+            return self._rows_to_orders(rows, cursor)
 
 
+    @timed_write
+    def create_print_jobs(self, order_id, stations):
+        """Create pending print jobs for an already saved order"""
+        with self.get_connection() as conn:
+            conn.executemany(
+                'INSERT INTO print_jobs (order_id, station) VALUES (?, ?)',
+                [(order_id, station) for station in stations]
+            )
+            conn.commit()
+
+    def get_pending_print_jobs(self, order_ids=None, station=None, limit=None):
+        """
+        Get pending print jobs as dicts with what the print scheduler needs:
+        id, order_id, station, table_number, rush and created_ts (creation as
+        unix time). Rush jobs come first, then oldest first, so a limited
+        page holds the jobs that should print next.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            query = '''
+                SELECT j.id, j.order_id, j.station, o.table_number, o.rush,
+                       (julianday(j.created_at) - 2440587.5) * 86400.0 AS created_ts
+                FROM print_jobs j
+                JOIN orders o ON o.id = j.order_id
+                WHERE j.status = 'pending'
+            '''
+            params = []
+            if order_ids is not None:
+                query += f" AND j.order_id IN ({','.join('?' * len(order_ids))})"
+                params += list(order_ids)
+            if station is not None:
+                query += " AND j.station = ?"
+                params.append(station)
+            query += ' ORDER BY o.rush DESC, j.id ASC'
+            if limit is not None:
+                query += ' LIMIT ?'
+                params.append(limit)
+            cursor.execute(query, params)
+            return [dict(row) for row in cursor.fetchall()]
+
+    def get_print_backlog(self):
+        """
+        Pending print jobs per station with the station's measured seconds
+        per ticket (None until measured): {station: {'pending', 'ticket_seconds'}}
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT station, COUNT(*) AS pending FROM print_jobs
+                WHERE status = 'pending'
+                GROUP BY station
+            ''')
+            backlog = {row['station']: {'pending': row['pending'], 'ticket_seconds': None}
+                       for row in cursor.fetchall()}
+            cursor.execute('SELECT station, ticket_seconds FROM print_throughput')
+            for row in cursor.fetchall():
+                backlog.setdefault(row['station'], {'pending': 0})['ticket_seconds'] = row['ticket_seconds']
+            return backlog
+
+    @timed_write
+    def set_print_throughput(self, station, ticket_seconds):
+        """Store a station's measured seconds per ticket"""
+        with self.get_connection() as conn:
+            conn.execute('''
+                INSERT INTO print_throughput (station, ticket_seconds, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(station) DO UPDATE SET ticket_seconds = excluded.ticket_seconds,
+                                                   updated_at = excluded.updated_at
+            ''', (station, ticket_seconds, time.time()))
+            conn.commit()
+
+    def get_pending_orders_without_jobs(self):
+        """Pending orders saved before print jobs existed (or without any), for migration"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT * FROM orders o
+                WHERE o.status = 'pending'
+                  AND NOT EXISTS (SELECT 1 FROM print_jobs j WHERE j.order_id = o.id)
+                ORDER BY o.id ASC
+            ''')
+            rows = cursor.fetchall()
+            return self._rows_to_orders(rows, cursor)
+
+    @timed_write
+    def complete_print_job(self, job_id):
+        """
+        Mark a print job printed; when it was the order's last pending job the
+        order's status becomes 'printed' in the same transaction.
+
+        Returns:
+            bool: True if this completed the order.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE print_jobs
+                SET status = 'printed', printed_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (job_id,))
+            completed = self._complete_order_of_job(cursor, job_id)
+            conn.commit()
+            return completed
+
+    @staticmethod
+    def _complete_order_of_job(cursor, job_id):
+        """Set the job's order 'printed' if none of its jobs is left to print (discarded ones count as done)"""
+        cursor.execute('''
+            UPDATE orders
+            SET status = 'printed'
+            WHERE id = (SELECT order_id FROM print_jobs WHERE id = ?)
+              AND status = 'pending'
+              AND NOT EXISTS (
+                  SELECT 1 FROM print_jobs
+                  WHERE order_id = orders.id AND status NOT IN ('printed', 'discarded')
+              )
+        ''', (job_id,))
+        return cursor.rowcount > 0
+
+    @timed_write
+    def record_print_failure(self, job_id, error, max_attempts):
+        """
+        Count a failed print attempt of a pending job; after max_attempts the
+        job moves to the dead-letter queue (status 'dead') and is no longer
+        returned by get_pending_print_jobs().
+
+        Returns:
+            tuple: (attempts so far, True if the job is now dead)
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE print_jobs
+                SET attempts = COALESCE(attempts, 0) + 1,
+                    last_error = ?,
+                    status = CASE WHEN COALESCE(attempts, 0) + 1 >= ? THEN 'dead' ELSE status END
+                WHERE id = ? AND status = 'pending'
+            ''', (error, max_attempts, job_id))
+            conn.commit()
+            row = cursor.execute('SELECT attempts, status FROM print_jobs WHERE id = ?', (job_id,)).fetchone()
+            if row is None:
+                return 0, False
+            return row['attempts'], row['status'] == 'dead'
+
+    def get_dead_print_jobs(self, limit=100):
+        """Dead-lettered print jobs, oldest first"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT j.id, j.order_id, j.station, j.attempts, j.last_error, j.created_at,
+                       o.table_number, o.timestamp
+                FROM print_jobs j
+                JOIN orders o ON o.id = j.order_id
+                WHERE j.status = 'dead'
+                ORDER BY j.id ASC
+                LIMIT ?
+            ''', (limit,))
+            return [dict(row) for row in cursor.fetchall()]
+
+    def get_print_job(self, job_id):
+        """A print job with its order and items (like get_order), or None"""
+        with self.get_connection() as conn:
+            row = conn.execute('''
+                SELECT id, order_id, station, status, attempts, last_error, created_at, printed_at
+                FROM print_jobs WHERE id = ?
+            ''', (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job.update(self.get_order(job['order_id']) or {})
+        return job
+
+    @timed_write
+    def retry_print_job(self, job_id):
+        """Move a dead print job back to pending with a fresh attempt count; True if it was dead"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE print_jobs
+                SET status = 'pending', attempts = 0, last_error = NULL
+                WHERE id = ? AND status = 'dead'
+            ''', (job_id,))
+            conn.commit()
+            return cursor.rowcount > 0
+
+    @timed_write
+    def discard_print_job(self, job_id):
+        """Give up on a dead print job; its order counts as printed once nothing else is left. True if it was dead"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE print_jobs SET status = 'discarded' WHERE id = ? AND status = 'dead'", (job_id,)
+            )
+            discarded = cursor.rowcount > 0
+            if discarded:
+                self._complete_order_of_job(cursor, job_id)
+            conn.commit()
+            return discarded
+
     def get_sales_summary(self, date_from=None, date_to=None):
         """Get sales summary for a date range"""
         with self.get_connection() as conn:
@@ -418,14 +803,36 @@ class OrderLogger:
                 for row in cursor.fetchall():
                     writer.writerow(row)
 
-    def cleanup_old_orders(self, days_old=30):
-        """Remove orders older than specified days"""
+    @timed_write
+    def cleanup_old_orders(self, days_old=30, idempotency_ttl=None):
+        """
+        Remove orders older than specified days, and the idempotency keys of
+        those orders or older than idempotency_ttl (default IDEMPOTENCY_TTL_SECONDS)
+        """
         cutoff_date = datetime.now() - timedelta(days=days_old)
+        if idempotency_ttl is None:
+            idempotency_ttl = Config.IDEMPOTENCY_TTL_SECONDS
 
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
-            # First delete order items
+            cursor.execute('''
+                DELETE FROM idempotency_keys
+                WHERE created_at < ? OR order_id IN (
+                    SELECT id FROM orders
+                    WHERE timestamp < ?
+                )
+            ''', (time.time() - idempotency_ttl, cutoff_date.isoformat()))
+
+            # First delete order items and print jobs
+            cursor.execute('''
+                DELETE FROM print_jobs
+                WHERE order_id IN (
+                    SELECT id FROM orders
+                    WHERE timestamp < ?
+                )
+            ''', (cutoff_date.isoformat(),))
+
             cursor.execute('''
                 DELETE FROM order_items
                 WHERE order_id IN (
@@ -2,40 +2,26 @@
 Order processing service for handling order business logic.
 """
 import datetime
+from collections import Counter
 from datetime import datetime
-from queue import Queue
-from threading import Thread
+from pathlib import Path
+from queue import Empty
+from threading import Event, Thread, Lock
+from services.admission import AdmissionControl, BacklogFull
+from services.idempotency import IdempotencyKeyExists, IdempotencyStore, request_hash
+from services.leader_election import LeaderElection
+from services.menu_catalog import InvalidOrderError, MenuCatalog
+from services.order_journal import OrderJournal
 from services.order_logger import OrderLogger
+from services.print_scheduler import PRIORITY_CLASSES, PrintScheduler, wait_summary
 from services.printer_service import PrinterService
-from utils.file_utils import save_order_csv
+from utils import metrics
+from utils.file_utils import load_menu
 from config import Config
 import logging
 import time
 
-# Add Pydantic imports
-from pydantic import BaseModel, Field, validator
-from typing import List, Optional
-from models import Order
-
-class MenuItem(BaseModel):
-    """Pydantic model for menu items"""
-    name: str
-    price: float = Field(gt=0)
-    category: Optional[str] = None
-    quantity: int = Field(default=1, ge=1)
-
-class OrderValidation(BaseModel):
-    """Pydantic model for order validation"""
-    table_number: int = Field(gt=0)
-    items: List[MenuItem]
-    timestamp: Optional[datetime] = None
-    user_agent: Optional[str] = None
-    
-    @validator('items')
-    def validate_items(cls, v):
-        if not v:
-            raise ValueError('Order must contain at least one item')
-        return v
+from models import Order, PrintJob
 
 class OrderService:
     """Service for managing order processing and data operations"""
@@ -47,94 +33,561 @@ class OrderService:
 
         self.order_logger = OrderLogger(Config.DATABASE_PATH)
         self.printer_service = PrinterService()
-        self.printer_order_queue = Queue()
+        # Item id -> name/price/type; every incoming order is priced from it
+        self.menu_catalog = MenuCatalog(load_menu())
+        # Idempotency-Key of POST /order -> the order and response it got
+        self.idempotency = IdempotencyStore(
+            self.order_logger,
+            ttl_seconds=Config.IDEMPOTENCY_TTL_SECONDS,
+            cache_size=Config.IDEMPOTENCY_CACHE_SIZE,
+        )
+        # Print backlog threshold and wait estimates for new orders
+        self.admission = AdmissionControl(
+            self.order_logger,
+            policy=Config.ADMISSION_POLICY,
+            max_backlog=Config.ADMISSION_MAX_BACKLOG,
+            default_ticket_seconds=Config.PRINT_TICKET_SECONDS,
+        )
+        # Orders that could not be saved to the DB, until they are replayed
+        self.journal = OrderJournal(
+            Config.JOURNAL_DIR or Path(Config.DATABASE_PATH).parent / "journal",
+            max_batch=Config.JOURNAL_MAX_BATCH,
+        )
+
+        # One queue and worker per printer station, holding PrintJobs — or,
+        # in 'asyncio' mode, a single dispatcher thread driving all stations
+        self.dispatcher = self.printer_service.dispatcher
+        if self.dispatcher is not None:
+            self.station_queues = self.dispatcher.queues
+        else:
+            self.station_queues = {station: PrintScheduler() for station in self.printer_service.stations}
+
+        # Ids of print jobs sitting in (or being printed from) each station's
+        # queue, so the DB poll never enqueues the same job twice. At most
+        # PRINT_QUEUE_BOUND per station; the rest stay in the DB ("spilled")
+        # and are paged in by the poll as the queue drains.
+        self._queued_job_ids = {station: set() for station in self.station_queues}
+        self._spilled = set()
+        self._queued_lock = Lock()
+
+        # shutdown(): _draining stops new tickets from being queued while the
+        # queues print out, _stopped then ends the print workers
+        self._draining = Event()
+        self._stopped = Event()
+
+        # Only the lease holder prints; other worker processes just save
+        # orders and the leader picks them up from the DB.
+        self.leader_election = LeaderElection(
+            Config.DATABASE_PATH,
+            lease_seconds=Config.PRINT_LEADER_LEASE_SECONDS,
+            renew_interval=Config.PRINT_LEADER_RENEW_SECONDS,
+        )
+
+        metrics.REGISTRY.on_collect('print_queue_depth', self._collect_queue_depth)
 
         self._start_order_processing_thread()
-        self._recover_pending_orders()
+        self._replay_thread = Thread(target=self._replay_journal_periodically, daemon=True, name="journal-replay")
+        self._replay_thread.start()
+        self.leader_election.start(
+            on_elected=self._recover_pending_orders,
+            on_demoted=self._drop_queued_orders,
+            on_tick=self._leader_tick,
+        )
+
+    def _collect_queue_depth(self):
+        is_leader = self.leader_election.is_leader
+        for station, queue in self.station_queues.items():
+            metrics.PRINT_QUEUE_DEPTH.set(queue.qsize() if is_leader else 0, station=station)
+
+    def _enqueue(self, job):
+        """Put a print job on its station queue unless it is already queued or the queue is full"""
+        return self._enqueue_many([job]) == 1
+
+    def _enqueue_many(self, jobs):
+        """Put print jobs on their station queues in one go, skipping ones already queued or over the bound; returns how many were queued"""
+        if self._draining.is_set():
+            return 0
+        by_station = {}
+        with self._queued_lock:
+            for job in jobs:
+                claimed = self._queued_job_ids.get(job.station)
+                if claimed is None:
+                    self.log.warning(f"Print job {job.id} (order #{job.order_id}) is for unknown station '{job.station}', leaving it in the database")
+                    continue
+                if job.id in claimed:
+                    continue
+                if len(claimed) >= Config.PRINT_QUEUE_BOUND:
+                    self._spilled.add(job.station)
+                    continue
+                claimed.add(job.id)
+                by_station.setdefault(job.station, []).append(job)
+        for station, station_jobs in by_station.items():
+            if self.dispatcher is not None:
+                self.dispatcher.submit_many(station, station_jobs)
+            else:
+                self.station_queues[station].put_many(station_jobs)
+        return sum(len(station_jobs) for station_jobs in by_station.values())
+
+    def _release(self, job):
+        """Forget a dequeued job so a later DB poll may queue it again"""
+        with self._queued_lock:
+            self._queued_job_ids.get(job.station, set()).discard(job.id)
+
+    def _enqueue_pending_from_db(self):
+        """Page pending print jobs from the DB into every station queue with room; returns the count"""
+        queued = 0
+        for station in self.station_queues:
+            with self._queued_lock:
+                claimed = len(self._queued_job_ids[station])
+            room = Config.PRINT_QUEUE_BOUND - claimed
+            if room <= 0:
+                continue
+            # At most `claimed` of these rows are already queued, so this
+            # always yields `room` new jobs if the DB has that many
+            limit = room + claimed
+            rows = self.order_logger.get_pending_print_jobs(station=station, limit=limit)
+            queued += self._enqueue_many([self._job_from_row(row) for row in rows])
+            if len(rows) < limit:
+                with self._queued_lock:
+                    self._spilled.discard(station)
+        return queued
+
+    @staticmethod
+    def _job_from_row(row):
+        """Id-only PrintJob from a get_pending_print_jobs() row; the order is loaded when printing"""
+        return PrintJob(id=row['id'], order_id=row['order_id'], station=row['station'],
+                        table_number=row['table_number'], rush=bool(row['rush']),
+                        created_ts=row['created_ts'])
+
+    def _load_tickets(self, station, jobs):
+        """Attach orders and this station's items to id-only jobs right before printing"""
+        missing = {job.order_id for job in jobs if job.order is None}
+        orders = {order.id: order for order in self.order_logger.get_orders_by_ids(missing)} if missing else {}
+        for job in jobs:
+            if job.order is None:
+                job.order = orders.get(job.order_id)
+            if job.order is not None and not job.items:
+                job.items = self.printer_service.route(job.order).get(station, [])
+        return jobs
+
+    @staticmethod
+    def _unload(job):
+        """Drop a requeued job back to ids only"""
+        job.order = None
+        job.items = []
+        return job
+
+    def _create_missing_print_jobs(self):
+        """Give pending orders saved without print jobs (older databases) their jobs"""
+        for order in self.order_logger.get_pending_orders_without_jobs():
+            stations = list(self.printer_service.route(order))
+            if stations:
+                self.order_logger.create_print_jobs(order.id, stations)
+            else:
+                self.order_logger.update_order_status(order.id, 'printed')
 
     def _recover_pending_orders(self):
-        """Recover unprinted orders from SQLite database on startup"""
+        """Recover unprinted orders from SQLite database when becoming print leader"""
         try:
-            pending_orders = self.order_logger.get_pending_orders()
-            if pending_orders:
-                self.log.info(f"Recovered {len(pending_orders)} unprinted order(s) from database for processing.")
-                for order in pending_orders:
-                    self.printer_order_queue.put(order)
-
+            self._create_missing_print_jobs()
+            recovered = self._enqueue_pending_from_db()
+            if recovered:
+                self.log.info(f"Recovered {recovered} unprinted ticket(s) from database for processing.")
             else:
                 self.log.info("No unprinted orders found in database on startup.")
         except Exception as e:
             self.log.error(f"Error recovering pending orders from DB: {e}")
 
+    def _poll_handed_over_orders(self):
+        """Pick up print jobs that other worker processes saved since the last poll"""
+        try:
+            picked_up = self._enqueue_pending_from_db()
+            if picked_up:
+                self.log.info(f"Picked up {picked_up} ticket(s) handed over via database.")
+        except Exception as e:
+            self.log.error(f"Error polling handed-over orders from DB: {e}")
+
+    def _leader_tick(self):
+        """Every lease renewal: pick up handed-over orders and update the measured print throughput"""
+        self._poll_handed_over_orders()
+        try:
+            self.admission.update_throughput()
+        except Exception as e:
+            self.log.error(f"Error updating print throughput: {e}")
+
+    def _drop_queued_orders(self):
+        """Empty the local queues after losing the lease; the new leader reloads them from the DB"""
+        dropped = 0
+        for queue in self.station_queues.values():
+            for job in queue.drain():
+                self._release(job)
+                dropped += 1
+        if dropped:
+            self.log.info(f"Dropped {dropped} queued ticket(s) after losing print leadership.")
+
     def _start_order_processing_thread(self):
-        """Start background thread for processing orders"""
-        self.order_thread = Thread(target=self._process_orders, daemon=True)
-        self.order_thread.start()
+        """Start one background print worker thread per printer station (or the asyncio dispatcher)"""
+        self.order_threads = {}
+        if self.dispatcher is not None:
+            self.dispatcher.start(
+                load=self._load_tickets,
+                on_printed=self._complete_job,
+                on_dropped=self._release,
+                on_failed=self._ticket_failed,
+                should_print=lambda: self.leader_election.is_leader,
+            )
+            return
+        for station in self.station_queues:
+            thread = Thread(target=self._process_orders, args=(station,), daemon=True, name=f"print-{station}")
+            self.order_threads[station] = thread
+            thread.start()
+
+    def _complete_job(self, job):
+        """Record a printed ticket; the order is 'printed' once its last station ticket is"""
+        if self.order_logger.complete_print_job(job.id) and job.order is not None:
+            job.order.status = 'printed'
+            self.log.info(f"Order #{job.order_id} status updated to 'printed' in database.")
+        self._release(job)
+
+    def _ticket_failed(self, job, error):
+        """
+        Count a failed attempt at a ticket that could not be printed although
+        its printer was reachable. Returns True if the ticket was moved to the
+        dead-letter queue (and must not be requeued).
+        """
+        attempts, dead = self.order_logger.record_print_failure(job.id, error, Config.PRINT_MAX_ATTEMPTS)
+        if dead:
+            metrics.PRINT_DEAD_LETTERED.inc(station=job.station)
+            self.log.error(f"Print job {job.id} (order #{job.order_id}) on '{job.station}' failed {attempts} times, moved to dead-letter queue: {error}")
+            self._release(job)
+            return True
+        metrics.PRINT_RETRIES.inc(station=job.station, reason='ticket_error')
+        self.log.warning(f"Print job {job.id} (order #{job.order_id}) on '{job.station}' failed (attempt {attempts}/{Config.PRINT_MAX_ATTEMPTS}): {error}")
+        return False
 
-    def _process_orders(self):
-        """Background process for handling order queue"""
+    def _next_batch(self, station):
+        """Block for one job, then drain whatever else is already queued (up to PRINT_BATCH_SIZE); [] once stopped"""
+        queue = self.station_queues[station]
         while True:
+            if self._stopped.is_set():
+                return []
             try:
-                # Wait until an order is available
-                order_item = self.printer_order_queue.get(block=True)
-                order = order_item if isinstance(order_item, Order) else Order.from_dict(order_item)
-
-                if not self.printer_service.are_printers_available():
-                    self.log.warning("Printer is not available, please check the printer. Re-queuing order. Timeout for 10 seconds")
-                    self.printer_order_queue.put(order)
-                    time.sleep(10)
+                batch = [queue.get(timeout=0.2)]
+                break
+            except Empty:
+                continue
+        while len(batch) < Config.PRINT_BATCH_SIZE:
+            try:
+                batch.append(queue.get_nowait())
+            except Empty:
+                break
+        return batch
+
+    def _process_orders(self, station):
+        """Background process printing one station's queue"""
+        queue = self.station_queues[station]
+        while not self._stopped.is_set():
+            batch = []
+            try:
+                # Wait until a ticket is available, then coalesce the backlog
+                # into one print session
+                batch = self._next_batch(station)
+                if not batch:
+                    break
+
+                if not self.leader_election.is_leader:
+                    # Lost the lease while these jobs were queued — the new
+                    # leader prints them from the DB.
+                    for job in batch:
+                        self._release(job)
+                    continue
+
+                if not self.printer_service.is_station_available(station):
+                    self.log.warning(f"Printer '{station}' is not available, please check the printer. Re-queuing {len(batch)} ticket(s). Timeout for {Config.PRINT_RETRY_DELAY_SECONDS} seconds")
+                    metrics.PRINT_RETRIES.inc(len(batch), station=station, reason='printer_unavailable')
+                    for job in batch:
+                        queue.put(job)
+                    self._stopped.wait(Config.PRINT_RETRY_DELAY_SECONDS)
                     continue
 
-                success = self.printer_service.print_order(order)
+                self._load_tickets(station, batch)
+                results = self.printer_service.print_tickets(station, [(job.order, job.items) for job in batch])
 
-                if success:
-                    self.printer_order_queue.task_done()
-                    # Update status in database to 'printed'
-                    if order.id:
-                        self.order_logger.update_order_status(order.id, 'printed')
-                        order.status = 'printed'
-                        self.log.info(f"Order #{order.id} status updated to 'printed' in database.")
-                else:
-                    self.log.warning("Failed to print order, will retry...")
-                    time.sleep(10)  # Warten Sie 10 Sekunden vor dem erneuten Einfügen
-                    self.printer_order_queue.put(order)
+                failed = []
+                for job, success in zip(batch, results):
+                    if not success:
+                        failed.append(job)
+                        continue
+                    queue.task_done(job)
+                    self._complete_job(job)
+
+                if failed and self.printer_service.is_station_available(station):
+                    # The printer is fine, so the first failed ticket broke the
+                    # session (the ones behind it were never sent). Blame it
+                    # and retry right away, so a poison ticket ends up in the
+                    # dead-letter queue instead of stalling the station.
+                    error = self.printer_service.last_error(station) or f"print session on '{station}' aborted"
+                    if self._ticket_failed(failed[0], error):
+                        failed = failed[1:]
+                    for job in failed:
+                        queue.put(self._unload(job))
+                elif failed:
+                    metrics.PRINT_RETRIES.inc(len(failed), station=station, reason='print_failed')
+                    self.log.warning(f"Failed to print {len(failed)} ticket(s) on '{station}', will retry...")
+                    self._stopped.wait(Config.PRINT_RETRY_DELAY_SECONDS)  # Warten vor dem erneuten Einfügen
+                    for job in failed:
+                        queue.put(self._unload(job))
 
             except Exception as e:
-                self.log.exception("Error processing order from queue")
+                # E.g. the DB failed while loading or completing the batch:
+                # forget its jobs, so the next DB poll queues the ones still
+                # pending again instead of skipping them as already queued
+                self.log.exception(f"Error processing print queue of station '{station}', releasing {len(batch)} ticket(s) to the database")
+                for job in batch:
+                    self._release(self._unload(job))
+
+    def _queued_count(self):
+        with self._queued_lock:
+            return sum(len(ids) for ids in self._queued_job_ids.values())
+
+    def shutdown(self, timeout=None):
+        """
+        Stop printing gracefully (on SIGTERM/SIGINT, see main.py).
+
+        New tickets are no longer queued (orders are still saved and stay
+        pending in the DB), the queues are printed out for up to `timeout`
+        seconds (default SHUTDOWN_DRAIN_SECONDS), then the print workers finish
+        their current print session and the printer connections are closed.
+        Tickets still queued at the deadline are simply left pending in the DB
+        — every printed ticket is already marked there, so the next print
+        leader replays only the unfinished ones. Finally the print lease is
+        released so another worker process can take over right away.
+
+        Returns the number of tickets left unprinted in the queues.
+        """
+        if self._draining.is_set():
+            return 0
+        timeout = Config.SHUTDOWN_DRAIN_SECONDS if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        self._draining.set()
+
+        queued = self._queued_count()
+        if queued and self.leader_election.is_leader:
+            self.log.info(f"Shutting down: printing {queued} queued ticket(s), waiting up to {timeout} seconds")
+            while self._queued_count() and time.monotonic() < deadline:
+                time.sleep(0.05)
+
+        self._stopped.set()
+        self.journal.close()
+        for thread in self.order_threads.values():
+            thread.join(max(deadline - time.monotonic(), 0.5))
+        self.printer_service.close(max(deadline - time.monotonic(), 0.5))
+
+        left = self._queued_count()
+        for queue in self.station_queues.values():
+            queue.drain()
+        with self._queued_lock:
+            for ids in self._queued_job_ids.values():
+                ids.clear()
+        self.leader_election.stop(release=True)
+        if left:
+            self.log.warning(f"Shutdown deadline reached, left {left} ticket(s) pending in the database for the next print leader")
+        else:
+            self.log.info("Print queues drained, shutdown complete")
+        return left
+
+    def process_order(self, order_data, user_agent=None, idempotency_key=None, request_hash=None):
+        """
+        Process a new order - save to database and add to print queue.
+
+        The order is checked and priced against the menu first; raises
+        InvalidOrderError (nothing is saved) if it doesn't match.
+        If the database write fails, the order is written to the journal
+        and replayed later; then the order id is None and the status
+        'journaled'. Raises JournalError if that fails too.
+        With an idempotency_key the key is saved along with the order;
+        raises IdempotencyKeyExists (nothing is saved) if it was already used.
+        """
+        try:
+            order = order_data if isinstance(order_data, Order) else Order.from_dict(order_data)
+        except (TypeError, ValueError, AttributeError) as e:
+            raise InvalidOrderError(f"Malformed order: {e}") from e
+        self.menu_catalog.price_order(order)
+        if user_agent:
+            order.user_agent = user_agent
 
-    def process_order(self, order_data, user_agent=None):
-        """Process a new order - save to database and add to print queue"""
+        tickets = self.printer_service.route(order)
         try:
-            # Validate order data using Pydantic
-            if isinstance(order_data, dict):
-                validated_order = OrderValidation(**order_data)
-                # Convert back to dict for further processing
-                order_dict = validated_order.dict()
-                order = Order.from_dict(order_dict)
+            self.admission.admit(tickets)
+            self.log.info(f"Processing order for table {order.table_number} with {len(order.items)} items")
+
+            # Save order and its per-station print jobs to database
+            order_id = self.order_logger.save_order(
+                order, user_agent, stations=list(tickets), idempotency_key=idempotency_key,
+                request_hash=request_hash, idempotency_ttl=self.idempotency.ttl,
+            )
+        except (IdempotencyKeyExists, BacklogFull):
+            raise
+        except Exception:
+            self.log.exception("Error saving order, writing it to the order journal")
+            self._journal_orders([(order, user_agent, list(tickets), idempotency_key, request_hash)])
+            self.admission.count(tickets)
+            return None
+
+        order.id = order_id
+        self.admission.count(tickets)
+        metrics.ORDERS_INGESTED.inc(storage='sqlite')
+        self.log.info(f"Order saved to database with ID: {order_id}")
+
+        # Add to print queues — dashboard state is read directly from the DB.
+        # Non-leaders leave it in the DB for the print leader to pick up.
+        # The order is committed by now: if this fails, its print jobs stay
+        # pending and the leader's DB poll queues them.
+        try:
+            if not tickets:
+                self.order_logger.update_order_status(order_id, 'printed')
+            elif self.leader_election.is_leader:
+                self._enqueue_saved([order_id])
+                self.log.info(f"Order added to print queue(s) {', '.join(tickets)} for table {order.table_number}")
             else:
-                # If it's already an Order object, validate it
-                order = order_data
+                self.log.info(f"Order for table {order.table_number} handed over to print leader via database")
+        except Exception:
+            self.log.exception(f"Error queueing order {order_id}, leaving it to the print leader's database poll")
+        return order_id
+
+    def process_orders(self, batch, user_agent=None):
+        """
+        Process several orders at once, e.g. the ones a tablet took while offline.
 
+        `batch` is a list of (client_id, order dict). The client id is the
+        order's idempotency key, so syncing the same orders again (or an
+        order already sent as POST /order with that Idempotency-Key) places
+        none of them twice. All valid orders are saved in one transaction and their
+        tickets queued in one go.
+
+        Returns one result per entry, in the same order: clientId, status
+        ('created', 'duplicate', 'rejected', or 'journaled' if the database
+        write failed, see process_order) and order_id or error.
+        """
+        results = [None] * len(batch)
+        pending = []  # (index, client_id, order, hash, stations)
+        for index, (client_id, order_data) in enumerate(batch):
+            req_hash = request_hash(order_data)
+            try:
+                order = Order.from_dict(order_data)
+                self.menu_catalog.price_order(order)
+            except (InvalidOrderError, TypeError, ValueError, AttributeError) as e:
+                results[index] = {'clientId': client_id, 'status': 'rejected', 'error': str(e)}
+                continue
             if user_agent:
                 order.user_agent = user_agent
+            pending.append((index, client_id, order, req_hash, list(self.printer_service.route(order))))
 
-            self.log.info(f"Processing order for table {order.table_number} with {len(order.items)} items")
-            
-            # Save order to database
-            order_id = self.order_logger.save_order(order, user_agent)
-            order.id = order_id
-            self.log.info(f"Order saved to database with ID: {order_id}")
+        if not pending:
+            return results
+
+        try:
+            ahead = Counter()
+            for _, _, _, _, stations in pending:
+                self.admission.admit(stations, ahead)
+                ahead.update(stations)
+            saved = self.order_logger.save_orders(
+                [(order, user_agent, stations, client_id, req_hash)
+                 for _, client_id, order, req_hash, stations in pending],
+                idempotency_ttl=self.idempotency.ttl,
+            )
+        except BacklogFull:
+            raise
+        except Exception:
+            self.log.exception(f"Error saving batch of {len(pending)} order(s), writing it to the order journal")
+            self._journal_orders([(order, user_agent, stations, client_id, req_hash)
+                                  for _, client_id, order, req_hash, stations in pending])
+            for index, client_id, _, _, stations in pending:
+                results[index] = {'clientId': client_id, 'status': 'journaled', 'order_id': None}
+                self.admission.count(stations)
+            return results
 
-            # Add to print queue — dashboard state is read directly from the DB
-            self.printer_order_queue.put(order)
-            self.log.info(f"Order added to print queue for table {order.table_number}")
+        created = []
+        for (index, client_id, order, req_hash, stations), (order_id, is_new) in zip(pending, saved):
+            if not is_new:
+                known = self.idempotency.lookup(client_id)
+                if known is not None and known.request_hash not in (None, req_hash):
+                    results[index] = {'clientId': client_id, 'status': 'rejected',
+                                      'error': 'clientId was already used for a different order'}
+                else:
+                    results[index] = {'clientId': client_id, 'status': 'duplicate', 'order_id': order_id}
+                continue
+            results[index] = {'clientId': client_id, 'status': 'created', 'order_id': order_id}
+            created.append(order_id)
+            self.admission.count(stations)
+            if not stations:
+                self.order_logger.update_order_status(order_id, 'printed')
+        metrics.ORDERS_INGESTED.inc(len(created), storage='sqlite')
+        self.log.info(f"Batch of {len(batch)} order(s): {len(created)} saved to database")
 
-            return order_id
-        except Exception as e:
-            self.log.exception("Error saving order, falling back to CSV")
-            # Fallback to CSV if SQLite fails
-            raw_data = order_data.to_dict() if hasattr(order_data, 'to_dict') else order_data
-            return save_order_csv(Config.CSV_FALLBACK_PATH, raw_data, user_agent)
+        if created and self.leader_election.is_leader:
+            self._enqueue_saved(created)
+        return results
+
+    def _journal_orders(self, entries):
+        """Write (order, user_agent, stations, idempotency_key, request_hash) entries to the journal"""
+        self.journal.append_many([{
+            'order': order.to_dict(),
+            'user_agent': user_agent,
+            'stations': stations,
+            'idempotency_key': idempotency_key,
+            'request_hash': request_hash,
+        } for order, user_agent, stations, idempotency_key, request_hash in entries])
+        for order, *_ in entries:
+            order.status = 'journaled'
+        metrics.ORDERS_INGESTED.inc(len(entries), storage='journal')
+        self.log.warning(f"{len(entries)} order(s) written to the order journal, they are saved and printed once the database works again")
+
+    def _apply_journal_records(self, records):
+        """Save journaled orders to the DB (skipping ones saved before) and queue their tickets"""
+        for start in range(0, len(records), Config.ORDER_BATCH_MAX_SIZE):
+            chunk = records[start:start + Config.ORDER_BATCH_MAX_SIZE]
+            orders = [Order.from_dict(record['order']) for record in chunk]
+            saved = self.order_logger.save_orders([
+                (order, record.get('user_agent'), record.get('stations') or [],
+                 record.get('idempotency_key') or f"journal:{record['id']}", record.get('request_hash'))
+                for order, record in zip(orders, chunk)
+            ], idempotency_ttl=self.idempotency.ttl)
+            created = [order_id for order_id, is_new in saved if is_new]
+            for record, (order_id, is_new) in zip(chunk, saved):
+                if is_new and not record.get('stations'):
+                    self.order_logger.update_order_status(order_id, 'printed')
+            if created:
+                metrics.ORDERS_INGESTED.inc(len(created), storage='sqlite')
+                self.log.info(f"Replayed {len(created)} journaled order(s) into the database")
+                if self.leader_election.is_leader:
+                    self._enqueue_saved(created)
+
+    def replay_journal(self):
+        """Replay journaled orders into the DB and print queue; returns the number of records replayed"""
+        return self.journal.replay(self._apply_journal_records)
+
+    def _replay_journal_periodically(self):
+        while True:
+            try:
+                if self.journal.has_segments():
+                    self.replay_journal()
+            except Exception:
+                self.log.exception("Error replaying the order journal, will retry")
+            if self._stopped.wait(Config.JOURNAL_REPLAY_INTERVAL_SECONDS):
+                return
+
+    def _enqueue_saved(self, order_ids):
+        """Queue the print jobs of just-saved orders (print leader only)"""
+        # Stations with a backlog spilled to the DB page these in behind the
+        # older jobs
+        rows = self.order_logger.get_pending_print_jobs(order_ids=order_ids)
+        self._enqueue_many([self._job_from_row(row) for row in rows if row['station'] not in self._spilled])
+
+    def estimate_wait(self, order=None):
+        """Estimated print wait for an order's tickets (default: the longest of all stations), and whether it is delayed"""
+        stations = None if order is None else self.printer_service.route(order)
+        return self.admission.estimate(stations)
 
     def get_orders(self, table_number=None, limit=None):
         """Get orders with optional filtering"""
@@ -149,20 +602,21 @@ class OrderService:
         """Get detailed information about a specific order"""
         return self.order_logger.get_order(order_id)
 
-    def get_dashboard_orders(self, filter=None):
+    def get_dashboard_orders(self, filter=None, compact=False):
         """
         Get active (non-completed) orders for dashboard display, sourced directly
         from the database — this is the single source of truth, consistent across
         worker processes and durable across restarts.
         Args:
             filter (dict): Dictionary containing 'key' and 'value' to filter by item type
+            compact (bool): Serialize the orders without duplicate fields (see Order.to_dict)
         Returns:
             list: Filtered list of order dicts
         """
         item_type = filter.get('value') if filter else None
         orders = self.order_logger.get_unprocessed_orders(item_type)
         self.log.info(f"Retrieved {len(orders)} active order(s) from database for dashboard.")
-        return [order.to_dict() for order in orders]
+        return [order.to_dict(compact) for order in orders]
 
     def complete_order(self, order_id):
         """Mark an order as completed (persisted in the database)"""
@@ -194,7 +648,47 @@ class OrderService:
 
     def get_queue_status(self):
         """Get current order queue status"""
+        is_leader = self.leader_election.is_leader
         return {
-            'pending_orders': self.printer_order_queue.qsize(),
+            'pending_orders': self.order_logger.count_pending_orders(),
+            # Only the print leader holds tickets in memory
+            'pending_tickets': {
+                station: queue.qsize() for station, queue in self.station_queues.items()
+            } if is_leader else {},
+            'queue_bound': Config.PRINT_QUEUE_BOUND,
+            'spilled_stations': sorted(self._spilled) if is_leader else [],
+            'ticket_wait_ms': self.get_ticket_wait_stats() if is_leader else {},
+            'admission': self.admission.status(self.station_queues),
+            'print_leader': is_leader,
             'printer_status': self.printer_service.get_printer_status()
         }
+
+    def get_ticket_wait_stats(self):
+        """Wait from order to printed ticket per priority class, over all stations"""
+        samples = {name: [] for name in PRIORITY_CLASSES}
+        for queue in self.station_queues.values():
+            for name, waits in queue.wait_samples().items():
+                samples[name].extend(waits)
+        summary = {name: wait_summary(waits) for name, waits in samples.items()}
+        summary['max_wait_seconds'] = Config.PRINT_MAX_WAIT_SECONDS
+        return summary
+
+    def get_dead_print_jobs(self, limit=100):
+        """Print jobs in the dead-letter queue"""
+        return self.order_logger.get_dead_print_jobs(limit)
+
+    def get_print_job(self, job_id):
+        """One print job with its order and items"""
+        return self.order_logger.get_print_job(job_id)
+
+    def retry_print_job(self, job_id):
+        """Send a dead print job back to the printer; the print leader picks it up on its next poll"""
+        return self.order_logger.retry_print_job(job_id)
+
+    def discard_print_job(self, job_id):
+        """Drop a dead print job for good"""
+        return self.order_logger.discard_print_job(job_id)
+
+    def get_printer_health(self):
+        """Get rolling printer availability and latency histograms"""
+        return self.printer_service.get_printer_health()
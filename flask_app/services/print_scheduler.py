@@ -0,0 +1,164 @@
+"""
+Priority scheduling for a printer station's ticket queue.
+
+Tickets are ordered by a virtual arrival time fixed when a ticket is first
+queued:
+
+    created_ts - PRINT_RUSH_BOOST_SECONDS (rush orders only)
+               + PRINT_TABLE_SPACING_SECONDS * tickets of the same table already queued
+
+so older tickets go first, rush orders jump ahead by a fixed amount rather
+than absolutely, and one table ordering ten rounds does not push everyone
+else back by ten tickets. A retried ticket keeps its virtual arrival time
+and therefore its place.
+
+Starvation guard: a ticket older than PRINT_MAX_WAIT_SECONDS is served
+oldest-first ahead of everything else, so no ticket waits much longer than
+that plus the print time of the older tickets ahead of it. The wait from
+creation until a ticket is printed (`task_done`) is recorded per priority
+class (rush / normal) to check that bound.
+"""
+import heapq
+import itertools
+import math
+import time
+from collections import Counter, deque
+from queue import Empty
+from threading import Condition
+from typing import Any, Dict, List
+
+from config import Config
+from models import PrintJob
+from utils import metrics
+
+PRIORITY_CLASSES = ("rush", "normal")
+
+
+def wait_summary(samples) -> Dict[str, Any]:
+    """count/p50/p95/max in milliseconds (nearest-rank) of wait samples in seconds"""
+    if not samples:
+        return {"count": 0, "p50": None, "p95": None, "max": None}
+    ordered = sorted(samples)
+
+    def rank(p):
+        return round(ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)] * 1000, 1)
+
+    return {"count": len(ordered), "p50": rank(50), "p95": rank(95), "max": round(ordered[-1] * 1000, 1)}
+
+
+class PrintScheduler:
+    """Thread-safe priority queue of PrintJobs (drop-in for the queue.Queue it replaces)"""
+
+    def __init__(self, rush_boost: float = None, table_spacing: float = None, max_wait: float = None,
+                 samples: int = 1000, clock=time.time):
+        self.rush_boost = Config.PRINT_RUSH_BOOST_SECONDS if rush_boost is None else rush_boost
+        self.table_spacing = Config.PRINT_TABLE_SPACING_SECONDS if table_spacing is None else table_spacing
+        self.max_wait = Config.PRINT_MAX_WAIT_SECONDS if max_wait is None else max_wait
+        self.clock = clock
+
+        self._cond = Condition()
+        self._by_priority = []  # (virtual arrival, seq, job)
+        self._by_age = []       # (created_ts, seq, job)
+        self._taken = set()     # seqs already popped from the other heap
+        self._seq = itertools.count()
+        self._count = 0
+        self._table_counts = Counter()
+        self._waits = {name: deque(maxlen=samples) for name in PRIORITY_CLASSES}
+
+    def put(self, job: PrintJob):
+        with self._cond:
+            self._push(job)
+            self._cond.notify()
+
+    def put_many(self, jobs: List[PrintJob]):
+        """Queue several jobs under one lock, in the given order"""
+        with self._cond:
+            for job in jobs:
+                self._push(job)
+            self._cond.notify(len(jobs))
+
+    def _push(self, job: PrintJob):
+        if job.created_ts is None:
+            job.created_ts = self.clock()
+        if job.priority is None:
+            job.priority = (job.created_ts
+                            - (self.rush_boost if job.rush else 0.0)
+                            + self.table_spacing * self._table_counts[job.table_number])
+        seq = next(self._seq)
+        heapq.heappush(self._by_priority, (job.priority, seq, job))
+        heapq.heappush(self._by_age, (job.created_ts, seq, job))
+        self._table_counts[job.table_number] += 1
+        self._count += 1
+
+    def get(self, block: bool = True, timeout: float = None) -> PrintJob:
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._size() > 0, timeout if block else 0):
+                raise Empty
+            return self._pop()
+
+    def get_nowait(self) -> PrintJob:
+        return self.get(block=False)
+
+    def drain(self) -> List[PrintJob]:
+        """Remove and return every queued job"""
+        jobs = []
+        with self._cond:
+            while self._size():
+                jobs.append(self._pop())
+        return jobs
+
+    def qsize(self) -> int:
+        with self._cond:
+            return self._size()
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def _size(self) -> int:
+        return self._count
+
+    def _pop_live(self, heap):
+        while True:
+            _, seq, job = heapq.heappop(heap)
+            if seq in self._taken:
+                self._taken.discard(seq)
+                continue
+            self._taken.add(seq)
+            return job
+
+    def _peek_live(self, heap):
+        while heap and heap[0][1] in self._taken:
+            self._taken.discard(heapq.heappop(heap)[1])
+        return heap[0] if heap else None
+
+    def _pop(self) -> PrintJob:
+        now = self.clock()
+        oldest = self._peek_live(self._by_age)
+        if oldest is not None and now - oldest[0] >= self.max_wait:
+            job = self._pop_live(self._by_age)
+        else:
+            self._peek_live(self._by_priority)
+            job = self._pop_live(self._by_priority)
+
+        self._count -= 1
+        self._table_counts[job.table_number] -= 1
+        if self._table_counts[job.table_number] <= 0:
+            del self._table_counts[job.table_number]
+        return job
+
+    def task_done(self, job: PrintJob):
+        """Record that a job was printed"""
+        priority = "rush" if job.rush else "normal"
+        wait = self.clock() - job.created_ts
+        with self._cond:
+            self._waits[priority].append(wait)
+        metrics.PRINT_QUEUE_WAIT_SECONDS.observe(wait, station=job.station, priority=priority)
+
+    def wait_samples(self) -> Dict[str, List[float]]:
+        """Recent waits in seconds from creation until printed, per priority class"""
+        with self._cond:
+            return {name: list(samples) for name, samples in self._waits.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        """Wait summary per priority class"""
+        return {name: wait_summary(samples) for name, samples in self.wait_samples().items()}
@@ -0,0 +1,84 @@
+"""
+Routing of order items to printer stations.
+
+A station is one printer (grill, fryer, bar, coffee bar, ...). Stations are
+configured as a mapping of station name to its printer address and routing
+rules, checked in this order for every menu item:
+
+    {"bar":    {"ip": "192.168.88.248", "categories": ["Bier", "Wein"]},
+     "coffee": {"ip": "192.168.88.247", "items": [90, 91]},
+     "grill":  {"ip": "192.168.88.250", "types": ["food"]}}
+
+1. "items":      explicit menu item ids
+2. "categories": menu categories (the top-level keys in menu.json)
+3. "types":      item type ("food" / "drink")
+
+Anything unmatched goes to the first configured station. Item and category
+rules are resolved once per menu load into an item id -> station dict; the
+type rule uses the type on the order item itself (the same field the
+dashboards filter on), so routing an order is a dict lookup or two per item.
+"""
+import logging
+from typing import Any, Dict, List
+
+from models import Order, OrderItem
+
+log = logging.getLogger(__name__)
+
+
+def default_stations(ip_food: str = None, ip_drinks: str = None) -> Dict[str, Dict[str, Any]]:
+    """The classic two-printer setup: food items to "food", drinks to "drinks"."""
+    return {
+        "food": {"ip": ip_food, "types": ["food"]},
+        "drinks": {"ip": ip_drinks, "types": ["drink"]},
+    }
+
+
+class StationRouter:
+    """Maps order items to printer stations via a precomputed item id table."""
+
+    def __init__(self, stations: Dict[str, Dict[str, Any]], menu: Dict[str, List[Dict[str, Any]]] = None):
+        if not stations:
+            raise ValueError("At least one printer station must be configured")
+        self.stations = list(stations)
+        self.default_station = self.stations[0]
+
+        self._item_rules = {}
+        self._category_rules = {}
+        self._type_rules = {}
+        for name, station in stations.items():
+            for item_id in station.get("items", []):
+                self._item_rules.setdefault(item_id, name)
+            for category in station.get("categories", []):
+                self._category_rules.setdefault(category, name)
+            for item_type in station.get("types", []):
+                self._type_rules.setdefault(item_type, name)
+
+        self.item_station: Dict[Any, str] = dict(self._item_rules)
+        if menu:
+            self.load_menu(menu)
+
+    def load_menu(self, menu: Dict[str, List[Dict[str, Any]]]):
+        """Rebuild the item id -> station table for a (re)loaded menu."""
+        table = dict(self._item_rules)
+        for category, items in menu.items():
+            station = self._category_rules.get(category)
+            if station is None:
+                continue
+            for item in items:
+                table.setdefault(item.get("id"), station)
+        self.item_station = table  # swapped whole, readers never see a partial table
+        log.info(f"Routing table: {len(table)} menu item(s) pinned to stations {', '.join(self.stations)}")
+
+    def station_for(self, item: OrderItem) -> str:
+        station = self.item_station.get(item.id)
+        if station is None:
+            station = self._type_rules.get(item.type, self.default_station)
+        return station
+
+    def split(self, order: Order) -> Dict[str, List[OrderItem]]:
+        """Items of the order grouped per station, in station config order."""
+        tickets: Dict[str, List[OrderItem]] = {}
+        for item in order.items:
+            tickets.setdefault(self.station_for(item), []).append(item)
+        return {station: tickets[station] for station in self.stations if station in tickets}
@@ -4,64 +4,181 @@ Printer management service for handling multiple printers.
 import logging
 from services.Printer import Printer
 from services.MockPrinter import MockPrinter
+from services.async_dispatcher import AsyncPrintDispatcher
+from services.printer_routing import StationRouter, default_stations
 from config import Config
+from utils import metrics
+from utils.file_utils import load_menu
+from utils.printer_health_checker import PrinterHealthMonitor
 
 from models import Order
 
 log = logging.getLogger(__name__)
 
 class PrinterService:
-    """Service for managing food and drink printers"""
+    """Service for managing the printer stations (by default: food and drinks)"""
 
-    def __init__(self):
-        """Initialize printer service with configuration"""
-        self.config = Config.get_printer_config()
-        self._initialize_printers()
+    def __init__(self, config=None, printers=None):
+        """
+        Initialize printer service with configuration (defaults to Config.get_printer_config()).
 
-    def _initialize_printers(self):
-        """Initialize the printers based on configuration"""
-        if self.config['mock']:
-            self.printer_food = MockPrinter()
-            self.printer_drinks = MockPrinter()
+        `printers` maps station name -> printer object and replaces the
+        printers built from config (no health monitor is started then).
+        """
+        self.config = config or Config.get_printer_config()
+        self.health_monitor = None
+        # Set in 'asyncio' dispatcher mode; started by OrderService
+        self.dispatcher = None
+        stations = self.config.get('stations') or default_stations(
+            self.config.get('ip_food'), self.config.get('ip_drinks')
+        )
+        self.router = StationRouter(stations, load_menu())
+        if printers is not None:
+            self.printers = dict(printers)
         else:
-            self.printer_food = Printer(
-                self.config['ip_food'],
-                logo_path=self.config['logo_path']
+            self._initialize_printers(stations)
+
+    def _initialize_printers(self, stations):
+        """Initialize one printer per station based on configuration"""
+        if self.config['mock']:
+            self.printers = {name: MockPrinter() for name in stations}
+            return
+
+        self.printers = {
+            name: Printer(station.get('ip'), logo_path=self.config.get('logo_path'))
+            for name, station in stations.items()
+        }
+        if Config.PRINT_DISPATCHER == 'asyncio':
+            self.dispatcher = AsyncPrintDispatcher(
+                self.printers,
+                batch_size=Config.PRINT_BATCH_SIZE,
+                retry_delay=Config.PRINT_RETRY_DELAY_SECONDS,
             )
-            self.printer_drinks = Printer(
-                self.config['ip_drinks'],
-                logo_path=self.config['logo_path']
+        if Config.PRINTER_HEALTH_INTERVAL_SECONDS > 0:
+            self.health_monitor = PrinterHealthMonitor(
+                printers={f"{name}_printer": station.get('ip') for name, station in stations.items()},
+                windows=Config.PRINTER_HEALTH_WINDOWS_SECONDS
             )
+            self.health_monitor.start(Config.PRINTER_HEALTH_INTERVAL_SECONDS)
+
+    def close(self, timeout: float = 5.0):
+        """Stop the asyncio dispatcher (closing its printer connections) and the health monitor"""
+        if self.dispatcher is not None:
+            self.dispatcher.stop(timeout)
+        if self.health_monitor is not None:
+            self.health_monitor.stop()
+
+    @property
+    def stations(self):
+        """Station names in configuration order"""
+        return list(self.printers)
+
+    @property
+    def printer_food(self):
+        return self.printers.get('food')
+
+    @property
+    def printer_drinks(self):
+        return self.printers.get('drinks')
+
+    def route(self, order: Order):
+        """Items of the order per station, e.g. {'food': [...], 'drinks': [...]}"""
+        return self.router.split(order)
+
+    def is_station_available(self, station):
+        """Check if the printer of one station is available"""
+        return self.printers[station].is_available()
 
     def are_printers_available(self):
-        """Check if both printers are available"""
-        return (self.printer_food.is_available() and
-                self.printer_drinks.is_available())
+        """Check if all printers are available"""
+        return all(printer.is_available() for printer in self.printers.values())
 
     def print_order(self, order:Order):
-        """Print order to appropriate printers based on item types"""
+        """Print order to the station printers its items are routed to"""
         try:
-            if order.food_items:
-                self.printer_food.print_order(order, order.food_items)
-
-            if order.drink_items:
-                self.printer_drinks.print_order(order, order.drink_items)
+            for station, items in self.route(order).items():
+                self.printers[station].print_order(order, items)
 
             return True
         except Exception as e:
             log.exception(f"Error printing order (order_id={getattr(order, 'id', None)})")
             return False
 
+    def print_tickets(self, station, tickets):
+        """
+        Print (order, items) tickets on one station over a single connection.
+
+        Returns one boolean per ticket; tickets without items count as printed.
+        """
+        indices = [index for index, (_, items) in enumerate(tickets) if items]
+        results = [True] * len(tickets)
+        if not indices:
+            return results
+        try:
+            with metrics.PRINT_SESSION_SECONDS.time(station=station):
+                printed = self.printers[station].print_orders([tickets[index] for index in indices])
+        except Exception:
+            log.exception(f"Error printing batch of {len(indices)} ticket(s) on station '{station}'")
+            printed = [False] * len(indices)
+        metrics.TICKETS_PRINTED.inc(sum(bool(ok) for ok in printed), station=station)
+        for index, ok in zip(indices, printed):
+            results[index] = ok
+        return results
+
+    def last_error(self, station):
+        """Why the station's last print session aborted, if its printer reports it"""
+        return getattr(self.printers[station], 'last_error', None)
+
+    def print_orders(self, orders):
+        """
+        Print a batch of orders with one connection per printer.
+
+        Returns a list of booleans, one per order: an order only counts as
+        printed if every ticket it produced (on any station) went out.
+        """
+        results = [True] * len(orders)
+        routed = [self.route(order) for order in orders]
+        for station in self.printers:
+            indices = [index for index, tickets in enumerate(routed) if station in tickets]
+            if not indices:
+                continue
+            printed = self.print_tickets(station, [(orders[i], routed[i][station]) for i in indices])
+            for index, ok in zip(indices, printed):
+                results[index] = results[index] and ok
+        return results
+
 
     def get_printer_status(self):
-        """Get status of both printers"""
-        return {
-            'food_printer': {
-                'available': self.printer_food.is_available(),
-                'type': 'mock' if self.config['mock'] else 'physical'
-            },
-            'drinks_printer': {
-                'available': self.printer_drinks.is_available(),
-                'type': 'mock' if self.config['mock'] else 'physical'
+        """Get status of every station printer, keyed '<station>_printer'.
+
+        Physical printers are answered from the background health monitor's
+        cache, so this never waits on the network; a printer counts as
+        unavailable until its first probe has completed.
+        """
+        monitor = getattr(self, 'health_monitor', None)
+        if self.config['mock'] or monitor is None:
+            return {
+                f'{station}_printer': {
+                    'available': printer.is_available(),
+                    'type': 'mock' if self.config['mock'] else 'physical'
+                }
+                for station, printer in self.printers.items()
             }
-        }
+
+        cached = monitor.status()
+        status = {}
+        for station in self.printers:
+            entry = cached.get(f'{station}_printer', {})
+            status[f'{station}_printer'] = {
+                'available': bool(entry.get('reachable', False)),
+                'type': 'physical',
+                'latency_ms': entry.get('latency_ms'),
+                'last_change': entry.get('last_change'),
+                'checked_at': entry.get('checked_at'),
+            }
+        return status
+
+    def get_printer_health(self):
+        """Availability and connect-latency histograms per printer, or None without a health monitor"""
+        monitor = getattr(self, 'health_monitor', None)
+        return monitor.stats() if monitor else None
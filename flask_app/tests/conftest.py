@@ -5,6 +5,7 @@ import pytest
 
 from config import Config
 from services.order_logger import OrderLogger
+from utils.printer_emulator import EscPosEmulator
 
 
 @pytest.fixture
@@ -23,15 +24,15 @@ def order_logger(db_path):
 def order_service_factory(db_path):
     """
     Factory for creating OrderService instances against the same temp DB, with
-    the printer layer mocked out (always available, always prints successfully).
+    mock printers on the default food/drinks stations (always available,
+    always print successfully).
 
     Calling the factory more than once simulates an app restart: each instance
     is a brand-new OrderService (no shared in-memory state) pointed at the same
     on-disk DB, so it lets tests assert that dashboard state survives a restart.
     """
-    with patch("services.printer_service.PrinterService.__init__", return_value=None), \
-         patch("services.printer_service.PrinterService.are_printers_available", return_value=True), \
-         patch("services.printer_service.PrinterService.print_order", return_value=True), \
+    with patch.object(Config, "MOCK_PRINTER", True), \
+         patch.object(Config, "PRINTER_STATIONS", None), \
          patch.object(Config, "DATABASE_PATH", db_path):
         from services.order_service import OrderService
 
@@ -39,3 +40,52 @@ def order_service_factory(db_path):
             return OrderService()
 
         yield make
+
+
+@pytest.fixture
+def printer_emulator_factory():
+    """Factory for ESC/POS emulators on free localhost ports; all stopped after the test."""
+    emulators = []
+
+    def make(**kwargs):
+        emulator = EscPosEmulator(port=0, **kwargs).start()
+        emulators.append(emulator)
+        return emulator
+
+    yield make
+    for emulator in emulators:
+        emulator.stop()
+
+
+@pytest.fixture
+def printer_emulator(printer_emulator_factory):
+    """A single running ESC/POS emulator — point a Printer at `printer_emulator.address`."""
+    return printer_emulator_factory()
+
+
+@pytest.fixture
+def emulated_printers(printer_emulator_factory):
+    """Food and drinks emulators, keyed like the printers in PrinterService."""
+    return {
+        "food": printer_emulator_factory(name="food"),
+        "drinks": printer_emulator_factory(name="drinks"),
+    }
+
+
+@pytest.fixture
+def emulated_order_service_factory(db_path, emulated_printers):
+    """
+    Like order_service_factory, but nothing is mocked: the real PrinterService
+    and Printer classes talk ESC/POS over TCP to the `emulated_printers`.
+    """
+    with patch.object(Config, "DATABASE_PATH", db_path), \
+         patch.object(Config, "MOCK_PRINTER", False), \
+         patch.object(Config, "PRINTER_STATIONS", None), \
+         patch.object(Config, "FOOD_PRINTER_IP", emulated_printers["food"].address), \
+         patch.object(Config, "DRINKS_PRINTER_IP", emulated_printers["drinks"].address):
+        from services.order_service import OrderService
+
+        def make():
+            return OrderService()
+
+        yield make
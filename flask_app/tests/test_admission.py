@@ -0,0 +1,162 @@
+"""
+Tests for admission control: wait estimates from the DB backlog and the
+measured print throughput, and the reject / flag policies on POST /order.
+"""
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from config import Config
+from models import Order, OrderItem
+from services.admission import AdmissionControl, BacklogFull
+from utils import metrics
+
+
+def food_order(table=1):
+    return Order(table_number=table, items=[OrderItem(id=61, name="Keule Pommes", price=10.5, type="food")])
+
+
+@pytest.fixture
+def app(db_path, tmp_path):
+    with patch.object(Config, "MOCK_PRINTER", True), \
+         patch.object(Config, "PRINTER_STATIONS", None), \
+         patch.object(Config, "DATABASE_PATH", db_path), \
+         patch.object(Config, "LOG_DIR", str(tmp_path / "logs")), \
+         patch.object(Config, "ADMISSION_MAX_BACKLOG", 3):
+        from main import create_app
+        app = create_app()
+    yield app
+    app.order_service.shutdown(timeout=1)
+
+
+def test_wait_is_estimated_from_backlog_and_measured_throughput(order_logger):
+    for table in range(4):
+        order_logger.save_order(food_order(table), stations=["food"])
+    admission = AdmissionControl(order_logger, max_backlog=10, default_ticket_seconds=3.0, refresh_seconds=0)
+
+    assert admission.estimate(["food"]) == {"estimated_wait_seconds": 12.0, "delayed": False}
+    assert admission.estimate(["drinks"])["estimated_wait_seconds"] == 0.0
+
+    order_logger.set_print_throughput("food", 0.5)
+    status = admission.status(["food", "drinks"])
+    assert status["stations"]["food"] == {"pending": 4, "ticket_seconds": 0.5, "measured": True,
+                                          "estimated_wait_seconds": 2.0}
+    assert status["stations"]["drinks"]["pending"] == 0
+    assert status["estimated_wait_seconds"] == 2.0
+
+
+def test_throughput_is_measured_from_print_sessions(order_logger):
+    admission = AdmissionControl(order_logger, smoothing=0.5, refresh_seconds=0)
+
+    metrics.PRINT_SESSION_SECONDS.observe(2.0, station="terrace")
+    metrics.TICKETS_PRINTED.inc(4, station="terrace")
+    admission.update_throughput()
+    assert order_logger.get_print_backlog()["terrace"]["ticket_seconds"] == 0.5
+
+    metrics.PRINT_SESSION_SECONDS.observe(3.0, station="terrace")
+    metrics.TICKETS_PRINTED.inc(2, station="terrace")
+    admission.update_throughput()
+    admission.update_throughput()  # nothing new printed: unchanged
+    assert order_logger.get_print_backlog()["terrace"]["ticket_seconds"] == 1.0
+
+
+def test_reject_policy_refuses_orders_over_the_threshold(order_logger):
+    for table in range(2):
+        order_logger.save_order(food_order(table), stations=["food"])
+    admission = AdmissionControl(order_logger, policy="reject", max_backlog=3, default_ticket_seconds=2.0)
+
+    admission.admit(["food", "drinks"])
+    admission.admit(["food"])  # the first order isn't counted yet
+    admission.count(["food", "drinks"])
+    with pytest.raises(BacklogFull) as refused:
+        admission.admit(["food"])
+    assert (refused.value.station, refused.value.pending, refused.value.retry_after) == ("food", 3, 2)
+    admission.admit(["drinks"])
+
+    with pytest.raises(BacklogFull):
+        admission.admit(["drinks"], ahead={"drinks": 3})
+
+    with pytest.raises(ValueError):
+        AdmissionControl(order_logger, policy="drop")
+
+
+def test_order_route_answers_503_with_retry_after(app):
+    service = app.order_service
+    service.admission.policy = "reject"
+    backlog = {"food": {"pending": 5, "ticket_seconds": 1.5}}
+    client = app.test_client()
+
+    with patch.object(service.order_logger, "get_print_backlog", return_value=backlog):
+        service.admission._refreshed_at = None
+        refused = client.post("/order", json={"tableNumber": 2, "orderedItems": [{"id": 61}]})
+        drinks = client.post("/order", json={"tableNumber": 2, "orderedItems": [{"id": 1}]})
+        batch = client.post("/orders/batch", json={"orders": [
+            {"clientId": "a", "tableNumber": 2, "orderedItems": [{"id": 1}]},
+            {"clientId": "b", "tableNumber": 2, "orderedItems": [{"id": 61}]}]})
+
+    assert refused.status_code == 503
+    assert refused.headers["Retry-After"] == "5"  # 3 tickets over the threshold of 3
+    assert refused.get_json()["estimated_wait_seconds"] == 7.5
+    assert drinks.status_code == 200 and drinks.get_json()["delayed"] is False
+    assert batch.status_code == 503
+    assert [o["table_number"] for o in service.order_logger.get_recent_orders(10)] == [2]
+
+
+def test_flag_policy_accepts_and_marks_delayed(app):
+    service = app.order_service
+    backlog = {"food": {"pending": 3, "ticket_seconds": None}}
+    before = metrics.ORDERS_THROTTLED.value(action="delayed")
+
+    with patch.object(service.order_logger, "get_print_backlog", return_value=backlog):
+        service.admission._refreshed_at = None
+        response = app.test_client().post("/order", json={"tableNumber": 2, "orderedItems": [{"id": 61}]})
+        status = app.test_client().get("/printer/status").get_json()["admission"]
+
+    body = response.get_json()
+    assert response.status_code == 200 and body["order_id"]
+    assert body["delayed"] is True
+    assert body["estimated_wait_seconds"] == 4 * Config.PRINT_TICKET_SECONDS  # 3 queued + this one
+    assert metrics.ORDERS_THROTTLED.value(action="delayed") == before + 1
+    assert status["policy"] == "flag" and status["max_backlog"] == 3
+    assert set(status["stations"]) == {"food", "drinks"}
+
+
+def test_orders_are_journaled_when_the_backlog_cannot_be_read(app):
+    service = app.order_service
+    disk_error = sqlite3.OperationalError("disk I/O error")
+
+    with patch.object(service.order_logger, "get_print_backlog", side_effect=disk_error), \
+         patch.object(service.order_logger, "save_order", side_effect=disk_error):
+        service.admission._refreshed_at = None
+        response = app.test_client().post("/order", json={"tableNumber": 2, "orderedItems": [{"id": 61}]})
+
+    assert response.status_code == 200
+    assert response.get_json()["order_id"] is None
+    assert service.journal.has_segments()
+
+
+def test_failed_wait_estimate_leaves_the_fields_out(app):
+    service = app.order_service
+
+    with patch.object(service, "estimate_wait", side_effect=sqlite3.OperationalError("disk I/O error")):
+        response = app.test_client().post("/order", json={"tableNumber": 2, "orderedItems": [{"id": 61}]})
+
+    body = response.get_json()
+    assert response.status_code == 200 and body["order_id"]
+    assert "estimated_wait_seconds" not in body and "delayed" not in body
+
+
+def test_refused_batch_leaves_the_cached_backlog_unchanged(app):
+    service = app.order_service
+    service.admission.policy = "reject"
+    client = app.test_client()
+    batch = {"orders": [{"clientId": str(i), "tableNumber": 2, "orderedItems": [{"id": 61}]} for i in range(4)]}
+
+    refused = client.post("/orders/batch", json=batch)
+    assert refused.status_code == 503
+    assert service.admission.estimate(["food"])["estimated_wait_seconds"] == 0
+
+    batch["orders"] = batch["orders"][:3]
+    assert client.post("/orders/batch", json=batch).status_code == 200
+    assert service.admission.estimate(["food"])["estimated_wait_seconds"] == 3 * Config.PRINT_TICKET_SECONDS
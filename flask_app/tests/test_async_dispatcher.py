@@ -0,0 +1,130 @@
+"""
+Tests for the asyncio print dispatcher (PRINT_DISPATCHER=asyncio): printing
+over non-blocking streams, reconnects, per-station isolation, and the
+OrderService pipeline running on one event-loop thread.
+"""
+import threading
+import time
+from unittest.mock import patch
+
+from config import Config
+from models import Order, OrderItem, PrintJob
+from services.Printer import Printer
+from services.async_dispatcher import AsyncPrintDispatcher
+
+
+def wait_until(condition, timeout=5.0, interval=0.05):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(interval)
+    return False
+
+
+def make_job(job_id, station, order_id=None):
+    order = Order(table_number=3, id=order_id or job_id,
+                  items=[OrderItem(name="Pils", price=3.5, quantity=1, type="drink", id=1)])
+    return PrintJob(id=job_id, order_id=order.id, station=station, order=order, items=order.items)
+
+
+def make_dispatcher(emulators, **kwargs):
+    printers = {name: Printer(emulator.address) for name, emulator in emulators.items()}
+    return AsyncPrintDispatcher(printers, **kwargs)
+
+
+def test_render_ticket_matches_network_output(printer_emulator):
+    printer = Printer(printer_emulator.address)
+    job = make_job(1, "bar")
+
+    printer.print_orders([(job.order, job.items)])
+    assert printer_emulator.wait_for_tickets(1)
+    sent_by_network = printer_emulator.tickets[0]
+
+    printer_emulator.clear()
+    dispatcher = make_dispatcher({"bar": printer_emulator}).start()
+    try:
+        dispatcher.submit(job)
+        assert printer_emulator.wait_for_tickets(1)
+    finally:
+        dispatcher.stop()
+
+    assert printer_emulator.tickets[0].lines == sent_by_network.lines
+
+
+def test_dispatcher_prints_batches_and_reports_each_job(emulated_printers):
+    printed = []
+    dispatcher = make_dispatcher(emulated_printers, batch_size=5).start(on_printed=printed.append)
+    try:
+        for i in range(1, 7):
+            dispatcher.submit(make_job(i, "food" if i % 2 else "drinks"))
+
+        assert emulated_printers["food"].wait_for_tickets(3)
+        assert emulated_printers["drinks"].wait_for_tickets(3)
+        assert wait_until(lambda: len(printed) == 6)
+    finally:
+        dispatcher.stop()
+
+    assert [t.order_id for t in emulated_printers["food"].tickets] == [1, 3, 5]
+    assert sorted(job.id for job in printed) == [1, 2, 3, 4, 5, 6]
+
+
+def test_dead_printer_is_retried_without_delaying_other_stations(emulated_printers):
+    printed = []
+    emulated_printers["food"].set_refusing(True)
+    dispatcher = make_dispatcher(emulated_printers, retry_delay=0.1, connect_timeout=0.5).start(on_printed=printed.append)
+    try:
+        dispatcher.submit(make_job(1, "food"))
+        dispatcher.submit(make_job(2, "drinks"))
+
+        assert emulated_printers["drinks"].wait_for_tickets(1, timeout=3.0)
+        assert emulated_printers["food"].tickets == []
+
+        emulated_printers["food"].set_refusing(False)
+        assert emulated_printers["food"].wait_for_tickets(1)
+        assert wait_until(lambda: len(printed) == 2)
+    finally:
+        dispatcher.stop()
+
+
+def test_jobs_are_dropped_when_not_allowed_to_print(printer_emulator):
+    dropped = []
+    dispatcher = make_dispatcher({"bar": printer_emulator}).start(
+        on_dropped=dropped.append, should_print=lambda: False)
+    try:
+        dispatcher.submit(make_job(1, "bar"))
+        assert wait_until(lambda: len(dropped) == 1)
+    finally:
+        dispatcher.stop()
+
+    assert printer_emulator.tickets == []
+
+
+def test_order_service_in_asyncio_mode_uses_one_dispatcher_thread(emulated_order_service_factory, emulated_printers):
+    with patch.object(Config, "PRINT_DISPATCHER", "asyncio"):
+        service = emulated_order_service_factory()
+    try:
+        order = Order(table_number=4, items=[
+            OrderItem(name="Keule Pommes", price=10.5, quantity=1, type="food", id=61),
+            OrderItem(name="Pils", price=3.5, quantity=2, type="drink", id=1),
+        ])
+        order_id = service.process_order(order)
+
+        assert emulated_printers["food"].wait_for_tickets(1)
+        assert emulated_printers["drinks"].wait_for_tickets(1)
+        assert wait_until(lambda: service.order_logger.get_order(order_id)["order"]["status"] == "printed")
+        assert service.order_threads == {}
+        assert "print-dispatcher" in {t.name for t in threading.enumerate()}
+    finally:
+        service.leader_election.stop()
+        service.dispatcher.stop()
+        service.printer_service.health_monitor.stop()
+
+
+def test_dispatch_benchmark_smoke():
+    from benchmarks.print_dispatch import run_all
+
+    results = run_all([2], orders=5, rate=100.0, connect_latency=0, print_latency=0)
+
+    assert [r["mode"] for r in results] == ["threads", "asyncio"]
+    assert all(r["complete"] for r in results)
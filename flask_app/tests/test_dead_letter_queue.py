@@ -0,0 +1,136 @@
+"""
+Tests for the print dead-letter queue: a ticket that keeps failing while its
+printer is reachable is parked after PRINT_MAX_ATTEMPTS without holding up
+the tickets behind it, and can be inspected, retried or discarded through
+the admin API.
+"""
+import time
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+
+from config import Config
+from models import Order, OrderItem
+from routes.admin_routes import admin_bp
+from services.Printer import Printer
+
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+def food_order(table=1):
+    return Order(table_number=table,
+                 items=[OrderItem(name="Keule Pommes", price=10.5, quantity=1, type="food", id=61)])
+
+
+def wait_until(condition, timeout=5.0, interval=0.02):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(interval)
+    return False
+
+
+def poison(method, bad_table):
+    """Patch a Printer method to fail for one table's orders, like a ticket with broken data"""
+    original = getattr(Printer, method)
+
+    def fail_for_bad_orders(self, *args):
+        order = args[1] if method == "write_ticket" else args[0]
+        if order.table_number == bad_table:
+            raise ValueError(f"cannot print order {order.id}")
+        return original(self, *args)
+
+    return patch.object(Printer, method, fail_for_bad_orders)
+
+
+@pytest.fixture
+def admin_client():
+    def make(service):
+        app = Flask(__name__)
+        app.order_service = service
+        app.register_blueprint(admin_bp)
+        return app.test_client()
+    return make
+
+
+@pytest.mark.parametrize("dispatcher, method", [("threads", "write_ticket"), ("asyncio", "render_ticket")])
+def test_poison_ticket_is_dead_lettered_without_stalling_the_station(
+        emulated_order_service_factory, emulated_printers, dispatcher, method):
+    food = emulated_printers["food"]
+    with patch.object(Config, "PRINT_DISPATCHER", dispatcher), \
+         patch.object(Config, "PRINT_MAX_ATTEMPTS", 3), \
+         patch.object(Config, "PRINT_RETRY_DELAY_SECONDS", 10), \
+         poison(method, bad_table=99):
+        service = emulated_order_service_factory()
+        try:
+            poison_id = service.process_order(food_order(table=99))
+            good_ids = [service.process_order(food_order(table=i + 1)) for i in range(10)]
+
+            # Well within the 10 s retry pause: the station never waited on the poison ticket
+            assert food.wait_for_tickets(10, timeout=3)
+            assert wait_until(lambda: len(service.get_dead_print_jobs()) == 1)
+        finally:
+            service.shutdown(timeout=1)
+
+    dead = service.get_dead_print_jobs()[0]
+    assert dead["order_id"] == poison_id
+    assert dead["attempts"] == 3
+    assert "cannot print order" in dead["last_error"]
+    assert sorted(t.order_id for t in food.tickets) == good_ids
+    assert service.get_order_details(poison_id)["order"]["status"] == "pending"
+
+
+def test_unreachable_printer_does_not_count_attempts(emulated_order_service_factory, emulated_printers):
+    emulated_printers["food"].set_refusing(True)
+    with patch.object(Config, "PRINT_DISPATCHER", "asyncio"), \
+         patch.object(Config, "PRINT_MAX_ATTEMPTS", 1), \
+         patch.object(Config, "PRINT_RETRY_DELAY_SECONDS", 0.05):
+        service = emulated_order_service_factory()
+        try:
+            order_id = service.process_order(food_order())
+            time.sleep(0.5)
+        finally:
+            service.shutdown(timeout=0.2)
+
+    job = service.order_logger.get_pending_print_jobs(order_ids=[order_id])[0]
+    assert service.get_print_job(job["id"])["attempts"] == 0
+    assert service.get_dead_print_jobs() == []
+
+
+def test_admin_api_lists_inspects_retries_and_discards(order_service_factory, admin_client):
+    service = order_service_factory()
+    service.shutdown(timeout=0.2)  # nothing prints; jobs are managed by hand
+    first = service.order_logger.save_order(food_order(table=3), stations=["food"])
+    second = service.order_logger.save_order(food_order(table=4), stations=["food"])
+    jobs = {row["order_id"]: row["id"] for row in service.order_logger.get_pending_print_jobs()}
+    for job_id in jobs.values():
+        assert service.order_logger.record_print_failure(job_id, "ValueError('boom')", max_attempts=1) == (1, True)
+    client = admin_client(service)
+
+    with patch.object(Config, "ADMIN_TOKEN", "secret"):
+        assert client.get("/admin/print-jobs/dead").status_code == 403
+        assert client.get("/admin/print-jobs/dead", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+        listed = client.get("/admin/print-jobs/dead", headers=ADMIN).get_json()["print_jobs"]
+        assert [job["order_id"] for job in listed] == [first, second]
+
+        detail = client.get(f"/admin/print-jobs/{jobs[first]}", headers=ADMIN).get_json()
+        assert detail["status"] == "dead"
+        assert detail["last_error"] == "ValueError('boom')"
+        assert detail["items"][0]["item_name"] == "Keule Pommes"
+        assert client.get("/admin/print-jobs/9999", headers=ADMIN).status_code == 404
+
+        assert client.post(f"/admin/print-jobs/{jobs[first]}/retry", headers=ADMIN).status_code == 200
+        assert client.post(f"/admin/print-jobs/{jobs[first]}/retry", headers=ADMIN).status_code == 404
+        assert client.delete(f"/admin/print-jobs/{jobs[second]}", headers=ADMIN).status_code == 200
+
+    with patch.object(Config, "ADMIN_TOKEN", None):
+        assert client.get("/admin/print-jobs/dead", headers=ADMIN).status_code == 403
+
+    pending = service.order_logger.get_pending_print_jobs()
+    assert [row["order_id"] for row in pending] == [first]
+    assert service.get_print_job(jobs[first])["attempts"] == 0
+    assert service.get_order_details(second)["order"]["status"] == "printed"
+    assert service.get_dead_print_jobs() == []
@@ -0,0 +1,102 @@
+"""
+Tests for OrderService.shutdown(): queued tickets are printed out within the
+deadline, nothing new is queued meanwhile, and whatever is left stays pending
+in the DB so the next start replays only unfinished tickets.
+"""
+import signal
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from config import Config
+from models import Order, OrderItem
+
+
+def food_order(table=1):
+    return Order(table_number=table,
+                 items=[OrderItem(name="Keule Pommes", price=10.5, quantity=1, type="food", id=61)])
+
+
+def wait_until(condition, timeout=5.0, interval=0.02):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(interval)
+    return False
+
+
+@pytest.mark.parametrize("dispatcher", ["threads", "asyncio"])
+def test_shutdown_prints_out_the_queue_and_releases_the_lease(
+        emulated_order_service_factory, emulated_printers, dispatcher):
+    food = emulated_printers["food"]
+    food.print_latency = 0.02
+    with patch.object(Config, "PRINT_DISPATCHER", dispatcher):
+        service = emulated_order_service_factory()
+    order_ids = [service.process_order(food_order(table=i + 1)) for i in range(10)]
+
+    left = service.shutdown(timeout=5)
+
+    assert left == 0
+    # Everything was handed to the printer before the sockets were closed
+    assert food.wait_for_tickets(10)
+    assert sorted(t.order_id for t in food.tickets) == order_ids
+    assert service.order_logger.get_pending_print_jobs() == []
+    assert all(not thread.is_alive() for thread in service.order_threads.values())
+    assert service.leader_election.current_holder() is None
+    assert service.shutdown() == 0  # idempotent
+
+
+def test_orders_after_shutdown_are_saved_but_not_printed(emulated_order_service_factory, emulated_printers):
+    service = emulated_order_service_factory()
+    service.shutdown(timeout=1)
+
+    order_id = service.process_order(food_order())
+
+    time.sleep(0.2)
+    assert emulated_printers["food"].tickets == []
+    assert [row["order_id"] for row in service.order_logger.get_pending_print_jobs()] == [order_id]
+
+
+def test_deadline_leaves_unfinished_tickets_for_the_next_start(emulated_order_service_factory, emulated_printers):
+    food = emulated_printers["food"]
+    food.set_refusing(True)
+    with patch.object(Config, "PRINT_RETRY_DELAY_SECONDS", 0.05):
+        service = emulated_order_service_factory()
+        order_ids = [service.process_order(food_order(table=i + 1)) for i in range(5)]
+
+        started = time.monotonic()
+        left = service.shutdown(timeout=0.3)
+        assert time.monotonic() - started < 3
+        assert left == 5
+        assert len(service.order_logger.get_pending_print_jobs()) == 5
+
+        food.set_refusing(False)
+        restarted = emulated_order_service_factory()
+        try:
+            assert food.wait_for_tickets(5)
+            assert wait_until(lambda: restarted.order_logger.get_pending_print_jobs() == [])
+        finally:
+            restarted.shutdown(timeout=1)
+
+    assert sorted(t.order_id for t in food.tickets) == order_ids
+
+
+def test_signal_handler_drains_then_exits():
+    from main import install_shutdown_handlers
+
+    app = SimpleNamespace(order_service=MagicMock())
+    previous = {signum: signal.getsignal(signum) for signum in (signal.SIGTERM, signal.SIGINT)}
+    try:
+        install_shutdown_handlers(app)
+        with pytest.raises(SystemExit):
+            signal.getsignal(signal.SIGTERM)(signal.SIGTERM, None)
+        with pytest.raises(KeyboardInterrupt):
+            signal.getsignal(signal.SIGINT)(signal.SIGINT, None)
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+    assert app.order_service.shutdown.call_count == 2
@@ -0,0 +1,135 @@
+"""
+Tests for Idempotency-Key handling on POST /order: replayed responses,
+key reuse with a different body, expiry, the bounded LRU and concurrent
+duplicates.
+"""
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+
+from config import Config
+from models import Order, OrderItem
+from services.idempotency import IdempotencyKeyExists, IdempotencyStore
+
+ORDER = {"tableNumber": 4, "orderedItems": [{"id": 61, "quantity": 2}, {"id": 1, "quantity": 1}]}
+
+
+@pytest.fixture
+def app(db_path, tmp_path):
+    with patch.object(Config, "MOCK_PRINTER", True), \
+         patch.object(Config, "PRINTER_STATIONS", None), \
+         patch.object(Config, "DATABASE_PATH", db_path), \
+         patch.object(Config, "LOG_DIR", str(tmp_path / "logs")):
+        from main import create_app
+        app = create_app()
+    yield app
+    app.order_service.shutdown(timeout=1)
+
+
+def post(client, body, key):
+    return client.post("/order", data=json.dumps(body), content_type="application/json",
+                       headers={"Idempotency-Key": key})
+
+
+def count(order_logger, table):
+    with order_logger.get_connection() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_retry_gets_the_original_response(app):
+    client = app.test_client()
+    order_logger = app.order_service.order_logger
+
+    first = post(client, ORDER, "tablet-7-0001")
+    app.order_service.idempotency._cache.clear()  # answered from the DB, as another worker would
+    retry = post(client, ORDER, "tablet-7-0001")
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.data == first.data
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert count(order_logger, "orders") == 1
+    assert count(order_logger, "print_jobs") == 2  # one food, one drinks ticket
+
+
+def test_key_reused_for_another_order_is_rejected(app):
+    client = app.test_client()
+    post(client, ORDER, "tablet-7-0002")
+
+    response = post(client, {**ORDER, "tableNumber": 5}, "tablet-7-0002")
+
+    assert response.status_code == 422
+    assert count(app.order_service.order_logger, "orders") == 1
+
+
+@pytest.mark.parametrize("key", ["", "x" * 256])
+def test_invalid_keys_are_rejected(app, key):
+    response = post(app.test_client(), ORDER, key)
+
+    assert response.status_code == 400
+    assert count(app.order_service.order_logger, "orders") == 0
+
+
+def test_expired_key_places_a_new_order(app):
+    client = app.test_client()
+    first = post(client, ORDER, "tablet-7-0003").get_json()
+
+    with patch("services.idempotency.time.time", return_value=time.time() + Config.IDEMPOTENCY_TTL_SECONDS + 1), \
+         patch("services.order_logger.time.time", return_value=time.time() + Config.IDEMPOTENCY_TTL_SECONDS + 1):
+        second = post(client, ORDER, "tablet-7-0003")
+
+    assert second.status_code == 200
+    assert "Idempotent-Replayed" not in second.headers
+    assert second.get_json()["order_id"] != first["order_id"]
+    assert count(app.order_service.order_logger, "idempotency_keys") == 1
+
+
+def test_cache_is_bounded_and_expired_keys_are_purged(order_logger):
+    store = IdempotencyStore(order_logger, ttl_seconds=60, cache_size=2)
+    for n in range(3):
+        order_id = order_logger.save_order(Order(table_number=1, items=[
+            OrderItem(id=1, name="Pils", price=3.5, type="drink")]), idempotency_key=f"k{n}")
+        store.record_response(f"k{n}", order_id, None, f'{{"order_id": {order_id}}}')
+
+    assert list(store._cache) == ["k1", "k2"]
+    assert store.lookup("k0").response == '{"order_id": 1}'  # from the DB
+    assert list(store._cache) == ["k2", "k0"]
+
+    store._next_purge = 0
+    with patch("services.idempotency.time.time", return_value=time.time() + 61):
+        assert store.lookup("k2") is None
+        store._purge_expired()
+    assert count(order_logger, "idempotency_keys") == 0
+
+
+def test_concurrent_duplicate_saves_nothing(order_service_factory):
+    # Two workers: the second one's lookup ran before the first one committed
+    first, second = order_service_factory(), order_service_factory()
+    try:
+        first.process_order(dict(ORDER), idempotency_key="tablet-7-0004", request_hash="h")
+
+        with pytest.raises(IdempotencyKeyExists):
+            second.process_order(dict(ORDER), idempotency_key="tablet-7-0004", request_hash="h")
+
+        assert count(first.order_logger, "orders") == 1
+        assert second.idempotency.lookup("tablet-7-0004").response is None
+    finally:
+        first.shutdown(timeout=1)
+        second.shutdown(timeout=1)
+
+
+def test_replay_before_the_response_was_stored(app):
+    # The first request saved the order but died before storing its response
+    from services.idempotency import request_hash
+    body = json.dumps(ORDER)
+    order_id = app.order_service.process_order(dict(ORDER), idempotency_key="tablet-7-0005",
+                                               request_hash=request_hash(ORDER))
+
+    response = app.test_client().post("/order", data=body, content_type="application/json",
+                                      headers={"Idempotency-Key": "tablet-7-0005"})
+
+    assert response.headers["Idempotent-Replayed"] == "true"
+    assert response.get_json()["order_id"] == order_id
+    assert response.get_json()["order"]["totalCost"] == 24.5
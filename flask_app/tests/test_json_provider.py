@@ -0,0 +1,106 @@
+"""
+Tests for the pluggable JSON provider and the compact Order serialization
+used by the dashboards.
+"""
+import json
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+
+from config import Config
+from models import Order, OrderItem
+from utils import json_provider
+from utils.json_provider import OrjsonProvider, StdlibJSONProvider, provider_class
+
+
+def make_order():
+    return Order(id=3, table_number=12, comment="ohne Zwiebeln", items=[
+        OrderItem(id=61, name="Keule Pommes", price=10.5, quantity=2, type="food"),
+        OrderItem(id=3, name="Radler süß", price=3.5, quantity=1, type="drink"),
+    ])
+
+
+@pytest.fixture
+def app(db_path, tmp_path):
+    with patch.object(Config, "MOCK_PRINTER", True), \
+         patch.object(Config, "PRINTER_STATIONS", None), \
+         patch.object(Config, "DATABASE_PATH", db_path), \
+         patch.object(Config, "LOG_DIR", str(tmp_path / "logs")):
+        from main import create_app
+        app = create_app()
+    yield app
+    app.order_service.shutdown(timeout=1)
+
+
+def test_compact_order_has_each_field_once():
+    order = make_order()
+
+    full = order.to_dict()
+    compact = order.to_dict(compact=True)
+
+    assert full["orderedItems"] == full["items"]
+    assert full["orderedItems"][0]["total_price"] == 21.0
+    assert set(compact) == {"id", "tableNumber", "orderedItems", "comment", "timestamp", "totalCost",
+                            "status", "food_processed", "drink_processed", "created_at", "rush"}
+    assert compact["tableNumber"] == 12
+    assert compact["totalCost"] == full["totalCost"] == 24.5
+    assert compact["orderedItems"][1] == {"id": 3, "name": "Radler süß", "price": 3.5, "quantity": 1, "type": "drink"}
+
+
+@pytest.mark.parametrize("provider", [
+    StdlibJSONProvider,
+    pytest.param(OrjsonProvider, marks=pytest.mark.skipif(json_provider.orjson is None, reason="orjson not installed")),
+])
+def test_providers_agree(provider):
+    flask_app = Flask(__name__)
+    flask_app.json = provider(flask_app)
+    payload = {"orders": [make_order().to_dict()], "when": datetime(2026, 5, 1, 12, 0, tzinfo=timezone.utc),
+               "big": 2 ** 70}
+
+    text = flask_app.json.dumps(payload)
+
+    assert "Radler süß" in text  # UTF-8, no \u escapes
+    assert text.index('"orders"') < text.index('"when"')  # insertion order
+    decoded = flask_app.json.loads(text)
+    assert decoded["when"] == "Fri, 01 May 2026 12:00:00 GMT"
+    assert decoded["big"] == 2 ** 70
+    assert decoded["orders"] == json.loads(json.dumps(payload["orders"]))
+
+    with flask_app.app_context():
+        response = flask_app.json.response({"ok": True})
+    assert response.mimetype == "application/json"
+    assert response.get_data() == b'{"ok":true}\n'
+
+
+def test_provider_selection(monkeypatch):
+    assert provider_class("stdlib") is StdlibJSONProvider
+    with pytest.raises(ValueError):
+        provider_class("ujson")
+
+    monkeypatch.setattr(json_provider, "orjson", None)
+    assert provider_class("auto") is StdlibJSONProvider
+    assert provider_class("orjson") is StdlibJSONProvider
+
+
+def test_dashboard_compact_query_parameter(app):
+    app.order_service.process_order(make_order())
+    client = app.test_client()
+
+    full = client.get("/orders/dashboard/food").get_json()["orders"]
+    compact = client.get("/orders/dashboard/food?compact=1").get_json()["orders"]
+
+    assert "items" in full[0] and "items" not in compact[0]
+    assert compact[0]["orderedItems"][0]["name"] == "Keule Pommes"
+    assert compact[0]["totalCost"] == full[0]["totalCost"]
+
+
+def test_json_payload_benchmark_smoke():
+    from benchmarks.json_payload import run
+
+    results = run(open_orders=(3,), repeat=1)
+
+    full, compact = results[0], results[1]
+    assert full["open_orders"] == 3
+    assert compact["payload_bytes"] < full["payload_bytes"]
@@ -0,0 +1,124 @@
+"""
+Tests for setup_logging: records go through a bounded queue to a background
+listener thread, a full queue drops records instead of blocking, optional
+JSON lines, and library basicConfig() handlers don't duplicate output.
+"""
+import json
+import logging
+import logging.handlers
+import queue
+
+import pytest
+
+from utils import logging_config, metrics
+from utils.logging_config import DroppingQueueHandler, setup_logging, stop_logging
+
+
+@pytest.fixture
+def fresh_logging():
+    """Let each test configure logging from scratch; leave it unconfigured afterwards"""
+    stop_logging()
+    yield
+    stop_logging()
+
+
+def app_log(tmp_path):
+    return (tmp_path / "app.log").read_text(encoding="utf-8")
+
+
+def test_records_are_written_by_the_listener_thread(fresh_logging, tmp_path):
+    root = setup_logging("INFO", str(tmp_path), queue_size=100)
+
+    queue_handlers = [h for h in root.handlers if isinstance(h, DroppingQueueHandler)]
+    assert len(queue_handlers) == 1
+    assert not any(isinstance(h, logging.handlers.RotatingFileHandler) for h in root.handlers)
+
+    logging.getLogger("test.queue").info("hello %s", "queue")
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logging.getLogger("test.queue").exception("it failed")
+    stop_logging()  # flushes the queue
+
+    content = app_log(tmp_path)
+    assert "test.queue - INFO - hello queue" in content
+    assert "ValueError: boom" in content
+
+
+def test_setup_is_idempotent_unless_forced(fresh_logging, tmp_path):
+    root = setup_logging("INFO", str(tmp_path), queue_size=100)
+    setup_logging("DEBUG", str(tmp_path), queue_size=100)
+
+    assert root.level == logging.DEBUG
+    assert sum(isinstance(h, DroppingQueueHandler) for h in root.handlers) == 1
+
+    setup_logging("INFO", str(tmp_path), queue_size=0, force=True)
+    assert not any(isinstance(h, DroppingQueueHandler) for h in root.handlers)
+    assert sum(isinstance(h, logging.handlers.RotatingFileHandler) for h in root.handlers) == 1
+
+
+def test_synchronous_mode_writes_immediately(fresh_logging, tmp_path):
+    setup_logging("INFO", str(tmp_path), queue_size=0)
+
+    logging.getLogger("test.sync").warning("right away")
+
+    assert "test.sync - WARNING - right away" in app_log(tmp_path)
+
+
+def test_json_lines(fresh_logging, tmp_path):
+    setup_logging("INFO", str(tmp_path), json_format=True, queue_size=0)
+
+    logging.getLogger("test.json").info("table %d", 7)
+
+    entry = json.loads(app_log(tmp_path).splitlines()[-1])
+    assert entry["logger"] == "test.json"
+    assert entry["level"] == "INFO"
+    assert entry["message"] == "table 7"
+    assert "time" in entry and "thread" in entry
+
+
+def test_full_queue_drops_records_and_reports_them(monkeypatch):
+    monkeypatch.setattr(logging_config, "_IMPORTANT_PUT_TIMEOUT", 0.01)
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    logger = logging.getLogger("test.drop")
+    dropped_before = metrics.LOG_RECORDS_DROPPED.value()
+
+    def emit(level, message):
+        handler.handle(logger.makeRecord(logger.name, level, __file__, 0, message, None, None))
+
+    emit(logging.INFO, "one")
+    emit(logging.INFO, "two")
+    emit(logging.INFO, "dropped")
+    emit(logging.ERROR, "dropped too")
+    assert handler.dropped == 2
+
+    # Room again: the next record goes through, followed by a notice about the loss
+    handler.queue.get_nowait()
+    handler.queue.get_nowait()
+    emit(logging.INFO, "three")
+
+    messages = [handler.queue.get_nowait().getMessage() for _ in range(2)]
+    assert messages == ["three", "Log queue full, dropped 2 log record(s)"]
+    assert handler.dropped == 0
+    assert metrics.LOG_RECORDS_DROPPED.value() == dropped_before + 2
+
+
+def test_basic_config_handler_is_removed(fresh_logging, tmp_path):
+    root = logging.getLogger()
+    duplicate = logging.StreamHandler()
+    root.addHandler(duplicate)
+
+    setup_logging("INFO", str(tmp_path), queue_size=100)
+
+    assert duplicate not in root.handlers
+
+
+def test_logging_overhead_benchmark_smoke(fresh_logging):
+    from benchmarks.logging_overhead import run
+
+    results = run(requests=3, variants=("off", "queue"))
+
+    off, queued = results
+    assert off["log_bytes"] == 0
+    assert queued["log_bytes"] > 0
+    assert queued["post_order_ms"]["p50"] is not None
@@ -0,0 +1,129 @@
+"""
+Tests for the in-memory menu cache behind GET /menu: one parse per file
+version, reload on change, ETag/304 and gzip responses.
+"""
+import gzip
+import json
+import os
+import shutil
+from unittest.mock import patch
+
+import pytest
+
+from config import Config
+from utils.menu_cache import MenuCache
+
+
+@pytest.fixture
+def menu_file(tmp_path):
+    path = tmp_path / "menu.json"
+    shutil.copy(Config.MENU_PATH, path)
+    return path
+
+
+def rewrite(path, menu):
+    """Write a new menu and make sure the mtime moves even on coarse clocks"""
+    stat = os.stat(path)
+    path.write_text(json.dumps(menu), encoding="utf-8")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def app(db_path, menu_file, tmp_path):
+    with patch.object(Config, "MOCK_PRINTER", True), \
+         patch.object(Config, "PRINTER_STATIONS", None), \
+         patch.object(Config, "DATABASE_PATH", db_path), \
+         patch.object(Config, "MENU_PATH", str(menu_file)), \
+         patch.object(Config, "LOG_DIR", str(tmp_path / "logs")):
+        from main import create_app
+        app = create_app()
+    yield app
+    app.order_service.shutdown(timeout=1)
+
+
+def test_menu_is_parsed_once_per_file_version(menu_file):
+    cache = MenuCache(str(menu_file))
+    reloaded = []
+    cache.subscribe(reloaded.append)
+
+    first = cache.get()
+    assert cache.get() is first
+    assert json.loads(first.body.decode("utf-8")) == first.menu
+    assert "süß".encode("utf-8") in first.body
+    assert gzip.decompress(first.gzip_body) == first.body
+
+    menu = dict(first.menu, Specials=[{"id": 500, "name": "Brezel", "price": 2.0, "type": "food"}])
+    rewrite(menu_file, menu)
+
+    second = cache.get()
+    assert second.menu == menu
+    assert second.etag != first.etag
+    assert reloaded == [menu]
+
+
+def test_broken_menu_keeps_the_last_good_one(menu_file):
+    cache = MenuCache(str(menu_file))
+    good = cache.get()
+
+    stat = os.stat(menu_file)
+    menu_file.write_text("{not json", encoding="utf-8")
+    os.utime(menu_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert cache.get().menu == good.menu
+    assert cache.get().etag == good.etag
+
+
+def test_menu_route_etag_and_304(app):
+    client = app.test_client()
+
+    response = client.get("/menu")
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "application/json; charset=utf-8"
+    etag = response.headers["ETag"]
+    menu = response.get_json()
+    assert "Bier" in menu
+
+    not_modified = client.get("/menu", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.data == b""
+    assert not_modified.headers["ETag"] == etag
+
+
+def test_menu_route_gzip(app):
+    client = app.test_client()
+    plain = client.get("/menu")
+
+    compressed = client.get("/menu", headers={"Accept-Encoding": "gzip, deflate"})
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert compressed.headers["Vary"] == "Accept-Encoding"
+    assert gzip.decompress(compressed.data) == plain.data
+
+
+def test_edited_menu_is_served_without_restart(app, menu_file):
+    client = app.test_client()
+    old_etag = client.get("/menu").headers["ETag"]
+
+    menu = json.loads(menu_file.read_text(encoding="utf-8"))
+    menu["Bier"].append({"id": 99, "name": "Festbier", "price": 4.0, "type": "drink"})
+    rewrite(menu_file, menu)
+
+    response = client.get("/menu", headers={"If-None-Match": old_etag})
+    assert response.status_code == 200
+    assert response.get_json()["Bier"][-1]["name"] == "Festbier"
+    assert response.headers["ETag"] != old_etag
+
+
+def test_edited_menu_prices_orders_without_a_menu_request(app, menu_file):
+    menu = json.loads(menu_file.read_text(encoding="utf-8"))
+    menu["Bier"].append({"id": 99, "name": "Festbier", "price": 4.0, "type": "drink"})
+    rewrite(menu_file, menu)
+    client = app.test_client()
+
+    # No GET /menu in between, as in a worker that only ingests orders
+    single = client.post("/order", json={"tableNumber": 3, "orderedItems": [{"id": 99, "quantity": 2}]})
+    batch = client.post("/orders/batch", json={"orders": [
+        {"clientId": "a", "tableNumber": 3, "orderedItems": [{"id": 99}]}]})
+
+    assert single.status_code == 200
+    assert single.get_json()["order"]["totalCost"] == 8.0
+    assert batch.get_json()["results"][0]["status"] == "created"
@@ -0,0 +1,104 @@
+"""
+Tests for server-side order validation: items are priced from the menu
+catalog by id, orders that don't match the menu are rejected on every
+ingest path and nothing of them is saved.
+"""
+from unittest.mock import patch
+
+import pytest
+
+from config import Config
+from models import Order, OrderItem
+from services.menu_catalog import InvalidOrderError, MenuCatalog
+from utils.file_utils import load_menu
+
+
+@pytest.fixture
+def catalog():
+    return MenuCatalog(load_menu())
+
+
+@pytest.fixture
+def app(db_path, tmp_path):
+    with patch.object(Config, "MOCK_PRINTER", True), \
+         patch.object(Config, "PRINTER_STATIONS", None), \
+         patch.object(Config, "DATABASE_PATH", db_path), \
+         patch.object(Config, "LOG_DIR", str(tmp_path / "logs")):
+        from main import create_app
+        app = create_app()
+    yield app
+    app.order_service.shutdown(timeout=1)
+
+
+def test_items_are_priced_from_the_menu(catalog):
+    order = Order(table_number=3, items=[
+        OrderItem(id=61, name="Keule Pommes", price=0.01, quantity=2, type="drink"),
+        OrderItem(id=1, name="Freibier", price=0, quantity=1, type="food"),
+    ])
+
+    catalog.price_order(order)
+
+    assert [(i.name, i.price, i.type) for i in order.items] == [
+        ("Keule Pommes", 10.5, "food"), ("Pils", 3.5, "drink")]
+    assert order.total_price == 24.5
+    assert catalog.index[61].category == "Essen"
+
+
+@pytest.mark.parametrize("order, message", [
+    (Order(table_number=3, items=[OrderItem(id=61, name="x", price=1), OrderItem(id=999, name="Hummer", price=1)]),
+     "Unknown menu item id 999"),
+    (Order(table_number=3, items=[OrderItem(id=None, name="Pils", price=3.5)]), "Unknown menu item id None"),
+    (Order(table_number=3, items=[OrderItem(id=1, name="Pils", price=3.5, quantity=0)]), "must be at least 1"),
+    (Order(table_number=3, items=[]), "at least one item"),
+    (Order(table_number=0, items=[OrderItem(id=1, name="Pils", price=3.5)]), "tableNumber"),
+])
+def test_orders_not_matching_the_menu_are_rejected_unchanged(catalog, order, message):
+    before = [(i.name, i.price) for i in order.items]
+
+    with pytest.raises(InvalidOrderError, match=message):
+        catalog.price_order(order)
+    assert [(i.name, i.price) for i in order.items] == before
+
+
+def test_reloaded_menu_replaces_the_index(catalog):
+    catalog.load_menu({"Essen": [{"id": 61, "name": "Keule Pommes", "price": 11.0, "type": "food"}]})
+
+    order = catalog.price_order(Order(table_number=1, items=[OrderItem(id=61, name="", price=10.5)]))
+    assert order.items[0].price == 11.0
+    assert 1 not in catalog.index
+
+
+def test_process_order_validates_dicts_and_orders(order_service_factory):
+    service = order_service_factory()
+
+    order_id = service.process_order({"table_number": 4, "items": [{"id": 40, "name": "Cola", "price": 0.5}]})
+    items = service.order_logger.get_order(order_id)["items"]
+    assert [(i["item_name"], i["price"], i["item_type"]) for i in items] == [("Coca-Cola", 3.0, "drink")]
+
+    with pytest.raises(InvalidOrderError):
+        service.process_order(Order(table_number=4, items=[OrderItem(id=999, name="Hummer", price=1)]))
+    assert len(service.get_orders()) == 1
+    assert not service.journal.has_segments()
+
+
+def test_order_route_rejects_unknown_items_and_reprices(app):
+    client = app.test_client()
+
+    rejected = client.post("/order", json={"tableNumber": 2, "orderedItems": [
+        {"id": 999, "name": "Hummer", "price": 1, "quantity": 1, "type": "food"}]})
+    assert rejected.status_code == 400
+    assert "999" in rejected.get_json()["error"]
+
+    accepted = client.post("/order", json={"tableNumber": 2, "orderedItems": [
+        {"id": 68, "name": "Pommes", "price": 0.5, "quantity": 2, "type": "food"}]})
+    assert accepted.status_code == 200
+    assert accepted.get_json()["order"]["totalCost"] == 7.0
+
+
+def test_order_validation_benchmark_smoke():
+    from benchmarks.order_validation import run
+
+    result = run(orders=50, rounds=1)
+
+    assert result["indexed_us_per_order"] > 0
+    assert result["scan_us_per_order"] > 0
@@ -0,0 +1,149 @@
+"""
+Tests for the /metrics registry: text exposition format, merging snapshots
+of several worker processes, and the instrumented order/print pipeline.
+"""
+import json
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from config import Config
+from utils import metrics as metrics_module
+from utils.metrics import Registry
+
+
+def sample(text, line_prefix):
+    """Value of the first exposition line starting with line_prefix"""
+    for line in text.splitlines():
+        if line.startswith(line_prefix):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"no sample {line_prefix!r} in:\n{text}")
+
+
+def test_exposition_format():
+    registry = Registry()
+    orders = registry.counter("orders_total", "Orders", ["table"])
+    latency = registry.histogram("latency_seconds", "Latency", ["method"], buckets=(0.1, 1.0))
+    depth = registry.gauge("depth", "Queue depth")
+    orders.inc(table=3)
+    orders.inc(2, table='a"b')
+    latency.observe(0.05, method="save")
+    latency.observe(0.5, method="save")
+    latency.observe(5, method="save")
+    registry.on_collect("depth", lambda: depth.set(7))
+
+    text = registry.render()
+
+    assert "# TYPE orders_total counter" in text
+    assert 'orders_total{table="3"} 1.0' in text
+    assert 'orders_total{table="a\\"b"} 2.0' in text
+    assert 'latency_seconds_bucket{method="save",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{method="save",le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{method="save",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{method="save"} 3' in text
+    assert sample(text, 'latency_seconds_sum{method="save"}') == pytest.approx(5.55)
+    assert "depth 7.0" in text
+    with pytest.raises(ValueError):
+        orders.inc(wrong=1)
+
+
+def test_snapshots_of_other_processes_are_added_up(tmp_path):
+    def make():
+        registry = Registry()
+        registry.counter("orders_total", "Orders")
+        registry.histogram("latency_seconds", "Latency", buckets=(1.0,))
+        registry.gauge("depth", "Queue depth")
+        return registry
+
+    other = make()
+    other._metrics["orders_total"].inc(5)
+    other._metrics["latency_seconds"].observe(0.5)
+    other._metrics["depth"].set(4)
+    snapshot = {"pid": 1, "time": time.time(), "metrics": other.snapshot()}
+    (tmp_path / "metrics_1.json").write_text(json.dumps(snapshot))
+    stale = dict(snapshot, pid=2, time=time.time() - 3600)
+    (tmp_path / "metrics_2.json").write_text(json.dumps(stale))
+
+    registry = make()
+    registry._metrics["orders_total"].inc(1)
+    registry.start_flusher(tmp_path, interval=60)
+    try:
+        text = registry.render()
+    finally:
+        registry.stop_flusher()
+
+    # Counters/histograms from every snapshot, gauges only from fresh ones
+    assert sample(text, "orders_total ") == 11
+    assert sample(text, "latency_seconds_count ") == 2
+    assert sample(text, "depth ") == 4
+    assert (tmp_path / f"metrics_{os.getpid()}.json").exists()
+
+
+def test_exited_processes_are_folded_into_the_retired_snapshot(tmp_path):
+    def write(pid, orders, depth):
+        registry = Registry()
+        registry.counter("orders_total", "Orders").inc(orders)
+        registry.gauge("depth", "Queue depth").set(depth)
+        snapshot = {"pid": pid, "time": time.time(), "metrics": registry.snapshot()}
+        (tmp_path / f"metrics_{pid}.json").write_text(json.dumps(snapshot))
+
+    write(101, 5, 4)
+    write(102, 2, 1)
+    metrics_module.retire_snapshot(tmp_path, 101)
+    metrics_module.retire_snapshot(tmp_path, 102)
+    metrics_module.retire_snapshot(tmp_path, 103)  # no snapshot: nothing to do
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["metrics_retired.json"]
+    retired = json.loads((tmp_path / "metrics_retired.json").read_text())
+    assert retired["metrics"]["orders_total"] == {"type": "counter", "samples": [[[], 7.0]]}
+    assert "depth" not in retired["metrics"]
+
+    # A new process reusing pid 101 starts from its own zero
+    write(101, 1, 0)
+    registry = Registry()
+    registry.counter("orders_total", "Orders")
+    registry.start_flusher(tmp_path, interval=60)
+    try:
+        assert sample(registry.render(), "orders_total ") == 8
+    finally:
+        registry.stop_flusher()
+
+    metrics_module.clear_snapshots(tmp_path)
+    assert list(tmp_path.glob("*.json")) == []
+
+
+def test_pipeline_is_instrumented(db_path, tmp_path):
+    with patch.object(Config, "MOCK_PRINTER", True), \
+         patch.object(Config, "PRINTER_STATIONS", None), \
+         patch.object(Config, "DATABASE_PATH", db_path), \
+         patch.object(Config, "LOG_DIR", str(tmp_path / "logs")):
+        from main import create_app
+        app = create_app()
+    client = app.test_client()
+    try:
+        response = client.post("/order", json={
+            "tableNumber": 5, "orderedItems": [{"id": 1, "name": "Pils", "price": 3.5, "quantity": 1, "type": "drink"}]
+        })
+        assert response.status_code == 200
+        order_id = response.get_json()["order_id"]
+        assert client.get("/orders/dashboard/drinks").status_code == 200
+        deadline = time.time() + 5
+        while app.order_service.get_order_details(order_id)["order"]["status"] != "printed" and time.time() < deadline:
+            time.sleep(0.02)
+
+        response = client.get("/metrics")
+        text = response.get_data(as_text=True)
+    finally:
+        app.order_service.shutdown(timeout=1)
+
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    assert sample(text, 'orders_ingested_total{storage="sqlite"}') >= 1
+    assert sample(text, 'db_write_seconds_count{method="save_order"}') >= 1
+    assert sample(text, 'db_write_seconds_count{method="complete_print_job"}') >= 1
+    assert sample(text, 'http_requests_total{endpoint="order.get_dashboard_orders_drinks",method="GET",status="200"}') >= 1
+    assert sample(text, 'tickets_printed_total{station="drinks"}') >= 1
+    assert sample(text, 'print_session_seconds_count{station="drinks"}') >= 1
+    assert sample(text, 'print_queue_wait_seconds_count{station="drinks",priority="normal"}') >= 1
+    assert 'print_queue_depth{station="food"} 0.0' in text
@@ -0,0 +1,155 @@
+"""
+Tests for POST /orders/batch: one transaction for the whole batch, per-order
+results in request order, client ids as idempotency keys, and the tickets
+queued and printed together.
+"""
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+
+from config import Config
+from models import Order, OrderItem, PrintJob
+from services.print_scheduler import PrintScheduler
+
+
+def wait_until(condition, timeout=5.0, interval=0.02):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(interval)
+    return False
+
+
+@pytest.fixture
+def app(db_path, tmp_path):
+    with patch.object(Config, "MOCK_PRINTER", True), \
+         patch.object(Config, "PRINTER_STATIONS", None), \
+         patch.object(Config, "DATABASE_PATH", db_path), \
+         patch.object(Config, "LOG_DIR", str(tmp_path / "logs")):
+        from main import create_app
+        app = create_app()
+    yield app
+    app.order_service.shutdown(timeout=1)
+
+
+BATCH = [
+    {"clientId": "t7-1", "tableNumber": 3, "orderedItems": [{"id": 61, "quantity": 1}]},
+    {"clientId": "t7-2", "tableNumber": 3, "orderedItems": [{"id": 99999, "quantity": 1}]},
+    {"clientId": "t7-3", "tableNumber": 4, "orderedItems": [{"id": 1, "quantity": 2}, {"id": 61, "quantity": 1}]},
+]
+
+
+def post(client, orders):
+    return client.post("/orders/batch", data=json.dumps({"orders": orders}), content_type="application/json")
+
+
+def count(order_logger, table):
+    with order_logger.get_connection() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_batch_results_keep_client_order(app):
+    response = post(app.test_client(), BATCH)
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert [r["clientId"] for r in body["results"]] == ["t7-1", "t7-2", "t7-3"]
+    assert [r["status"] for r in body["results"]] == ["created", "rejected", "created"]
+    assert "99999" in body["results"][1]["error"]
+    assert (body["created"], body["duplicate"], body["rejected"]) == (2, 0, 1)
+
+    order_logger = app.order_service.order_logger
+    first, third = body["results"][0]["order_id"], body["results"][2]["order_id"]
+    assert first < third
+    assert order_logger.get_orders_by_ids([third])[0].total_price == 17.5
+    # All tickets get printed: one food, then food + drinks
+    assert wait_until(lambda: order_logger.get_pending_print_jobs() == [])
+    assert count(order_logger, "print_jobs") == 3
+
+
+def test_resent_batch_places_nothing_twice(app):
+    client = app.test_client()
+    first = post(client, BATCH).get_json()["results"]
+
+    again = post(client, BATCH).get_json()
+
+    assert [r["status"] for r in again["results"]] == ["duplicate", "rejected", "duplicate"]
+    assert [r.get("order_id") for r in again["results"]] == [r.get("order_id") for r in first]
+    assert count(app.order_service.order_logger, "orders") == 2
+
+    changed = [{**BATCH[0], "tableNumber": 9}]
+    assert post(client, changed).get_json()["results"][0]["status"] == "rejected"
+
+
+def test_client_id_matches_idempotency_key_of_single_orders(app):
+    client = app.test_client()
+    single = {"tableNumber": 3, "orderedItems": [{"id": 61, "quantity": 1}]}
+    order_id = client.post("/order", json=single, headers={"Idempotency-Key": "t7-9"}).get_json()["order_id"]
+
+    result = post(client, [{"clientId": "t7-9", **single}]).get_json()["results"][0]
+
+    assert result == {"clientId": "t7-9", "status": "duplicate", "order_id": order_id}
+
+
+@pytest.mark.parametrize("orders", [
+    [],
+    [{"tableNumber": 3, "orderedItems": [{"id": 61}]}],
+    [{"clientId": "a", "tableNumber": 3}, {"clientId": "a", "tableNumber": 4}],
+    [{"clientId": str(n), "tableNumber": 3} for n in range(3)],
+])
+def test_malformed_batches_are_rejected_whole(app, orders):
+    with patch.object(Config, "ORDER_BATCH_MAX_SIZE", 2):
+        response = post(app.test_client(), orders)
+
+    assert response.status_code == 400
+    assert count(app.order_service.order_logger, "orders") == 0
+
+
+def test_save_orders_is_one_transaction(order_logger):
+    def drink(table):
+        return Order(table_number=table, items=[OrderItem(id=1, name="Pils", price=3.5, type="drink")])
+
+    original = order_logger._insert_order
+    calls = []
+
+    def fail_on_second(cursor, order, user_agent, stations):
+        calls.append(order)
+        if len(calls) == 2:
+            raise RuntimeError("disk full")
+        return original(cursor, order, user_agent, stations)
+
+    with patch.object(order_logger, "_insert_order", side_effect=fail_on_second):
+        with pytest.raises(RuntimeError):
+            order_logger.save_orders([(drink(1), None, ["drinks"], "k1", None),
+                                      (drink(2), None, ["drinks"], "k2", None)])
+    assert count(order_logger, "orders") == count(order_logger, "idempotency_keys") == 0
+
+    saved = order_logger.save_orders([(drink(1), None, ["drinks"], "k1", None),
+                                      (drink(1), None, ["drinks"], "k1", None),
+                                      (drink(2), None, [], None, None)])
+    assert [created for _, created in saved] == [True, False, True]
+    assert saved[0][0] == saved[1][0]
+    assert count(order_logger, "orders") == 2
+    assert count(order_logger, "print_jobs") == 1
+
+
+def test_put_many_queues_in_priority_order():
+    queue = PrintScheduler(rush_boost=60, table_spacing=5, max_wait=600)
+    now = time.time()
+    queue.put_many([PrintJob(id=n, order_id=n, station="food", table_number=1, rush=(n == 3), created_ts=now + n)
+                    for n in range(1, 4)])
+
+    assert queue.qsize() == 3
+    assert [queue.get_nowait().id for _ in range(3)] == [3, 1, 2]
+
+
+def test_order_batch_benchmark_smoke():
+    from benchmarks.order_batch import run
+
+    single, batch = run(orders=6, batch_size=3)
+
+    assert single["orders"] == batch["orders"] == 6
+    assert (single["requests"], batch["requests"]) == (6, 2)
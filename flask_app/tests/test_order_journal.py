@@ -0,0 +1,221 @@
+"""
+Tests for the order journal that replaced the CSV fallback: CRC-checked
+records, group-committed fsyncs, and idempotent replay into SQLite and the
+print queue.
+"""
+import os
+import sqlite3
+import time
+from threading import Thread
+from unittest.mock import patch
+
+import pytest
+
+from config import Config
+from models import Order, OrderItem
+from services import order_journal
+from services.order_journal import JournalError, OrderJournal, decode_line, encode_record, read_segment
+
+
+def wait_until(condition, timeout=5.0, interval=0.02):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(interval)
+    return False
+
+
+def make_order(table=4):
+    return Order(table_number=table, items=[
+        OrderItem(id=61, name="Keule Pommes", price=10.5, quantity=2, type="food"),
+        OrderItem(id=1, name="Pils", price=3.5, quantity=1, type="drink"),
+    ])
+
+
+def count(order_logger, table):
+    with order_logger.get_connection() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def segments(directory):
+    return sorted(p.name for p in directory.iterdir())
+
+
+def test_records_are_crc_checked(tmp_path):
+    line = encode_record({"id": "a", "order": {"comment": "süß"}})
+
+    assert decode_line(line) == {"id": "a", "order": {"comment": "süß"}}
+    assert decode_line(line.replace(b"a", b"b", 1)) is None
+    assert decode_line(line[:-3]) is None
+
+    path = tmp_path / "0000000000001-1.ndjson"
+    path.write_bytes(line + line.replace(b'"a"', b'"x"') + encode_record({"id": "c"}) + line[:20])
+    records, corrupt = read_segment(path)
+    assert [r["id"] for r in records] == ["a", "c"]  # torn tail ignored
+    assert corrupt == 1
+
+
+def test_concurrent_appends_share_fsyncs(tmp_path):
+    journal = OrderJournal(tmp_path / "journal")
+    fsyncs = []
+    real_fsync = os.fsync
+
+    def slow_fsync(fd):
+        fsyncs.append(fd)
+        time.sleep(0.01)
+        real_fsync(fd)
+
+    with patch.object(order_journal.os, "fsync", side_effect=slow_fsync):
+        threads = [Thread(target=journal.append, args=({"n": n},)) for n in range(40)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    journal.close()
+
+    (segment,) = (tmp_path / "journal").glob("*.ndjson")
+    records, corrupt = read_segment(segment)
+    assert sorted(r["n"] for r in records) == list(range(40)) and corrupt == 0
+    assert len(fsyncs) < 40
+
+
+def test_failed_write_is_reported(tmp_path):
+    journal = OrderJournal(tmp_path / "journal")
+    with patch.object(order_journal.os, "fsync", side_effect=OSError("disk full")):
+        with pytest.raises(JournalError):
+            journal.append({"n": 1})
+    journal.close()
+
+
+def test_order_is_journaled_when_the_database_fails_and_replayed(order_service_factory):
+    service = order_service_factory()
+    try:
+        with patch.object(service.order_logger, "save_order", side_effect=sqlite3.OperationalError("disk I/O error")):
+            order = make_order()
+            assert service.process_order(order, idempotency_key="tablet-1", request_hash="h") is None
+        assert order.status == "journaled"
+        assert count(service.order_logger, "orders") == 0
+
+        journal_dir = service.journal.directory
+        assert service.replay_journal() == 1
+        assert segments(journal_dir) == []
+
+        (saved,) = service.order_logger.get_recent_orders(10)
+        assert saved["total_price"] == 24.5 and saved["table_number"] == 4
+        assert service.idempotency.lookup("tablet-1").order_id == saved["id"]
+        assert wait_until(lambda: service.order_logger.get_pending_print_jobs() == [])
+        assert service.order_logger.get_order(saved["id"])["order"]["status"] == "printed"
+    finally:
+        service.shutdown(timeout=1)
+
+
+def test_order_with_idempotency_key_is_journaled_when_the_database_is_unreachable(db_path, tmp_path):
+    with patch.object(Config, "MOCK_PRINTER", True), \
+         patch.object(Config, "PRINTER_STATIONS", None), \
+         patch.object(Config, "DATABASE_PATH", db_path), \
+         patch.object(Config, "LOG_DIR", str(tmp_path / "logs")):
+        from main import create_app
+        app = create_app()
+    service = app.order_service
+    client = app.test_client()
+    body = {"tableNumber": 4, "orderedItems": [{"id": 61}]}
+    headers = {"Idempotency-Key": "tablet-7-0001"}
+    try:
+        # Nothing mocked: the database file can't be opened at all
+        os.rename(db_path, db_path + ".away")
+        os.mkdir(db_path)
+        try:
+            service.admission._refreshed_at = None
+            first = client.post("/order", json=body, headers=headers)
+            retry = client.post("/order", json=body, headers=headers)
+        finally:
+            os.rmdir(db_path)
+            os.rename(db_path + ".away", db_path)
+
+        assert first.status_code == retry.status_code == 200
+        assert first.get_json()["order_id"] is None
+
+        assert service.replay_journal() == 2
+        assert count(service.order_logger, "orders") == 1
+        replayed = client.post("/order", json=body, headers=headers)
+        assert replayed.headers["Idempotent-Replayed"] == "true"
+        assert replayed.get_json()["order_id"] == service.idempotency.lookup("tablet-7-0001").order_id
+    finally:
+        service.shutdown(timeout=1)
+
+
+def test_order_is_not_journaled_when_queueing_it_fails_after_the_save(order_service_factory):
+    service = order_service_factory()
+    try:
+        with patch.object(service, "_enqueue_saved", side_effect=sqlite3.OperationalError("disk I/O error")):
+            order_id = service.process_order(make_order())
+        assert order_id is not None
+
+        assert service.replay_journal() == 0
+        assert count(service.order_logger, "orders") == 1
+        # The leader's DB poll picks up the pending print jobs
+        assert wait_until(lambda: service.order_logger.get_pending_print_jobs() == [])
+    finally:
+        service.shutdown(timeout=1)
+
+
+def test_replaying_twice_saves_nothing_twice(order_service_factory):
+    service = order_service_factory()
+    try:
+        with patch.object(service.order_logger, "save_orders", side_effect=sqlite3.OperationalError("locked")):
+            results = service.process_orders([("c1", {"tableNumber": 2, "orderedItems": [{"id": 61}]}),
+                                              ("c2", {"tableNumber": 3, "orderedItems": [{"id": 1}]})])
+        assert [r["status"] for r in results] == ["journaled", "journaled"]
+
+        service.journal.rotate()
+        (segment,) = service.journal.directory.glob("*.ndjson")
+        content = segment.read_bytes()
+        service.replay_journal()
+        # As if the process died after saving but before deleting the segment
+        segment.write_bytes(content)
+        service.replay_journal()
+
+        assert count(service.order_logger, "orders") == 2
+        assert not service.journal.has_segments()
+    finally:
+        service.shutdown(timeout=1)
+
+
+def test_segments_left_by_a_dead_process_are_replayed_on_startup(order_service_factory, db_path):
+    journal_dir = os.path.join(os.path.dirname(db_path), "journal")
+    dead = OrderJournal(journal_dir)
+    dead.append({"order": make_order(table=7).to_dict(), "stations": ["food", "drinks"]})
+    dead.close()
+
+    service = order_service_factory()
+    try:
+        assert wait_until(lambda: not service.journal.has_segments())
+        assert [o["table_number"] for o in service.order_logger.get_recent_orders(10)] == [7]
+    finally:
+        service.shutdown(timeout=1)
+
+
+def test_failed_replay_keeps_the_segment(order_service_factory):
+    service = order_service_factory()
+    try:
+        service.journal.append({"order": make_order().to_dict(), "stations": []})
+        with patch.object(service.order_logger, "save_orders", side_effect=sqlite3.OperationalError("locked")):
+            with pytest.raises(sqlite3.OperationalError):
+                service.replay_journal()
+        assert service.journal.has_segments()
+
+        assert service.replay_journal() == 1
+        (saved,) = service.order_logger.get_recent_orders(10)
+        assert saved["status"] == "printed"  # no stations, nothing to print
+    finally:
+        service.shutdown(timeout=1)
+
+
+def test_order_journal_benchmark_smoke(tmp_path):
+    from benchmarks.order_journal import run
+
+    results = run(orders=20, threads=(1, 4), workdir=tmp_path)
+
+    assert {r["variant"] for r in results} == {"csv", "journal_fsync_each", "journal"}
+    assert all(r["orders"] == 20 for r in results)
@@ -36,6 +36,7 @@ def test_get_pending_orders_only_returns_pending(order_logger):
     pending = order_logger.get_pending_orders()
 
     assert [o.id for o in pending] == [pending_id]
+    assert order_logger.count_pending_orders() == 1
 
 
 def test_get_unprocessed_orders_excludes_completed(order_logger):
@@ -111,3 +112,19 @@ def test_completed_status_persists_across_new_logger_instance(order_logger, db_p
 
     assert [o.id for o in restarted_logger.get_unprocessed_orders()] == []
     assert restarted_logger.get_order(order_id)["order"]["status"] == "completed"
+
+
+def test_cleanup_old_orders_removes_their_and_expired_idempotency_keys(order_logger):
+    old_id = order_logger.save_order(make_order(), idempotency_key="old-order")
+    order_logger.save_order(make_order(), idempotency_key="expired")
+    order_logger.save_order(make_order(), idempotency_key="fresh")
+    with order_logger.get_connection() as conn:
+        conn.execute("UPDATE orders SET timestamp = '2000-01-01T00:00:00' WHERE id = ?", (old_id,))
+        conn.execute("UPDATE idempotency_keys SET created_at = created_at - 7200 WHERE key = 'expired'")
+        conn.commit()
+
+    assert order_logger.cleanup_old_orders(days_old=30, idempotency_ttl=3600) == 1
+
+    with order_logger.get_connection() as conn:
+        keys = [row["key"] for row in conn.execute("SELECT key FROM idempotency_keys")]
+    assert keys == ["fresh"]
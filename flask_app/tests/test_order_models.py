@@ -0,0 +1,95 @@
+"""
+Tests for the slotted Order/OrderItem models: cached aggregates and their
+invalidation, the DB row constructor and batched item loading.
+"""
+from unittest.mock import patch
+
+import pytest
+
+from models import Order, OrderItem
+from services import order_logger as order_logger_module
+
+
+def make_order():
+    return Order(table_number=4, items=[
+        OrderItem(id=61, name="Keule Pommes", price=10.5, quantity=2, type="food"),
+        OrderItem(id=1, name="Pils", price=3.5, quantity=1, type="drink"),
+    ])
+
+
+def test_models_are_slotted():
+    order = make_order()
+
+    assert not hasattr(order, "__dict__")
+    assert not hasattr(order.items[0], "__dict__")
+    with pytest.raises(AttributeError):
+        order.colour = "red"
+
+
+def test_aggregates_are_cached_until_items_change():
+    order = make_order()
+
+    assert order.total_price == 24.5
+    assert order.food_items is order.food_items
+    assert [item.name for item in order.drink_items] == ["Pils"]
+
+    order.items.append(OrderItem(id=68, name="Pommes", price=3.5, quantity=1, type="food"))
+    assert order.total_price == 28.0
+    assert len(order.food_items) == 2
+
+    del order.items[0]
+    assert order.total_price == 7.0
+
+    order.items = [OrderItem(id=40, name="Coca-Cola", price=3.0, quantity=3, type="drink")]
+    assert order.total_price == 9.0
+    assert order.food_items == []
+    assert not order.has_item_type("food") and order.has_item_type("drink")
+
+    # In-place edits need an explicit invalidate()
+    order.items[0].quantity = 1
+    order.invalidate()
+    assert order.total_price == 3.0
+
+
+def test_equality_and_dict_access():
+    order = make_order()
+    twin = Order.from_dict(order.to_dict())
+    twin.timestamp = order.timestamp
+
+    assert twin == order
+    assert order["tableNumber"] == 4
+    assert order.get("totalCost") == 24.5
+    assert order.get("missing", "x") == "x"
+    assert "table_number=4" in repr(order)
+
+
+def test_from_row_matches_what_was_saved(order_logger):
+    order_id = order_logger.save_order(make_order())
+
+    loaded = order_logger.get_orders_by_ids([order_id])[0]
+
+    assert loaded.id == order_id
+    assert loaded.table_number == 4
+    assert loaded.rush is False and loaded.food_processed is False
+    assert [(i.id, i.name, i.price, i.quantity, i.type) for i in loaded.items] == [
+        (61, "Keule Pommes", 10.5, 2, "food"), (1, "Pils", 3.5, 1, "drink")]
+    assert loaded.total_price == 24.5
+
+
+def test_items_are_loaded_in_chunks(order_logger):
+    ids = [order_logger.save_order(Order(table_number=n, items=[
+        OrderItem(id=n, name=f"Item {n}", price=1.0, quantity=n, type="food")])) for n in range(1, 6)]
+
+    with patch.object(order_logger_module, "ITEMS_QUERY_CHUNK", 2):
+        orders = order_logger.get_orders_by_ids(ids)
+
+    assert [order.items[0].quantity for order in orders] == [1, 2, 3, 4, 5]
+
+
+def test_order_models_benchmark_smoke():
+    from benchmarks.order_models import run
+
+    dataclass_result, slots_result = run(orders=50)
+
+    assert dataclass_result["orders"] == slots_result["orders"] == 50
+    assert slots_result["bytes_per_order"] < dataclass_result["bytes_per_order"]
@@ -22,10 +22,18 @@ def wait_until(condition, timeout=2.0, interval=0.05):
     return False
 
 
+# Items must be on the menu: process_order prices them from menu.json
+MENU_ITEMS = {
+    "food": OrderItem(name="Keule Pommes", price=10.5, quantity=2, type="food", id=61),
+    "drink": OrderItem(name="Pils", price=3.5, quantity=2, type="drink", id=1),
+}
+
+
 def make_order(table_number=7, item_type="food"):
+    item = MENU_ITEMS[item_type]
     return Order(
         table_number=table_number,
-        items=[OrderItem(name="Burger", price=8.5, quantity=2, type=item_type, id=1)],
+        items=[OrderItem(name=item.name, price=item.price, quantity=item.quantity, type=item.type, id=item.id)],
         comment="no onions",
     )
 
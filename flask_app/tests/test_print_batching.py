@@ -0,0 +1,118 @@
+"""
+Tests for coalesced print sessions: several tickets over one printer
+connection (Printer.print_orders / PrinterService.print_orders) and the
+worker draining the queue into batches.
+"""
+from queue import Queue
+from threading import Event
+from unittest.mock import MagicMock, patch
+
+from config import Config
+from models import Order, OrderItem, PrintJob
+from services.Printer import Printer, split_address
+from services.order_service import OrderService
+from services.printer_service import PrinterService
+
+
+def make_order(order_id, food=True, drink=True):
+    items = []
+    if food:
+        items.append(OrderItem(name="Burger", price=8.5, quantity=1, type="food", id=1))
+    if drink:
+        items.append(OrderItem(name="Cola", price=3.0, quantity=2, type="drink", id=2))
+    return Order(table_number=5, id=order_id, items=items)
+
+
+def make_service():
+    service = PrinterService(config={"mock": False}, printers={"food": MagicMock(), "drinks": MagicMock()})
+    service.printer_food.print_orders.side_effect = lambda tickets: [True] * len(tickets)
+    service.printer_drinks.print_orders.side_effect = lambda tickets: [True] * len(tickets)
+    return service
+
+
+def test_split_address_accepts_optional_port():
+    assert split_address("10.0.0.1") == ("10.0.0.1", 9100)
+    assert split_address("127.0.0.1:9101") == ("127.0.0.1", 9101)
+    assert Printer("127.0.0.1:9101").port == 9101
+
+
+def test_printer_print_orders_uses_one_connection_and_cuts_each_ticket():
+    printer = Printer(ip_address="10.0.0.1")
+    orders = [make_order(i) for i in range(3)]
+
+    with patch("services.Printer.Network") as MockNetwork:
+        mock_net = MockNetwork.return_value
+        results = printer.print_orders([(o, o.food_items) for o in orders])
+
+    assert results == [True, True, True]
+    MockNetwork.assert_called_once()
+    mock_net.open.assert_called_once()
+    mock_net.close.assert_called_once()
+    assert mock_net.cut.call_count == 3
+
+
+def test_printer_print_orders_reports_failure_from_broken_ticket_on():
+    printer = Printer(ip_address="10.0.0.1")
+    orders = [make_order(i) for i in range(4)]
+
+    with patch("services.Printer.Network") as MockNetwork:
+        mock_net = MockNetwork.return_value
+        mock_net.cut.side_effect = [None, OSError("connection reset"), None, None]
+        results = printer.print_orders([(o, o.food_items) for o in orders])
+
+    assert results == [True, False, False, False]
+    mock_net.close.assert_called_once()
+
+
+def test_printer_print_orders_all_failed_when_connect_fails():
+    printer = Printer(ip_address="10.0.0.1")
+    orders = [make_order(i) for i in range(2)]
+
+    with patch("services.Printer.Network") as MockNetwork:
+        MockNetwork.return_value.open.side_effect = OSError("refused")
+        results = printer.print_orders([(o, o.food_items) for o in orders])
+
+    assert results == [False, False]
+
+
+def test_service_print_orders_routes_tickets_per_printer():
+    service = make_service()
+    orders = [make_order(1), make_order(2, drink=False), make_order(3, food=False)]
+
+    results = service.print_orders(orders)
+
+    assert results == [True, True, True]
+    food_tickets = service.printer_food.print_orders.call_args.args[0]
+    drink_tickets = service.printer_drinks.print_orders.call_args.args[0]
+    assert [o.id for o, _ in food_tickets] == [1, 2]
+    assert [o.id for o, _ in drink_tickets] == [1, 3]
+
+
+def test_service_print_orders_fails_order_if_any_of_its_tickets_failed():
+    service = make_service()
+    service.printer_drinks.print_orders.side_effect = lambda tickets: [False] + [True] * (len(tickets) - 1)
+    orders = [make_order(1), make_order(2)]
+
+    assert service.print_orders(orders) == [False, True]
+
+
+def test_next_batch_drains_queue_up_to_batch_size():
+    service = OrderService.__new__(OrderService)
+    service.station_queues = {"food": Queue()}
+    service._stopped = Event()
+    for i in range(5):
+        service.station_queues["food"].put(PrintJob(id=i, order_id=i, station="food", order=make_order(i)))
+
+    with patch.object(Config, "PRINT_BATCH_SIZE", 3):
+        batch = service._next_batch("food")
+
+    assert [job.id for job in batch] == [0, 1, 2]
+    assert service.station_queues["food"].qsize() == 2
+
+
+def test_batching_benchmark_smoke():
+    from benchmarks.print_batching import run
+
+    results = run(order_count=4, batch_sizes=(1, 4), session_overhead=0)
+
+    assert [r["tickets"] for r in results] == [8, 8]
@@ -0,0 +1,30 @@
+"""
+Smoke tests for the end-to-end print pipeline benchmark — tiny runs that
+keep the benchmark working, not performance assertions.
+"""
+from benchmarks.print_pipeline import percentiles, run_scenario
+
+
+def test_percentiles_nearest_rank_in_ms():
+    values = [i / 1000 for i in range(1, 101)]  # 1..100 ms
+
+    assert percentiles(values) == {"p50": 50.0, "p95": 95.0, "p99": 99.0, "max": 100.0}
+    assert percentiles([])["p50"] is None
+
+
+def test_steady_scenario_prints_every_ticket_once():
+    result = run_scenario(rate=200, orders=10, connect_latency=0, print_latency=0)
+
+    assert result["complete"] is True
+    assert result["orders_printed"] == 10
+    assert result["duplicate_tickets"] == 0
+    assert result["order_to_paper_ms"]["p50"] is not None
+
+
+def test_outage_scenario_recovers_the_backlog():
+    result = run_scenario(rate=50, orders=10, connect_latency=0, print_latency=0,
+                          outage_at=0.0, outage_for=0.3, retry_delay=0.1, timeout=10)
+
+    assert result["complete"] is True
+    assert result["orders_printed"] == 10
+    assert result["queue_wait_ms"]["max"] >= 100
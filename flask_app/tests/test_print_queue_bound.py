@@ -0,0 +1,96 @@
+"""
+Tests for the bounded, id-only print queue: a backlog larger than
+PRINT_QUEUE_BOUND stays in the database and is paged in as printing
+catches up, without losing or duplicating tickets.
+"""
+import sqlite3
+import time
+from unittest.mock import patch
+
+from config import Config
+from models import Order, OrderItem
+
+
+def wait_until(condition, timeout=10.0, interval=0.02):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(interval)
+    return False
+
+
+def food_order(table=1, rush=False):
+    return Order(table_number=table, rush=rush,
+                 items=[OrderItem(name="Keule Pommes", price=10.5, quantity=1, type="food", id=61)])
+
+
+def test_pending_print_jobs_page_rush_first_then_oldest(order_logger):
+    ids = [order_logger.save_order(food_order(rush=(i == 3)), stations=["food"]) for i in range(5)]
+    order_logger.save_order(Order(table_number=2, items=[OrderItem(name="Pils", price=3.5, type="drink", id=1)]),
+                            stations=["drinks"])
+
+    page = order_logger.get_pending_print_jobs(station="food", limit=3)
+
+    assert [row["order_id"] for row in page] == [ids[3], ids[0], ids[1]]
+    assert {row["station"] for row in page} == {"food"}
+
+
+def test_backlog_over_bound_spills_to_db_and_drains_in_order(emulated_order_service_factory, emulated_printers):
+    food = emulated_printers["food"]
+    food.set_refusing(True)
+    with patch.object(Config, "PRINT_QUEUE_BOUND", 5), \
+         patch.object(Config, "PRINT_RETRY_DELAY_SECONDS", 0.05), \
+         patch.object(Config, "PRINT_LEADER_RENEW_SECONDS", 0.05):
+        service = emulated_order_service_factory()
+        try:
+            order_ids = [service.process_order(food_order(table=i % 4 + 1)) for i in range(40)]
+            queue = service.station_queues["food"]
+
+            # Memory holds at most the bound, as ids only; the rest waits in the DB
+            assert len(service._queued_job_ids["food"]) == 5
+            assert queue.qsize() <= 5
+            assert service.get_queue_status()["spilled_stations"] == ["food"]
+            jobs = queue.drain()
+            assert jobs and all(job.order is None and job.items == [] for job in jobs)
+            for job in jobs:
+                queue.put(job)
+
+            food.set_refusing(False)
+            assert food.wait_for_tickets(40, timeout=15)
+            assert wait_until(lambda: service.order_logger.get_pending_print_jobs() == [])
+            # The next page comes back short, so the station is no longer spilled
+            assert wait_until(lambda: service.get_queue_status()["spilled_stations"] == [])
+        finally:
+            service.leader_election.stop()
+            service.printer_service.health_monitor.stop()
+
+    printed = [ticket.order_id for ticket in food.tickets]
+    assert sorted(printed) == order_ids
+    assert len(set(printed)) == 40
+
+
+def test_batch_is_released_when_loading_it_fails(emulated_order_service_factory, emulated_printers):
+    food = emulated_printers["food"]
+    with patch.object(Config, "PRINT_LEADER_RENEW_SECONDS", 0.05):
+        service = emulated_order_service_factory()
+        try:
+            real_load = service.order_logger.get_orders_by_ids
+            calls = []
+
+            def flaky_load(ids):
+                calls.append(ids)
+                if len(calls) == 1:
+                    raise sqlite3.OperationalError("disk I/O error")
+                return real_load(ids)
+
+            with patch.object(service.order_logger, "get_orders_by_ids", side_effect=flaky_load):
+                order_id = service.process_order(food_order())
+                # Picked up again by the next DB poll and printed
+                assert food.wait_for_tickets(1, timeout=5)
+
+            assert [t.order_id for t in food.tickets] == [order_id]
+            assert wait_until(lambda: service.order_logger.get_pending_print_jobs() == [])
+            assert wait_until(lambda: not service._queued_job_ids["food"])
+        finally:
+            service.shutdown(timeout=1)
@@ -0,0 +1,135 @@
+"""
+Tests for the print queue scheduler: age order, retries keeping their place,
+rush orders, fairness across tables and the max-wait bound.
+"""
+import pytest
+
+from models import Order, OrderItem, PrintJob
+from services.print_scheduler import PrintScheduler
+
+_ids = iter(range(1, 100000))
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def job(created_ts, table=1, rush=False):
+    job_id = next(_ids)
+    return PrintJob(id=job_id, order_id=job_id, station="food", table_number=table, rush=rush, created_ts=created_ts)
+
+
+def make_scheduler(clock=None, **kwargs):
+    params = dict(rush_boost=60.0, table_spacing=5.0, max_wait=120.0)
+    params.update(kwargs)
+    return PrintScheduler(clock=clock or FakeClock(), **params)
+
+
+def drain_ids(scheduler):
+    return [j.id for j in scheduler.drain()]
+
+
+def test_oldest_ticket_first_and_retry_keeps_its_place():
+    scheduler = make_scheduler()
+    old, new = job(900.0, table=1), job(950.0, table=2)
+    scheduler.put(new)
+    scheduler.put(old)
+
+    first = scheduler.get_nowait()
+    assert first is old
+
+    # Print failed: back in the queue, still ahead of the newer ticket
+    scheduler.put(first)
+    assert scheduler.get_nowait() is old
+
+
+def test_rush_jumps_ahead_by_the_boost_only():
+    scheduler = make_scheduler()
+    much_older = job(900.0, table=1)
+    older = job(980.0, table=2)
+    rush = job(990.0, table=3, rush=True)
+    for j in (much_older, older, rush):
+        scheduler.put(j)
+
+    assert drain_ids(scheduler) == [much_older.id, rush.id, older.id]
+
+
+def test_one_busy_table_does_not_push_others_back():
+    scheduler = make_scheduler()
+    busy = [job(1000.0, table=7) for _ in range(5)]
+    for j in busy:
+        scheduler.put(j)
+    quiet = job(1000.5, table=2)
+    scheduler.put(quiet)
+
+    order = drain_ids(scheduler)
+
+    assert order.index(quiet.id) == 1
+    assert [i for i in order if i != quiet.id] == [j.id for j in busy]
+
+
+def test_ticket_over_max_wait_beats_rush():
+    clock = FakeClock(now=1000.0)
+    scheduler = make_scheduler(clock=clock, rush_boost=1000.0)
+    stale = job(870.0, table=1)
+    scheduler.put(stale)
+    for _ in range(3):
+        scheduler.put(job(999.0, table=2, rush=True))
+
+    assert scheduler.get_nowait() is stale
+
+
+def test_worst_case_wait_is_bounded_under_a_rush_flood():
+    """One ticket per second, a steady stream of rush tickets ahead of a normal one"""
+    clock = FakeClock(now=0.0)
+    scheduler = make_scheduler(clock=clock, max_wait=30.0)
+    normal = job(0.0, table=1)
+    scheduler.put(normal)
+    for second in range(200):
+        clock.now = float(second)
+        scheduler.put(job(clock.now, table=2 + second % 5, rush=True))
+        served = scheduler.get_nowait()
+        scheduler.task_done(served)
+        if served is normal:
+            break
+
+    assert served is normal
+    assert clock.now <= 30.0
+    stats = scheduler.stats()
+    assert stats["normal"]["count"] == 1
+    assert stats["normal"]["max"] <= 30.0 * 1000
+    assert stats["rush"]["count"] >= 1
+
+
+def test_get_raises_empty_and_drain_empties():
+    from queue import Empty
+
+    scheduler = make_scheduler()
+    with pytest.raises(Empty):
+        scheduler.get_nowait()
+    scheduler.put(job(1.0))
+    scheduler.put(job(2.0))
+
+    assert len(scheduler.drain()) == 2
+    assert scheduler.qsize() == 0
+
+
+def test_rush_flag_is_saved_and_scheduled(order_service_factory):
+    service = order_service_factory()
+    try:
+        order = Order(table_number=4, rush=True,
+                      items=[OrderItem(name="Pils", price=3.5, quantity=1, type="drink", id=1)])
+        order_id = service.process_order(order)
+
+        saved = service.order_logger.get_orders_by_ids([order_id])[0]
+        assert saved.rush is True
+        rows = service.order_logger.get_pending_print_jobs(order_ids=[order_id])
+        assert all(row["rush"] for row in rows)
+        assert service.order_logger.get_order(order_id)["order"]["rush"] == 1
+        assert "ticket_wait_ms" in service.get_queue_status()
+    finally:
+        service.leader_election.stop()
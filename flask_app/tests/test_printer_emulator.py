@@ -0,0 +1,169 @@
+"""
+Tests for the ESC/POS printer emulator and end-to-end printing against it:
+Printer -> TCP -> emulator, and the full OrderService pipeline with no mocks.
+"""
+import time
+
+from escpos.printer import Dummy, Network
+
+from models import Order, OrderItem
+from services.Printer import Printer
+from utils.printer_emulator import EscPosParser
+
+
+def wait_until(condition, timeout=3.0, interval=0.05):
+    """Poll `condition()` until it returns truthy or the timeout elapses."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(interval)
+    return False
+
+
+def make_order(order_id=12, food=True, drink=True):
+    items = []
+    if food:
+        items.append(OrderItem(name="Keule Pommes", price=10.5, quantity=1, type="food", id=61))
+    if drink:
+        items.append(OrderItem(name="Pils", price=3.5, quantity=2, type="drink", id=1))
+    return Order(table_number=4, id=order_id, items=items, comment="ohne Eis")
+
+
+def render(*tickets):
+    """ESC/POS bytes for the given (order, items) tickets, as Printer would send them"""
+    dummy = Dummy(profile="TM-T20II")
+    for order, items in tickets:
+        Printer("unused").write_ticket(dummy, order, items)
+        dummy.cut()
+    return dummy.output
+
+
+# ---------------------------------------------------------------------------
+# EscPosParser
+# ---------------------------------------------------------------------------
+
+def test_parser_decodes_ticket_text_and_euro_sign():
+    order = make_order()
+    events = EscPosParser().feed(render((order, order.drink_items)))
+
+    assert len(events) == 1
+    kind, lines, cut, size = events[0]
+    assert kind == "cut" and cut == "full"
+    assert "Tisch Nr. 4\tBestellnr: 12" in lines
+    assert "Pils                    7.00€" in lines
+    assert lines[-1] == "ohne Eis"
+
+
+def test_parser_handles_commands_split_across_chunks():
+    order = make_order()
+    data = render((order, order.food_items), (order, order.drink_items))
+    parser = EscPosParser()
+
+    events = []
+    for offset in range(0, len(data), 3):
+        events += parser.feed(data[offset:offset + 3])
+
+    assert [e[0] for e in events] == ["cut", "cut"]
+    assert sum(e[3] for e in events) == len(data)
+    assert events[0][1] == EscPosParser().feed(data)[0][1]
+
+
+def test_parser_reports_status_requests_and_cut_types():
+    events = EscPosParser().feed(b"\x10\x04\x04A\n\x1dV\x01B\n\x1dVA\x03")
+
+    assert events[0] == ("status", 4)
+    assert events[1][1:3] == (["A"], "partial")
+    assert events[2][1:3] == (["B"], "full")
+
+
+def test_parser_skips_raster_image_payload():
+    image = b"\x1dv0\x00\x02\x00\x02\x00" + b"\x0a\x1dV\x00"  # payload looks like LF + cut
+    events = EscPosParser().feed(image + b"Logo done\n\x1dV\x00")
+
+    assert len(events) == 1
+    assert events[0][1] == ["Logo done"]
+
+
+# ---------------------------------------------------------------------------
+# EscPosEmulator over TCP
+# ---------------------------------------------------------------------------
+
+def test_printer_prints_ticket_to_emulator(printer_emulator):
+    printer = Printer(printer_emulator.address)
+    order = make_order()
+
+    assert printer.is_available() is True
+    assert printer.print_order(order, order.food_items) is True
+
+    assert printer_emulator.wait_for_tickets(1)
+    ticket = printer_emulator.tickets[0]
+    assert ticket.order_id == 12
+    assert ticket.table_number == 4
+    assert "Keule Pommes" in ticket.text
+    assert "Pils" not in ticket.text
+
+
+def test_batched_session_arrives_as_separate_tickets_on_one_connection(printer_emulator):
+    printer = Printer(printer_emulator.address)
+    orders = [make_order(i) for i in range(1, 4)]
+
+    printer.print_orders([(o, o.food_items) for o in orders])
+
+    assert printer_emulator.wait_for_tickets(3)
+    assert [t.order_id for t in printer_emulator.tickets] == [1, 2, 3]
+    assert {t.connection for t in printer_emulator.tickets} == {1}
+
+
+def test_refusing_emulator_makes_printer_unavailable(printer_emulator):
+    printer = Printer(printer_emulator.address)
+    order = make_order()
+
+    printer_emulator.set_refusing(True)
+    assert printer.is_available() is False
+    assert printer.print_orders([(order, order.food_items)]) == [False]
+
+    printer_emulator.set_refusing(False)
+    assert printer.is_available() is True
+
+
+def test_paper_out_drops_tickets_and_reports_status(printer_emulator):
+    printer = Printer(printer_emulator.address)
+    order = make_order()
+    printer_emulator.paper_out = True
+
+    printer.print_order(order, order.food_items)
+    network = Network(printer_emulator.host, port=printer_emulator.port, timeout=2)
+    network.open()
+    paper = network.paper_status()
+    network.close()
+
+    assert paper == 0
+    assert wait_until(lambda: printer_emulator.dropped_tickets == 1)
+    assert printer_emulator.tickets == []
+
+
+def test_mid_ticket_disconnect_leaves_fragment(printer_emulator):
+    printer = Printer(printer_emulator.address)
+    order = make_order()
+    printer_emulator.disconnect_after_bytes = 40
+
+    printer.print_orders([(order, order.food_items)])
+
+    assert wait_until(lambda: printer_emulator.fragments)
+    assert printer_emulator.tickets == []
+    assert printer_emulator.fragments[0].cut == "none"
+
+
+def test_order_service_prints_end_to_end(emulated_order_service_factory, emulated_printers):
+    service = emulated_order_service_factory()
+
+    order_id = service.process_order(make_order(order_id=None))
+
+    assert emulated_printers["food"].wait_for_tickets(1)
+    assert emulated_printers["drinks"].wait_for_tickets(1)
+    assert emulated_printers["food"].tickets[0].order_id == order_id
+    assert "Pils" in emulated_printers["drinks"].tickets[0].text
+    assert wait_until(
+        lambda: service.order_logger.get_order(order_id)["order"]["status"] == "printed"
+    )
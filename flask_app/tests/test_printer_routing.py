@@ -0,0 +1,136 @@
+"""
+Tests for N-station printer routing: the menu-driven routing table, the
+PrinterService station printers, and one print worker per station printing
+an order's tickets independently.
+"""
+import time
+from unittest.mock import MagicMock, patch
+
+from config import Config
+from models import Order, OrderItem
+from services.printer_routing import StationRouter, default_stations
+from services.printer_service import PrinterService
+from utils.file_utils import load_menu
+
+STATIONS = {
+    "bar": {"categories": ["Bier", "Wein", "Alkoholfreie Getränke"]},
+    "coffee": {"categories": ["Kaffee/Kuchen"], "items": [1]},
+    "grill": {"types": ["food"]},
+}
+
+
+def wait_until(condition, timeout=5.0, interval=0.05):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(interval)
+    return False
+
+
+def menu_item(category, index=0):
+    item = load_menu()[category][index]
+    return OrderItem(id=item["id"], name=item["name"], price=item["price"], type=item.get("type", "food"))
+
+
+def test_router_precomputes_item_table_from_menu_categories():
+    menu = load_menu()
+    router = StationRouter(STATIONS, menu)
+
+    for item in menu["Wein"]:
+        assert router.item_station[item["id"]] == "bar"
+    for item in menu["Kaffee/Kuchen"]:
+        assert router.item_station[item["id"]] == "coffee"
+    # Explicit item ids win over categories (id 1 is a beer)
+    assert router.item_station[1] == "coffee"
+
+
+def test_router_falls_back_to_type_then_first_station():
+    router = StationRouter(STATIONS, load_menu())
+
+    assert router.station_for(menu_item("Essen")) == "grill"
+    assert router.station_for(OrderItem(id=999, name="Special", price=1.0, type="drink")) == "bar"
+    assert StationRouter({"bar": {}, "grill": {"types": ["food"]}}).station_for(
+        OrderItem(id=999, name="Wasser", price=1.0, type="drink")) == "bar"
+
+
+def test_default_stations_route_by_item_type():
+    router = StationRouter(default_stations("10.0.0.1", "10.0.0.2"), load_menu())
+    order = Order(table_number=1, items=[menu_item("Essen"), menu_item("Bier"), menu_item("Essen", 1)])
+
+    tickets = router.split(order)
+
+    assert list(tickets) == ["food", "drinks"]
+    assert tickets["food"] == order.food_items
+    assert tickets["drinks"] == order.drink_items
+
+
+def test_split_groups_items_in_station_order():
+    router = StationRouter(STATIONS, load_menu())
+    order = Order(table_number=3, items=[menu_item("Kaffee/Kuchen"), menu_item("Essen"), menu_item("Wein")])
+
+    tickets = router.split(order)
+
+    assert list(tickets) == ["bar", "coffee", "grill"]
+    assert [len(items) for items in tickets.values()] == [1, 1, 1]
+
+
+def test_printer_service_builds_one_printer_per_station():
+    stations = {name: dict(rules, ip=f"10.0.0.{i}") for i, (name, rules) in enumerate(STATIONS.items(), 1)}
+    with patch.object(Config, "PRINTER_HEALTH_INTERVAL_SECONDS", 0):
+        service = PrinterService(config={"mock": False, "stations": stations, "logo_path": None})
+
+    assert service.stations == ["bar", "coffee", "grill"]
+    assert [printer.ip_address for printer in service.printers.values()] == ["10.0.0.1", "10.0.0.2", "10.0.0.3"]
+    assert set(service.get_printer_status()) == {"bar_printer", "coffee_printer", "grill_printer"}
+
+
+def test_print_tickets_skips_empty_tickets():
+    printer = MagicMock()
+    printer.print_orders.side_effect = lambda tickets: [True] * len(tickets)
+    service = PrinterService(config={"mock": False, "stations": STATIONS}, printers={"bar": printer})
+    order = Order(table_number=1, items=[menu_item("Bier")])
+
+    assert service.print_tickets("bar", [(order, []), (order, order.items)]) == [True, True]
+    assert len(printer.print_orders.call_args.args[0]) == 1
+
+
+def test_order_service_prints_each_station_independently(printer_emulator_factory, db_path):
+    emulators = {name: printer_emulator_factory(name=name) for name in STATIONS}
+    stations = {name: dict(rules, ip=emulators[name].address) for name, rules in STATIONS.items()}
+
+    with patch.object(Config, "DATABASE_PATH", db_path), \
+         patch.object(Config, "MOCK_PRINTER", False), \
+         patch.object(Config, "PRINTER_STATIONS", stations), \
+         patch.object(Config, "PRINT_RETRY_DELAY_SECONDS", 0.1):
+        from services.order_service import OrderService
+        service = OrderService()
+        try:
+            emulators["coffee"].set_refusing(True)
+            order = Order(table_number=7, items=[menu_item("Bier", 1), menu_item("Kaffee/Kuchen"), menu_item("Essen")])
+            order_id = service.process_order(order)
+
+            # Bar and grill print while the coffee printer is down...
+            assert emulators["bar"].wait_for_tickets(1)
+            assert emulators["grill"].wait_for_tickets(1)
+            assert service.order_logger.get_order(order_id)["order"]["status"] == "pending"
+
+            # ...and only the coffee ticket is printed once it is back
+            emulators["coffee"].set_refusing(False)
+            assert emulators["coffee"].wait_for_tickets(1)
+            assert wait_until(lambda: service.order_logger.get_order(order_id)["order"]["status"] == "printed")
+            assert [len(e.tickets) for e in emulators.values()] == [1, 1, 1]
+            assert emulators["coffee"].tickets[0].order_id == order_id
+        finally:
+            service.leader_election.stop()
+            service.printer_service.health_monitor.stop()
+
+
+def test_recovery_creates_print_jobs_for_orders_saved_without_them(order_logger, order_service_factory):
+    order_id = order_logger.save_order(Order(table_number=2, items=[menu_item("Bier"), menu_item("Essen")]))
+
+    service = order_service_factory()
+
+    assert {job["station"] for job in order_logger.get_pending_print_jobs()} <= {"food", "drinks"}
+    assert wait_until(lambda: order_logger.get_order(order_id)["order"]["status"] == "printed")
+    service.leader_election.stop()
@@ -32,10 +32,10 @@ def make_order(order_id):
 
 
 def make_service():
-    service = PrinterService.__new__(PrinterService)
-    service.config = {"mock": True}
-    service.printer_food = MagicMock(is_available=MagicMock(return_value=True))
-    service.printer_drinks = MagicMock(is_available=MagicMock(return_value=True))
+    service = PrinterService(config={"mock": True}, printers={
+        "food": MagicMock(is_available=MagicMock(return_value=True)),
+        "drinks": MagicMock(is_available=MagicMock(return_value=True)),
+    })
     return service
 
 
@@ -4,12 +4,13 @@ MockPrinter, printer_health_checker), fully mocked — no real printer
 connection is available in this environment.
 """
 import socket
+import time
 from unittest.mock import MagicMock, patch
 
 from services.Printer import Printer
 from services.printer_service import PrinterService
 from services.MockPrinter import MockPrinter
-from utils.printer_health_checker import check_printer_socket, PrinterHealthMonitor
+from utils.printer_health_checker import check_printer_socket, PrinterHealthMonitor, summarize_samples
 from models import Order, OrderItem
 
 
@@ -66,6 +67,19 @@ def test_print_order_uses_testing_branch_and_never_cuts():
     mock_net.cut.assert_not_called()
 
 
+def test_print_orders_resets_last_error_each_session():
+    printer = Printer(ip_address="10.0.0.1")
+    order = make_order()
+
+    with patch("services.Printer.Network") as MockNetwork:
+        MockNetwork.return_value.open.side_effect = [OSError("refused"), None]
+        assert printer.print_orders([(order, order.food_items)]) == [False]
+        assert printer.last_error == "OSError('refused')"
+
+        assert printer.print_orders([(order, order.food_items)]) == [True]
+    assert printer.last_error is None
+
+
 def test_print_order_with_no_items_returns_none():
     """Regression test documenting current behavior: an empty item list makes
     print_order return None rather than False."""
@@ -83,10 +97,10 @@ def test_print_order_with_no_items_returns_none():
 # ---------------------------------------------------------------------------
 
 def make_service(mock=False):
-    service = PrinterService.__new__(PrinterService)
-    service.config = {"mock": mock}
-    service.printer_food = MagicMock(is_available=MagicMock(return_value=True))
-    service.printer_drinks = MagicMock(is_available=MagicMock(return_value=True))
+    service = PrinterService(config={"mock": mock}, printers={
+        "food": MagicMock(is_available=MagicMock(return_value=True)),
+        "drinks": MagicMock(is_available=MagicMock(return_value=True)),
+    })
     return service
 
 
@@ -188,3 +202,149 @@ def test_health_monitor_logs_only_on_status_change(caplog):
 
     change_logs = [r for r in caplog.records if "status changed" in r.message]
     assert len(change_logs) == 2  # one for food, one for drinks, only on first call
+
+
+def test_health_monitor_probes_printers_concurrently():
+    monitor = PrinterHealthMonitor(food_ip="10.0.0.1", drinks_ip="10.0.0.2")
+
+    def slow_check(_ip, port=9100, timeout=1.5):
+        time.sleep(0.2)
+        return {"reachable": True, "latency_ms": 200.0, "error": None}
+
+    with patch("utils.printer_health_checker.check_printer_socket", side_effect=slow_check):
+        start = time.perf_counter()
+        monitor.check_all()
+        elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.35
+
+
+def test_health_monitor_caches_status_and_tracks_last_change():
+    monitor = PrinterHealthMonitor(food_ip="10.0.0.1", drinks_ip="10.0.0.2")
+    assert monitor.status() == {}
+
+    with patch("utils.printer_health_checker.check_printer_socket") as mock_check:
+        mock_check.return_value = {"reachable": True, "latency_ms": 1.0, "error": None}
+        first = monitor.check_all()
+        second = monitor.check_all()
+        mock_check.return_value = {"reachable": False, "latency_ms": None, "error": "down"}
+        third = monitor.check_all()
+
+    assert second["food_printer"]["last_change"] == first["food_printer"]["last_change"]
+    assert second["food_printer"]["checked_at"] >= first["food_printer"]["checked_at"]
+    assert third["food_printer"]["last_change"] == third["food_printer"]["checked_at"]
+    assert monitor.status() is third
+
+
+def test_health_monitor_background_thread_probes_emulated_printers(emulated_printers):
+    monitor = PrinterHealthMonitor(food_ip=emulated_printers["food"].address,
+                                   drinks_ip=emulated_printers["drinks"].address)
+
+    monitor.start(interval_seconds=0.05)
+    try:
+        deadline = time.time() + 3
+        while not monitor.status() and time.time() < deadline:
+            time.sleep(0.02)
+    finally:
+        monitor.stop()
+
+    assert monitor.status()["food_printer"]["reachable"] is True
+    assert monitor.status()["drinks_printer"]["reachable"] is True
+
+
+def test_get_printer_status_reads_cache_without_network():
+    service = make_service()
+    service.health_monitor = MagicMock()
+    service.health_monitor.status.return_value = {
+        "food_printer": {"reachable": True, "latency_ms": 3.5, "last_change": 100.0, "checked_at": 105.0},
+        "drinks_printer": {"reachable": False, "latency_ms": None, "last_change": 90.0, "checked_at": 105.0},
+    }
+
+    status = service.get_printer_status()
+
+    assert status["food_printer"]["available"] is True
+    assert status["food_printer"]["latency_ms"] == 3.5
+    assert status["drinks_printer"]["available"] is False
+    assert status["drinks_printer"]["last_change"] == 90.0
+    service.printer_food.is_available.assert_not_called()
+    service.printer_drinks.is_available.assert_not_called()
+
+
+def test_get_printer_status_unavailable_before_first_probe():
+    service = make_service()
+    service.health_monitor = MagicMock()
+    service.health_monitor.status.return_value = {}
+
+    status = service.get_printer_status()
+
+    assert status["food_printer"]["available"] is False
+    assert status["food_printer"]["checked_at"] is None
+
+
+def test_health_monitor_probes_any_number_of_printers():
+    printers = {f"station_{i}": f"10.0.0.{i}" for i in range(6)}
+    monitor = PrinterHealthMonitor(printers=printers)
+
+    def slow_check(_ip, port=9100, timeout=1.5):
+        time.sleep(0.2)
+        return {"reachable": True, "latency_ms": 200.0, "error": None}
+
+    with patch("utils.printer_health_checker.check_printer_socket", side_effect=slow_check):
+        start = time.perf_counter()
+        status = monitor.check_all()
+        elapsed = time.perf_counter() - start
+
+    assert set(status) == set(printers)
+    assert elapsed < 0.5
+
+
+def test_summarize_samples_histogram_and_availability():
+    samples = [(0, True, 0.5), (1, True, 7.0), (2, True, 8.0), (3, True, 2000.0), (4, False, None)]
+
+    summary = summarize_samples(samples)
+
+    assert summary["samples"] == 5
+    assert summary["availability_pct"] == 80.0
+    histogram = summary["latency_ms"]["histogram"]
+    assert histogram["le_1"] == 1
+    assert histogram["le_10"] == 2
+    assert histogram["le_inf"] == 1
+    assert summary["latency_ms"]["max"] == 2000.0
+    assert summarize_samples([])["availability_pct"] is None
+
+
+def test_health_monitor_stats_per_window():
+    monitor = PrinterHealthMonitor(printers={"bar": "10.0.0.1"}, windows=(10, 60))
+    now = time.time()
+    # One old outage (only inside the 60 s window) and two recent good probes
+    monitor._history["bar"].extend([(now - 30, False, None), (now - 5, True, 3.0), (now - 1, True, 4.0)])
+
+    stats = monitor.stats()["bar"]["windows"]
+
+    assert stats["10s"]["availability_pct"] == 100.0
+    assert stats["10s"]["samples"] == 2
+    assert stats["60s"]["availability_pct"] == round(200 / 3, 2)
+
+
+def test_health_monitor_drops_history_outside_longest_window():
+    monitor = PrinterHealthMonitor(printers={"bar": "10.0.0.1"}, windows=(1,))
+    monitor._history["bar"].append((time.time() - 5, True, 1.0))
+
+    with patch("utils.printer_health_checker.check_printer_socket") as mock_check:
+        mock_check.return_value = {"reachable": True, "latency_ms": 1.0, "error": None}
+        monitor.check_all()
+
+    assert len(monitor._history["bar"]) == 1
+
+
+def test_health_monitor_json_output(capsys):
+    monitor = PrinterHealthMonitor(printers={"bar": "10.0.0.1"})
+
+    with patch("utils.printer_health_checker.check_printer_socket") as mock_check:
+        mock_check.return_value = {"reachable": True, "latency_ms": 1.0, "error": None}
+        monitor.run_loop(interval_seconds=0, max_ticks=2, as_json=True)
+
+    import json
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [line["tick"] for line in lines] == [1, 2]
+    assert lines[-1]["printers"]["bar"]["windows"]["60s"]["samples"] == 2
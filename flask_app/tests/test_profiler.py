@@ -0,0 +1,75 @@
+"""
+Tests for the on-demand sampling profiler and its admin endpoint.
+"""
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+
+from config import Config
+from routes.admin_routes import admin_bp
+from utils import profiler
+
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+def busy_worker(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+@pytest.fixture
+def worker_thread():
+    stop = threading.Event()
+    thread = threading.Thread(target=busy_worker, args=(stop,), name="print-test", daemon=True)
+    thread.start()
+    yield thread
+    stop.set()
+    thread.join()
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(admin_bp)
+    with patch.object(Config, "ADMIN_TOKEN", "secret"):
+        yield app.test_client()
+
+
+def test_samples_other_threads_in_collapsed_format(worker_thread):
+    stacks = profiler.sample_stacks(0.2, hz=200)
+
+    lines = profiler.collapse(stacks).splitlines()
+    worker = [line for line in lines if line.startswith("thread:print-test;")]
+    assert worker
+    assert all("test_profiler.py:busy_worker" in line for line in worker)
+    stack, count = worker[0].rsplit(" ", 1)
+    assert int(count) >= 1
+    # The profiling thread itself is left out
+    assert not any("profiler.py:sample_stacks" in line for line in lines)
+
+
+def test_thread_filter_and_single_profile_at_a_time(worker_thread):
+    stacks = profiler.sample_stacks(0.1, hz=100, thread_filter="print-test")
+    assert stacks and all(stack.startswith("thread:print-test;") for stack in stacks)
+
+    with profiler._busy:
+        with pytest.raises(profiler.ProfilerBusy):
+            profiler.sample_stacks(0.1)
+
+
+def test_profile_endpoint(client, worker_thread):
+    assert client.get("/admin/profile?seconds=0.1").status_code == 403
+    assert client.get("/admin/profile?seconds=0", headers=ADMIN).status_code == 400
+    assert client.get("/admin/profile?hz=100000", headers=ADMIN).status_code == 400
+
+    started = time.monotonic()
+    response = client.get("/admin/profile?seconds=0.2&hz=50&thread=print-test", headers=ADMIN)
+
+    assert response.status_code == 200
+    assert time.monotonic() - started >= 0.2
+    assert response.content_type.startswith("text/plain")
+    assert int(response.headers["X-Profile-Samples"]) >= 1
+    assert response.get_data(as_text=True).startswith("thread:print-test;")
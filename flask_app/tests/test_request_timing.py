@@ -0,0 +1,81 @@
+"""
+Tests for the per-route timing middleware: Server-Timing header, DB time
+and SQL statement count per request, rolling percentiles per route and the
+slow-request log.
+"""
+import logging
+import re
+import time
+from unittest.mock import patch
+
+import pytest
+
+from config import Config
+from utils.request_timing import RouteTimings, summarize
+
+
+@pytest.fixture
+def app(db_path, tmp_path):
+    with patch.object(Config, "MOCK_PRINTER", True), \
+         patch.object(Config, "PRINTER_STATIONS", None), \
+         patch.object(Config, "DATABASE_PATH", db_path), \
+         patch.object(Config, "LOG_DIR", str(tmp_path / "logs")):
+        from main import create_app
+        app = create_app()
+    yield app
+    app.order_service.shutdown(timeout=1)
+
+
+def server_timing(response):
+    header = response.headers["Server-Timing"]
+    match = re.fullmatch(r'app;dur=([\d.]+), db;dur=([\d.]+);desc="(\d+) SQL statement\(s\)"', header)
+    assert match, header
+    return float(match[1]), float(match[2]), int(match[3])
+
+
+def test_server_timing_header_reports_db_time_and_statements(app):
+    client = app.test_client()
+
+    wall, db, statements = server_timing(client.get("/orders/dashboard/food"))
+    assert statements >= 1
+    assert 0 <= db <= wall
+
+    # No database access at all
+    _, db, statements = server_timing(client.get("/menu"))
+    assert statements == 0
+    assert db == 0
+
+
+def test_percentiles_per_route_and_admin_endpoint(app):
+    client = app.test_client()
+    for _ in range(3):
+        client.get("/orders/dashboard/drinks")
+    client.get("/menu")
+
+    with patch.object(Config, "ADMIN_TOKEN", "secret"):
+        routes = client.get("/admin/timing", headers={"X-Admin-Token": "secret"}).get_json()["routes"]
+
+    drinks = routes["order.get_dashboard_orders_drinks"]
+    assert drinks["blueprint"] == "order"
+    assert drinks["wall_ms"]["count"] == 3
+    assert drinks["db_ms"]["p50"] <= drinks["wall_ms"]["p50"]
+    assert routes["menu.get_menu"]["blueprint"] == "menu"
+
+
+def test_slow_requests_are_logged_with_statement_count(app, caplog):
+    client = app.test_client()
+    with patch.object(Config, "SLOW_REQUEST_MS", 0), caplog.at_level(logging.WARNING, logger="utils.request_timing"):
+        client.get("/orders/dashboard/food")
+
+    assert re.search(r"Slow request GET /orders/dashboard/food \(order.get_dashboard_orders_food\): .* in \d+ SQL statement",
+                     caplog.text)
+
+
+def test_route_timings_keep_a_rolling_window():
+    timings = RouteTimings(samples=3)
+    for ms in (100, 1, 2, 3):
+        timings.record("order.place_order", ms, ms / 2)
+
+    stats = timings.stats()["order.place_order"]
+    assert stats["wall_ms"] == summarize([1, 2, 3])
+    assert stats["wall_ms"]["max"] == 3
@@ -0,0 +1,125 @@
+"""
+Tests for the production server setup: gunicorn.conf.py settings and hooks
+and the per-worker app in wsgi.py.
+"""
+import runpy
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from config import BASE_DIR, Config
+
+gunicorn_config = pytest.importorskip("gunicorn.config")
+
+CONF_PATH = str(BASE_DIR / "gunicorn.conf.py")
+
+
+def load_conf(**overrides):
+    """gunicorn.conf.py's namespace and the METRICS_DIR it set, with Config restored afterwards"""
+    overrides.setdefault("METRICS_DIR", None)
+    with patch.multiple(Config, **overrides):
+        return runpy.run_path(CONF_PATH), Config.METRICS_DIR
+
+
+def test_settings_are_valid_for_gunicorn(tmp_path):
+    conf, _ = load_conf(WEB_WORKERS=3, WEB_THREADS=4, WEB_KEEPALIVE_SECONDS=75, WEB_MAX_REQUESTS=1000,
+                        SHUTDOWN_DRAIN_SECONDS=8, DATABASE_PATH=str(tmp_path / "orders.db"))
+
+    settings = gunicorn_config.Config()
+    for name, value in conf.items():
+        if name in settings.settings:
+            settings.set(name, value)
+
+    assert settings.workers == 3 and settings.threads == 4
+    assert settings.worker_class_str == "gthread"
+    assert settings.keepalive == 75
+    assert settings.graceful_timeout > Config.SHUTDOWN_DRAIN_SECONDS
+    assert settings.max_requests == 1000 and settings.max_requests_jitter == 100
+    assert callable(settings.post_worker_init) and callable(settings.worker_exit)
+    assert callable(settings.on_starting) and callable(settings.child_exit)
+
+
+def test_several_workers_share_metrics_next_to_the_db(tmp_path):
+    db = str(tmp_path / "orders.db")
+
+    _, metrics_dir = load_conf(WEB_WORKERS=2, METRICS_DIR=None, DATABASE_PATH=db)
+    assert metrics_dir == str(tmp_path / "metrics")
+
+    _, metrics_dir = load_conf(WEB_WORKERS=1, METRICS_DIR=None, DATABASE_PATH=db)
+    assert metrics_dir is None
+
+    _, metrics_dir = load_conf(WEB_WORKERS=2, METRICS_DIR="/elsewhere", DATABASE_PATH=db)
+    assert metrics_dir == "/elsewhere"
+
+
+def test_master_hooks_clear_and_retire_metrics_snapshots(tmp_path):
+    stale = tmp_path / "metrics_99.json"
+    stale.write_text("{}")
+    conf, metrics_dir = load_conf(WEB_WORKERS=2, METRICS_DIR=str(tmp_path))
+
+    with patch.object(Config, "METRICS_DIR", metrics_dir):
+        conf["on_starting"](MagicMock())
+        assert not stale.exists()
+
+        with patch("utils.metrics.retire_snapshot") as retire_snapshot:
+            conf["child_exit"](MagicMock(), MagicMock(pid=1234))
+    retire_snapshot.assert_called_once_with(str(tmp_path), 1234)
+
+
+@pytest.fixture
+def wsgi_module():
+    import wsgi
+    wsgi.app = None
+    yield wsgi
+    wsgi.app = None
+
+
+def test_worker_hooks_build_the_app_and_drain_it_on_exit(wsgi_module):
+    conf, _ = load_conf()
+    app = MagicMock()
+
+    with patch.object(wsgi_module, "create_app", return_value=app) as create_app:
+        conf["post_worker_init"](MagicMock())
+        conf["post_worker_init"](MagicMock())
+
+    create_app.assert_called_once()
+    assert wsgi_module.app is app
+
+    with patch("utils.metrics.REGISTRY.stop_flusher") as stop_flusher:
+        conf["worker_exit"](MagicMock(), MagicMock())
+
+    app.order_service.shutdown.assert_called_once()
+    stop_flusher.assert_called_once()
+
+
+def test_worker_exit_before_the_app_was_built(wsgi_module):
+    conf, _ = load_conf()
+
+    with patch("utils.metrics.REGISTRY.stop_flusher") as stop_flusher:
+        conf["worker_exit"](MagicMock(), MagicMock())
+
+    stop_flusher.assert_called_once()
+
+
+def test_application_builds_the_app_on_first_request(wsgi_module):
+    app = MagicMock(return_value=[b"ok"])
+
+    with patch.object(wsgi_module, "create_app", return_value=app) as create_app:
+        assert wsgi_module.application({}, None) == [b"ok"]
+        wsgi_module.application({}, None)
+
+    create_app.assert_called_once()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="gunicorn needs fork()")
+def test_server_load_benchmark_smoke():
+    from benchmarks.server_load import run
+
+    dev, gunicorn = run(clients=2, duration=1.0, workers=1, threads=2)
+
+    for result in (dev, gunicorn):
+        assert result["requests"] > 0
+        assert result["status_errors"] == result["connection_errors"] == 0
+        assert result["order_ms"]["p50"] is not None
+    assert gunicorn["server"] == "gunicorn" and gunicorn["threads"] == 2
@@ -0,0 +1,87 @@
+"""
+JSON provider for the Flask app (`jsonify`, `request.get_json()`).
+
+JSON_PROVIDER selects it:
+
+- "orjson": orjson for dumps/loads and responses, several times faster than
+  the stdlib on dashboard-sized payloads. orjson is an optional dependency
+  (`pip install orjson`).
+- "stdlib": Flask's provider based on the json module.
+- "auto" (default): orjson when installed, otherwise stdlib.
+
+Both write UTF-8 instead of \\u escapes and keep dict keys in insertion
+order rather than sorting them. Dates are serialized as HTTP dates and
+dataclasses as dicts, as in Flask's default provider. Anything orjson
+rejects (e.g. integers beyond 64 bit) goes through the stdlib instead.
+"""
+import logging
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+log = logging.getLogger(__name__)
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """Flask's json-module provider without key sorting or ASCII escaping"""
+    sort_keys = False
+    ensure_ascii = False
+
+
+class OrjsonProvider(StdlibJSONProvider):
+    """orjson-backed provider; falls back to the stdlib for unsupported values or json.dumps() options"""
+
+    def __init__(self, app):
+        if orjson is None:
+            raise RuntimeError("orjson is not installed")
+        super().__init__(app)
+        # Hand dates to Flask's default() so they stay HTTP dates
+        self._options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def _dump_bytes(self, obj, options=0) -> bytes:
+        try:
+            return orjson.dumps(obj, default=self.default, option=self._options | options)
+        except orjson.JSONEncodeError:
+            text = super().dumps(obj, separators=(",", ":"))
+            return (text + "\n" if options & orjson.OPT_APPEND_NEWLINE else text).encode("utf-8")
+
+    def dumps(self, obj, **kwargs) -> str:
+        if kwargs.keys() - {"separators"}:
+            return super().dumps(obj, **kwargs)
+        return self._dump_bytes(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)  # indented for reading
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._dump_bytes(obj, orjson.OPT_APPEND_NEWLINE), mimetype=self.mimetype)
+
+
+PROVIDERS = {"stdlib": StdlibJSONProvider, "orjson": OrjsonProvider}
+
+
+def provider_class(name: str = "auto"):
+    """Provider class for JSON_PROVIDER `name` ("auto", "orjson" or "stdlib")"""
+    if name == "auto":
+        return OrjsonProvider if orjson is not None else StdlibJSONProvider
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown JSON provider {name!r}, expected one of auto, {', '.join(PROVIDERS)}")
+    if name == "orjson" and orjson is None:
+        log.warning("JSON_PROVIDER=orjson but orjson is not installed, using the stdlib json module")
+        return StdlibJSONProvider
+    return PROVIDERS[name]
+
+
+def init_app(app, name: str = "auto"):
+    """Install the selected provider on `app`"""
+    app.json = provider_class(name)(app)
+    log.debug(f"JSON provider: {type(app.json).__name__}")
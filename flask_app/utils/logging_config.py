@@ -6,17 +6,137 @@ never call `print()` for diagnostic output. `setup_logging()` wires up the
 root logger with a console handler and a rotating file handler and is safe
 to call multiple times (e.g. once from the app factory, once from a
 standalone CLI script) without creating duplicate handlers.
+
+The handlers do not run on the logging thread: the root logger only gets a
+QueueHandler that puts records on a bounded queue, and a QueueListener
+thread does the formatting, console writes, file I/O and rotation. When the
+queue is full, records below WARNING are dropped right away and WARNING and
+above wait briefly before being dropped. The listener logs how many were lost.
+`queue_size=0` attaches the handlers directly (synchronous logging).
 """
+import atexit
+import copy
+import json
 import logging
 import logging.handlers
 import os
+import queue
+import sys
+from datetime import datetime, timezone
 from pathlib import Path
+from threading import Lock
 
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 _CONFIGURED_FLAG = "_bestellsystem_logging_configured"
+# Seconds a WARNING or worse waits for room in a full queue before it is dropped
+_IMPORTANT_PUT_TIMEOUT = 0.1
+
+_listener = None
+_TRACEBACK_FORMATTER = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, thread (+ exception)"""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking the caller when the queue is full"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._lock = Lock()
+
+    def prepare(self, record):
+        """Merge args into the message and render the traceback now; the formatter runs on the listener"""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or _TRACEBACK_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            if record.levelno >= logging.WARNING:
+                self.queue.put(record, timeout=_IMPORTANT_PUT_TIMEOUT)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return
+        if self.dropped:
+            self._report_dropped()
+
+    def _report_dropped(self):
+        with self._lock:
+            dropped, self.dropped = self.dropped, 0
+        if not dropped:
+            return
+        try:
+            from utils import metrics
+            metrics.LOG_RECORDS_DROPPED.inc(dropped)
+        except Exception:
+            pass
+        notice = logging.LogRecord(
+            __name__, logging.WARNING, __file__, 0,
+            f"Log queue full, dropped {dropped} log record(s)", None, None,
+        )
+        try:
+            self.queue.put_nowait(notice)
+        except queue.Full:
+            with self._lock:
+                self.dropped += dropped
 
 
-def setup_logging(log_level=None, log_dir=None):
+def _remove_basic_config_handlers(root):
+    """
+    Drop bare StreamHandlers a library's import-time logging.basicConfig()
+    put on the root logger (python-escpos' capabilities module does this),
+    which would print every line a second time. Subclasses such as pytest's
+    capture handler are left alone.
+    """
+    for handler in list(root.handlers):
+        if type(handler) is logging.StreamHandler:
+            root.removeHandler(handler)
+
+
+def stop_logging():
+    """Flush and stop the background log thread; handlers are detached from the root logger"""
+    global _listener
+    root = logging.getLogger()
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    for handler in list(root.handlers):
+        if isinstance(handler, DroppingQueueHandler) or getattr(handler, "_bestellsystem_handler", False):
+            root.removeHandler(handler)
+            handler.close()
+    setattr(root, _CONFIGURED_FLAG, False)
+
+
+atexit.register(stop_logging)
+
+
+def setup_logging(log_level=None, log_dir=None, json_format=None, queue_size=None, force=False):
     """Configure the root logger with console + rotating file handlers.
 
     Args:
@@ -24,31 +144,47 @@ def setup_logging(log_level=None, log_dir=None):
             LOG_LEVEL env var, then "INFO".
         log_dir: Directory to write app.log into. Falls back to the
             LOG_DIR env var, then <flask_app>/data/logs.
+        json_format: One JSON object per line instead of the text format.
+            Falls back to the LOG_JSON env var, then False.
+        queue_size: Max records waiting for the background log thread; 0
+            logs synchronously on the calling thread. Falls back to the
+            LOG_QUEUE_SIZE env var, then 10000.
+        force: Replace an existing configuration (e.g. to benchmark variants).
 
     Returns:
         The configured root logger.
     """
+    global _listener
     root = logging.getLogger()
 
     level_name = log_level or os.getenv("LOG_LEVEL", "INFO")
     level = getattr(logging, str(level_name).upper(), logging.INFO)
 
-    if getattr(root, _CONFIGURED_FLAG, False):
+    if getattr(root, _CONFIGURED_FLAG, False) and not force:
         # Already configured (e.g. called from both main() and create_app());
         # just refresh the level in case it changed.
         root.setLevel(level)
         return root
+    stop_logging()
+    _remove_basic_config_handlers(root)
+
+    if json_format is None:
+        json_format = os.getenv("LOG_JSON", "false").lower() in ("1", "true", "yes")
+    if queue_size is None:
+        queue_size = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
 
     root.setLevel(level)
-    formatter = logging.Formatter(LOG_FORMAT)
+    formatter = JsonFormatter() if json_format else logging.Formatter(LOG_FORMAT)
 
-    console_handler = logging.StreamHandler()
+    handlers = []
+    console_handler = logging.StreamHandler(sys.stderr)
     console_handler.setFormatter(formatter)
-    root.addHandler(console_handler)
+    handlers.append(console_handler)
 
     resolved_log_dir = Path(
         log_dir or os.getenv("LOG_DIR", Path(__file__).resolve().parent.parent / "data" / "logs")
     )
+    file_error = None
     try:
         resolved_log_dir.mkdir(parents=True, exist_ok=True)
         file_handler = logging.handlers.RotatingFileHandler(
@@ -58,9 +194,22 @@ def setup_logging(log_level=None, log_dir=None):
             encoding="utf-8",
         )
         file_handler.setFormatter(formatter)
-        root.addHandler(file_handler)
+        handlers.append(file_handler)
     except OSError as e:
-        root.warning(f"Could not set up file logging in {resolved_log_dir}: {e}")
+        file_error = e
+
+    if queue_size > 0:
+        queue_handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+        root.addHandler(queue_handler)
+        _listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+        _listener.start()
+    else:
+        for handler in handlers:
+            handler._bestellsystem_handler = True
+            root.addHandler(handler)
+
+    if file_error is not None:
+        root.warning(f"Could not set up file logging in {resolved_log_dir}: {file_error}")
 
     # Quiet down noisy third-party loggers without hiding our own app logs
     logging.getLogger("werkzeug").setLevel(logging.WARNING)
@@ -0,0 +1,100 @@
+"""
+In-memory cache of menu.json for GET /menu.
+
+The menu is parsed once and kept together with its serialized UTF-8 JSON,
+a gzip-compressed copy and an ETag (hash of the JSON). `get()` only stats
+the file; the menu is reloaded when its mtime or size changes, so editing
+menu.json takes effect without a restart. A menu that fails to load keeps
+the last good one in place.
+
+Callbacks registered with `subscribe()` get the new menu after every
+reload (the printer station router rebuilds its item table this way).
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional
+
+from config import Config
+
+log = logging.getLogger(__name__)
+
+GZIP_LEVEL = 6
+
+
+class MenuSnapshot:
+    """One loaded version of the menu with its ready-to-send response bodies"""
+    __slots__ = ("menu", "body", "gzip_body", "etag", "file_key")
+
+    def __init__(self, menu: Dict[str, List[Dict[str, Any]]], file_key=None):
+        self.menu = menu
+        # Same key order as jsonify() used to produce, but UTF-8 instead of \u escapes
+        self.body = json.dumps(menu, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        self.gzip_body = gzip.compress(self.body, compresslevel=GZIP_LEVEL, mtime=0)
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+        self.file_key = file_key
+
+
+class MenuCache:
+    """Menu loaded from `path` (default Config.MENU_PATH), reloaded when the file changes"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or Config.MENU_PATH
+        self._snapshot: Optional[MenuSnapshot] = None
+        self._subscribers: List[Callable[[Dict[str, List[Dict[str, Any]]]], None]] = []
+        self._lock = Lock()
+
+    def subscribe(self, callback: Callable[[Dict[str, List[Dict[str, Any]]]], None]):
+        """Call `callback(menu)` whenever the menu is reloaded"""
+        self._subscribers.append(callback)
+
+    def _file_key(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self) -> MenuSnapshot:
+        """The current menu; reloads it first if menu.json changed"""
+        file_key = self._file_key()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.file_key == file_key:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.file_key == file_key:
+                return snapshot
+            return self._reload(file_key)
+
+    def _reload(self, file_key) -> MenuSnapshot:
+        previous = self._snapshot
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                menu = json.load(f)
+        except FileNotFoundError:
+            log.error(f"Menu file not found: {self.path}")
+            menu = None
+        except (OSError, json.JSONDecodeError) as e:
+            log.error(f"Error parsing menu JSON: {e}")
+            menu = None
+
+        if menu is None:
+            # Keep serving the last good menu; try again once the file changes
+            snapshot = MenuSnapshot(previous.menu if previous else {}, file_key)
+            self._snapshot = snapshot
+            return snapshot
+
+        snapshot = MenuSnapshot(menu, file_key)
+        self._snapshot = snapshot
+        log.info(f"Menu loaded: {sum(len(items) for items in menu.values())} item(s), ETag {snapshot.etag}")
+        if previous is not None and previous.etag != snapshot.etag:
+            for callback in self._subscribers:
+                try:
+                    callback(menu)
+                except Exception:
+                    log.exception("Error applying reloaded menu")
+        return snapshot
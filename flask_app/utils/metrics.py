@@ -0,0 +1,412 @@
+"""
+Prometheus-style metrics for the order and print pipeline, exported at
+/metrics in the text exposition format (version 0.0.4) without extra
+dependencies.
+
+Counters, gauges and histograms live in process memory behind one lock per
+metric, so instrumenting a hot path costs a dict update. Gauges that
+describe current state (e.g. print queue depth) are filled in by collect
+hooks right before they are read.
+
+Several worker processes: set METRICS_DIR. Every process then writes a
+snapshot of its metrics to METRICS_DIR/metrics_<pid>.json every
+METRICS_FLUSH_SECONDS, and /metrics, whichever process serves it, adds up
+its own live values and the other processes' snapshots. Counters and
+histograms of processes that exited are kept (their totals must not go
+backwards); gauges only count from snapshots younger than three flush
+intervals.
+
+Under gunicorn the master clears METRICS_DIR on start (clear_snapshots), so
+a new server doesn't add up the files of earlier runs. When a worker exits,
+the master folds its snapshot into metrics_retired.json and deletes it
+(retire_snapshot). Dead workers then don't pile up one file each, and a new
+process that gets a reused pid doesn't mix its counters into an old file.
+"""
+import bisect
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import Callable, Dict, List, Tuple
+
+log = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)] + list(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = Lock()
+
+    def _key(self, labels) -> Tuple[str, ...]:
+        try:
+            if len(labels) == len(self.labelnames):
+                return tuple([str(labels[name]) for name in self.labelnames])
+        except KeyError:
+            pass
+        raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+
+    def samples(self) -> Dict[Tuple[str, ...], object]:
+        """Copy of the current values keyed by label values"""
+        with self._lock:
+            return {key: self._copy(value) for key, value in self._values.items()}
+
+    @staticmethod
+    def _copy(value):
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    """Current value that can go up and down"""
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets, plus sum and count"""
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # Per-bucket (non-cumulative) counts incl. +Inf, sum, count
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @staticmethod
+    def _copy(value):
+        return [list(value[0]), value[1], value[2]]
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the with-block in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def timed(self, **labels):
+        """Decorator observing the duration of every call"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.time(**labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+
+class Registry:
+    """Set of metrics exported together; can merge snapshots of other processes"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._hooks: Dict[str, Callable[[], None]] = {}
+        self._lock = Lock()
+        self._flush_dir = None
+        self._flush_interval = None
+        self._stop_event = Event()
+        self._thread = None
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def on_collect(self, name: str, hook: Callable[[], None]):
+        """Run hook (e.g. setting gauges) before every export; a hook registered under the same name is replaced"""
+        with self._lock:
+            self._hooks[name] = hook
+
+    def collect(self):
+        """Run the collect hooks"""
+        with self._lock:
+            hooks = list(self._hooks.items())
+        for name, hook in hooks:
+            try:
+                hook()
+            except Exception:
+                log.exception(f"Error in metrics collect hook '{name}'")
+
+    def snapshot(self) -> Dict[str, dict]:
+        """JSON-serialisable copy of every metric (after running the collect hooks)"""
+        self.collect()
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            metric.name: {
+                "type": metric.type,
+                "samples": [[list(key), value] for key, value in metric.samples().items()],
+            }
+            for metric in metrics
+        }
+
+    # -- multi-process ------------------------------------------------------
+
+    def start_flusher(self, directory, interval: float = 5.0):
+        """Write this process' snapshot to `directory` every `interval` seconds"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._flush_dir = Path(directory)
+        self._flush_dir.mkdir(parents=True, exist_ok=True)
+        self._flush_interval = interval
+        self._stop_event.clear()
+        self._thread = Thread(target=self._run_flusher, daemon=True, name="metrics-flush")
+        self._thread.start()
+
+    def _run_flusher(self):
+        while not self._stop_event.wait(self._flush_interval):
+            self.flush()
+
+    def stop_flusher(self):
+        """Stop the flush thread after writing a final snapshot"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def _snapshot_path(self, pid=None) -> Path:
+        return self._flush_dir / f"metrics_{pid or os.getpid()}.json"
+
+    def flush(self):
+        """Write this process' snapshot atomically (no-op without a flush directory)"""
+        if self._flush_dir is None:
+            return
+        path = self._snapshot_path()
+        tmp = path.with_suffix(".tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"pid": os.getpid(), "time": time.time(), "metrics": self.snapshot()}, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            log.warning(f"Could not write metrics snapshot {path}: {e}")
+
+    def _other_snapshots(self) -> List[dict]:
+        if self._flush_dir is None:
+            return []
+        snapshots = []
+        own = self._snapshot_path().name
+        for path in self._flush_dir.glob("metrics_*.json"):
+            if path.name == own:
+                continue
+            try:
+                with open(path, encoding="utf-8") as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # being replaced right now or truncated; next scrape has it
+        return snapshots
+
+    # -- export -------------------------------------------------------------
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format, merged across worker processes"""
+        merged = self._merge(self.snapshot(), self._other_snapshots())
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for key, value in sorted(merged.get(metric.name, {}).items()):
+                if metric.type == "histogram":
+                    cumulative = 0
+                    for bound, count in zip(metric.buckets + (float("inf"),), value[0]):
+                        cumulative += count
+                        le = f'le="{_format_value(bound)}"'
+                        lines.append(f"{metric.name}_bucket{_format_labels(metric.labelnames, key, [le])} {cumulative}")
+                    lines.append(f"{metric.name}_sum{_format_labels(metric.labelnames, key)} {_format_value(value[1])}")
+                    lines.append(f"{metric.name}_count{_format_labels(metric.labelnames, key)} {value[2]}")
+                else:
+                    lines.append(f"{metric.name}{_format_labels(metric.labelnames, key)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _merge(self, own, others, gauge_max_age=None) -> Dict[str, Dict[Tuple[str, ...], object]]:
+        """Add up this process' live metrics and other processes' snapshots"""
+        if gauge_max_age is None:
+            gauge_max_age = 3 * (self._flush_interval or 0)
+        now = time.time()
+        merged: Dict[str, Dict[Tuple[str, ...], object]] = {}
+        for metrics, fresh in [(own, True)] + [
+            (snapshot.get("metrics", {}), now - snapshot.get("time", 0) <= gauge_max_age) for snapshot in others
+        ]:
+            for name, data in metrics.items():
+                if data["type"] == "gauge" and not fresh:
+                    continue
+                values = merged.setdefault(name, {})
+                for key, value in data["samples"]:
+                    key = tuple(key)
+                    if data["type"] == "histogram":
+                        if key not in values:
+                            values[key] = [list(value[0]), value[1], value[2]]
+                        elif len(values[key][0]) == len(value[0]):
+                            current = values[key]
+                            current[0] = [a + b for a, b in zip(current[0], value[0])]
+                            current[1] += value[1]
+                            current[2] += value[2]
+                    else:
+                        values[key] = values.get(key, 0.0) + value
+        return merged
+
+
+RETIRED_SNAPSHOT = "metrics_retired.json"
+
+
+def clear_snapshots(directory):
+    """Delete every snapshot in `directory`, before the worker processes of a new server start"""
+    for path in Path(directory).glob("metrics_*.json"):
+        path.unlink(missing_ok=True)
+
+
+def retire_snapshot(directory, pid):
+    """
+    Fold the last snapshot of exited process `pid` into metrics_retired.json
+    (counters and histograms only; its gauges are dead) and delete it.
+    Call this from one process only, e.g. the gunicorn master.
+    """
+    directory = Path(directory)
+    path = directory / f"metrics_{pid}.json"
+    retired_path = directory / RETIRED_SNAPSHOT
+    snapshots = []
+    for source in (retired_path, path):
+        try:
+            with open(source, encoding="utf-8") as f:
+                snapshots.append(json.load(f))
+        except FileNotFoundError:
+            continue
+        except (OSError, ValueError) as e:
+            log.warning(f"Could not read metrics snapshot {source}: {e}")
+    if not any(snapshot.get("pid") == pid for snapshot in snapshots):
+        return
+    types = {name: data["type"] for snapshot in snapshots for name, data in snapshot.get("metrics", {}).items()}
+    merged = Registry()._merge({}, snapshots, gauge_max_age=-1)
+    retired = {
+        "pid": None,
+        "time": 0,
+        "metrics": {
+            name: {"type": types[name], "samples": [[list(key), value] for key, value in samples.items()]}
+            for name, samples in merged.items()
+        },
+    }
+    tmp = retired_path.with_suffix(".tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(retired, f)
+        os.replace(tmp, retired_path)
+        path.unlink(missing_ok=True)
+    except OSError as e:
+        log.warning(f"Could not retire metrics snapshot {path}: {e}")
+
+
+REGISTRY = Registry()
+
+# Order ingest
+ORDERS_INGESTED = REGISTRY.counter(
+    "orders_ingested_total", "Orders accepted by process_order, by where they were stored (sqlite, journal)", ["storage"])
+
+ORDERS_THROTTLED = REGISTRY.counter(
+    "orders_throttled_total", "Orders hitting the print backlog threshold, by action (rejected, delayed)", ["action"])
+
+# Persistence
+DB_WRITE_SECONDS = REGISTRY.histogram(
+    "db_write_seconds", "Latency of OrderLogger write methods", ["method"])
+JOURNAL_FSYNC_SECONDS = REGISTRY.histogram(
+    "journal_fsync_seconds", "Latency of one order journal write + fsync (a group of records)")
+JOURNAL_RECORDS_REPLAYED = REGISTRY.counter(
+    "journal_records_replayed_total", "Order journal records replayed into the database")
+
+# Printing
+PRINT_QUEUE_DEPTH = REGISTRY.gauge(
+    "print_queue_depth", "Tickets queued in memory per printer station (print leader only)", ["station"])
+PRINT_QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "print_queue_wait_seconds", "Time from order to printed ticket", ["station", "priority"],
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0))
+PRINT_SESSION_SECONDS = REGISTRY.histogram(
+    "print_session_seconds", "Duration of one print session (connect, tickets, close) per printer", ["station"])
+TICKETS_PRINTED = REGISTRY.counter(
+    "tickets_printed_total", "Tickets sent to the printer", ["station"])
+PRINT_RETRIES = REGISTRY.counter(
+    "print_retries_total", "Tickets put back for another attempt, by reason", ["station", "reason"])
+PRINT_DEAD_LETTERED = REGISTRY.counter(
+    "print_dead_lettered_total", "Tickets moved to the dead-letter queue", ["station"])
+
+# Logging
+LOG_RECORDS_DROPPED = REGISTRY.counter(
+    "log_records_dropped_total", "Log records dropped because the log queue was full")
+
+# HTTP
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by endpoint (e.g. order.get_dashboard_orders_food), method and status",
+    ["endpoint", "method", "status"])
@@ -0,0 +1,469 @@
+"""
+ESC/POS Printer Emulator
+
+A local stand-in for the EPSON TM-T20II on TCP port 9100, for tests and
+benchmarks that must not depend on real hardware. It parses the ESC/POS
+byte stream that python-escpos sends into text lines and cut events, so
+every received ticket can be inspected, and it can simulate the failure
+modes we see at events:
+
+- connect_latency:  setup time per connection before data is read
+- print_latency:    time spent per ticket (feed + cut)
+- bandwidth:        max bytes/second read from the socket
+- refusing:         listening socket closed -> "connection refused"
+- disconnect_after_bytes: drop the connection mid-ticket
+- paper_out:        tickets are lost and status queries report paper end
+
+Like the real printer it serves one connection at a time.
+"""
+import argparse
+import codecs
+import logging
+import re
+import socket
+import struct
+import time
+from dataclasses import dataclass, field
+from threading import Condition, Event, Thread
+from typing import List, Optional
+
+logger = logging.getLogger("PrinterEmulator")
+
+ESC = 0x1B
+GS = 0x1D
+DLE = 0x10
+FS = 0x1C
+EOT = 0x04
+LF = 0x0A
+
+# Number of parameter bytes after "ESC <cmd>" / "GS <cmd>"; commands not
+# listed here are treated as having no parameters.
+_ESC_ARGS = {
+    b"!": 1, b"$": 2, b"-": 1, b"3": 1, b"E": 1, b"G": 1, b"J": 1, b"M": 1,
+    b"R": 1, b"V": 1, b"\\": 2, b"a": 1, b"c": 2, b"d": 1, b"e": 1, b"p": 3,
+    b"r": 1, b"t": 1, b"{": 1, b"U": 1, b" ": 1,
+}
+_GS_ARGS = {
+    b"!": 1, b"$": 2, b"/": 1, b"B": 1, b"H": 1, b"I": 1, b"L": 2, b"W": 2,
+    b"\\": 2, b"a": 1, b"b": 1, b"f": 1, b"h": 1, b"r": 1, b"w": 1,
+}
+_FS_ARGS = {b"!": 1, b"-": 1, b"C": 1, b"W": 1, b"p": 2}
+_FULL_CUTS = {0, 48, 65, 97, 103}
+_CUTS_WITH_FEED = {65, 66, 97, 98, 103, 104}
+
+# DLE EOT n replies (n = 1 printer, 2 offline cause, 3 error, 4 paper sensor)
+_STATUS_OK = {1: 0x16, 2: 0x12, 3: 0x12, 4: 0x12}
+_STATUS_PAPER_OUT = {1: 0x1E, 2: 0x32, 3: 0x12, 4: 0x72}
+
+_ORDER_ID_RE = re.compile(r"(?:Bestellnr:|ID:)\s*(\d+)")
+_TABLE_RE = re.compile(r"(?:Tisch Nr\.|TABLE:)\s*(\d+)")
+
+
+def _code_pages(profile_name: str):
+    """ESC t n -> Python codec name, from the python-escpos printer profile"""
+    pages = {0: "cp437"}
+    try:
+        from escpos.capabilities import get_profile
+        for name, number in get_profile(profile_name).get_code_pages().items():
+            try:
+                pages[int(number)] = codecs.lookup(name).name
+            except LookupError:
+                continue
+    except Exception:
+        logger.debug(f"Could not load code pages for profile {profile_name}", exc_info=True)
+    return pages
+
+
+@dataclass
+class ReceivedTicket:
+    """One ticket as it came off the emulated printer (text up to a cut)"""
+    lines: List[str]
+    cut: str = "full"
+    received_at: float = field(default_factory=time.time)
+    connection: int = 0
+    bytes: int = 0
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+    @property
+    def order_id(self) -> Optional[int]:
+        match = _ORDER_ID_RE.search(self.text)
+        return int(match.group(1)) if match else None
+
+    @property
+    def table_number(self) -> Optional[int]:
+        match = _TABLE_RE.search(self.text)
+        return int(match.group(1)) if match else None
+
+
+class EscPosParser:
+    """Incremental ESC/POS stream parser.
+
+    feed() returns a list of events:
+        ("cut", lines, cut_type, byte_count)
+        ("status", n)  -- a DLE EOT n real-time status request
+    Commands split across feed() calls are buffered until complete.
+    """
+
+    def __init__(self, profile: str = "TM-T20II"):
+        self.code_pages = _code_pages(profile)
+        self.encoding = "cp437"
+        self.lines: List[str] = []
+        # A line can switch code pages half-way (e.g. for the euro sign), so
+        # it is kept as already decoded parts plus the raw bytes since then
+        self._line_parts: List[str] = []
+        self._line_bytes = bytearray()
+        self._buffer = b""
+        self._ticket_bytes = 0
+
+    def partial_ticket(self) -> List[str]:
+        """Text received since the last cut (e.g. when the connection broke)"""
+        self._decode_pending()
+        current = "".join(self._line_parts)
+        return self.lines + ([current] if current else [])
+
+    def feed(self, data: bytes):
+        buf = self._buffer + data
+        events = []
+        i = 0
+        while i < len(buf):
+            parsed = self._parse_one(buf, i)
+            if parsed is None:
+                break  # incomplete command, wait for more bytes
+            consumed, event = parsed
+            i += consumed
+            self._ticket_bytes += consumed
+            if event is None:
+                continue
+            if event[0] == "cut":
+                events.append(("cut", self._take_lines(), event[1], self._ticket_bytes))
+                self._ticket_bytes = 0
+            else:
+                events.append(event)
+        self._buffer = buf[i:]
+        return events
+
+    def _decode_pending(self):
+        if self._line_bytes:
+            self._line_parts.append(bytes(self._line_bytes).decode(self.encoding, errors="replace"))
+            self._line_bytes.clear()
+
+    def _end_line(self):
+        self._decode_pending()
+        self.lines.append("".join(self._line_parts))
+        self._line_parts.clear()
+
+    def _take_lines(self):
+        lines = self.partial_ticket()
+        self.lines = []
+        self._line_parts.clear()
+        # Trailing blank lines are paper feed, not content
+        while lines and not lines[-1].strip():
+            lines.pop()
+        return lines
+
+    def _set_encoding(self, number):
+        encoding = self.code_pages.get(number, "cp437")
+        if encoding != self.encoding:
+            self._decode_pending()
+            self.encoding = encoding
+
+    @staticmethod
+    def _sized(buf, i, size):
+        """(size, None) if the whole command is buffered, else None"""
+        return None if i + size > len(buf) else (size, None)
+
+    def _parse_one(self, buf, i):
+        """Parse one byte or command at buf[i]; (consumed, event) or None if incomplete"""
+        byte = buf[i]
+
+        if byte == LF:
+            self._end_line()
+            return 1, None
+        if byte >= 0x20 or byte == 0x09:
+            self._line_bytes.append(byte)
+            return 1, None
+
+        if i + 1 >= len(buf) and byte in (ESC, GS, DLE, FS):
+            return None
+        cmd = buf[i + 1:i + 2]
+
+        if byte == ESC:
+            if cmd == b"@":
+                self._set_encoding(0)
+                return 2, None
+            if cmd == b"D":  # tab stops, NUL-terminated
+                end = buf.find(b"\x00", i + 2)
+                return None if end < 0 else (end - i + 1, None)
+            if cmd == b"*":  # bit image: m nL nH data
+                if i + 5 > len(buf):
+                    return None
+                width = buf[i + 3] + buf[i + 4] * 256
+                return self._sized(buf, i, 5 + width * (3 if buf[i + 2] in (32, 33) else 1))
+            size = 2 + _ESC_ARGS.get(cmd, 0)
+            if i + size > len(buf):
+                return None
+            if cmd == b"t":
+                self._set_encoding(buf[i + 2])
+            elif cmd == b"d":
+                for _ in range(buf[i + 2]):
+                    self._end_line()
+            return size, None
+
+        if byte == GS:
+            if cmd == b"V":
+                if i + 3 > len(buf):
+                    return None
+                mode = buf[i + 2]
+                size = 4 if mode in _CUTS_WITH_FEED else 3
+                if i + size > len(buf):
+                    return None
+                return size, ("cut", "full" if mode in _FULL_CUTS else "partial")
+            if cmd == b"v":  # raster image: GS v 0 m xL xH yL yH data
+                if i + 8 > len(buf):
+                    return None
+                x_l, x_h, y_l, y_h = buf[i + 4:i + 8]
+                return self._sized(buf, i, 8 + (x_l + x_h * 256) * (y_l + y_h * 256))
+            if cmd == b"(":  # GS ( fn pL pH data
+                if i + 5 > len(buf):
+                    return None
+                return self._sized(buf, i, 5 + buf[i + 3] + buf[i + 4] * 256)
+            if cmd == b"8":  # GS 8 L p1 p2 p3 p4 data
+                if i + 7 > len(buf):
+                    return None
+                return self._sized(buf, i, 7 + struct.unpack("<I", buf[i + 3:i + 7])[0])
+            if cmd == b"k":  # barcode: NUL-terminated for m <= 6, else length-prefixed
+                if i + 4 > len(buf):
+                    return None
+                if buf[i + 2] <= 6:
+                    end = buf.find(b"\x00", i + 3)
+                    return None if end < 0 else (end - i + 1, None)
+                return self._sized(buf, i, 4 + buf[i + 3])
+            if cmd == b"*":  # downloaded bit image: x y data
+                if i + 4 > len(buf):
+                    return None
+                return self._sized(buf, i, 4 + buf[i + 2] * buf[i + 3] * 8)
+            return self._sized(buf, i, 2 + _GS_ARGS.get(cmd, 0))
+
+        if byte == DLE:
+            if i + 3 > len(buf):
+                return None
+            if buf[i + 1] == EOT:
+                return 3, ("status", buf[i + 2])
+            if buf[i + 1] == 0x14:  # DLE DC4 fn m t
+                return self._sized(buf, i, 5)
+            return 3, None
+
+        if byte == FS:
+            return self._sized(buf, i, 2 + _FS_ARGS.get(cmd, 0))
+
+        # CR and other single control bytes carry no content
+        return 1, None
+
+
+class EscPosEmulator:
+    """Emulated network receipt printer; see the module docstring for fault knobs."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9100, profile: str = "TM-T20II",
+                 connect_latency: float = 0.0, print_latency: float = 0.0,
+                 bandwidth: Optional[int] = None, name: str = None):
+        self.host = host
+        self.port = port
+        self.profile = profile
+        self.connect_latency = connect_latency
+        self.print_latency = print_latency
+        self.bandwidth = bandwidth
+        self.name = name or "emulator"
+
+        self.paper_out = False
+        self.disconnect_after_bytes: Optional[int] = None
+
+        self.tickets: List[ReceivedTicket] = []
+        self.fragments: List[ReceivedTicket] = []  # tickets cut short by a broken connection
+        self.dropped_tickets = 0                   # tickets lost while out of paper
+        self.connections = 0
+
+        self._changed = Condition()
+        self._stop_event = Event()
+        self._listener: Optional[socket.socket] = None
+        self._thread: Optional[Thread] = None
+
+    @property
+    def address(self) -> str:
+        """"host:port" as accepted by services.Printer.Printer"""
+        return f"{self.host}:{self.port}"
+
+    @property
+    def refusing(self) -> bool:
+        return self._listener is None
+
+    def start(self) -> "EscPosEmulator":
+        self._stop_event.clear()
+        self._listen()
+        logger.info(f"ESC/POS emulator '{self.name}' listening on {self.address}")
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        self._close_listener()
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def set_refusing(self, refusing: bool):
+        """Close (or reopen) the listening socket so new connections are refused"""
+        if refusing and not self.refusing:
+            self._close_listener()
+            if self._thread:
+                self._thread.join(timeout=2)
+        elif not refusing and self.refusing:
+            self._listen()
+
+    def clear(self):
+        with self._changed:
+            self.tickets.clear()
+            self.fragments.clear()
+            self.dropped_tickets = 0
+            self.connections = 0
+
+    def wait_for_tickets(self, count: int, timeout: float = 5.0) -> bool:
+        """Block until at least `count` tickets have been printed"""
+        with self._changed:
+            return self._changed.wait_for(lambda: len(self.tickets) >= count, timeout)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _listen(self):
+        self._listener = socket.create_server((self.host, self.port))
+        self.port = self._listener.getsockname()[1]
+        self._thread = Thread(target=self._serve, args=(self._listener,), daemon=True,
+                              name=f"escpos-emulator-{self.port}")
+        self._thread.start()
+
+    def _close_listener(self):
+        listener, self._listener = self._listener, None
+        if listener:
+            # close() alone doesn't wake a thread blocked in accept() on Linux
+            try:
+                listener.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            listener.close()
+
+    def _serve(self, listener):
+        while not self._stop_event.is_set():
+            try:
+                conn, _ = listener.accept()
+            except OSError:
+                return  # listener closed (stop or refusing)
+            with conn:
+                self._handle(conn)
+
+    def _handle(self, conn):
+        with self._changed:
+            self.connections += 1
+            connection = self.connections
+        if self.connect_latency:
+            time.sleep(self.connect_latency)
+
+        parser = EscPosParser(self.profile)
+        conn.settimeout(0.5)
+        received = 0
+        chunk_size = min(4096, self.bandwidth) if self.bandwidth else 65536
+        while not self._stop_event.is_set():
+            try:
+                data = conn.recv(chunk_size)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if not data:
+                break
+
+            limit = self.disconnect_after_bytes
+            broken = limit is not None and received + len(data) > limit
+            if broken:
+                data = data[:max(limit - received, 0)]
+            received += len(data)
+            if self.bandwidth:
+                time.sleep(len(data) / self.bandwidth)
+
+            for event in parser.feed(data):
+                if event[0] == "cut":
+                    self._print(ReceivedTicket(lines=event[1], cut=event[2], connection=connection, bytes=event[3]))
+                elif event[0] == "status":
+                    table = _STATUS_PAPER_OUT if self.paper_out else _STATUS_OK
+                    try:
+                        conn.sendall(bytes([table.get(event[1], 0x12)]))
+                    except OSError:
+                        break
+
+            if broken:
+                # Reset instead of a clean FIN, like a printer losing power/Wi-Fi
+                conn.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+                logger.info(f"'{self.name}': dropped connection #{connection} after {received} bytes")
+                break
+
+        leftover = parser.partial_ticket()
+        if any(line.strip() for line in leftover):
+            with self._changed:
+                self.fragments.append(ReceivedTicket(lines=leftover, cut="none", connection=connection))
+                self._changed.notify_all()
+
+    def _print(self, ticket: ReceivedTicket):
+        if self.print_latency:
+            time.sleep(self.print_latency)
+        with self._changed:
+            if self.paper_out:
+                self.dropped_tickets += 1
+            else:
+                ticket.received_at = time.time()
+                self.tickets.append(ticket)
+            self._changed.notify_all()
+        logger.debug(f"'{self.name}': {'dropped (paper out)' if self.paper_out else 'printed'} ticket "
+                     f"order_id={ticket.order_id} ({ticket.bytes} bytes)")
+
+
+def main():
+    from utils.logging_config import setup_logging
+    setup_logging("INFO")
+
+    parser = argparse.ArgumentParser(description="ESC/POS network printer emulator (prints tickets to the log)")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=9100, help="TCP port, 0 for any free port (default: 9100)")
+    parser.add_argument("--connect-latency", type=float, default=0.0, help="Setup time per connection in seconds")
+    parser.add_argument("--print-latency", type=float, default=0.0, help="Time per printed ticket in seconds")
+    parser.add_argument("--bandwidth", type=int, default=None, help="Max bytes/second received")
+    parser.add_argument("--disconnect-after-bytes", type=int, default=None, help="Drop every connection after N bytes")
+    parser.add_argument("--paper-out", action="store_true", help="Start without paper")
+    args = parser.parse_args()
+
+    emulator = EscPosEmulator(
+        host=args.host, port=args.port,
+        connect_latency=args.connect_latency, print_latency=args.print_latency,
+        bandwidth=args.bandwidth,
+    )
+    emulator.disconnect_after_bytes = args.disconnect_after_bytes
+    emulator.paper_out = args.paper_out
+    emulator.start()
+
+    printed = 0
+    try:
+        while True:
+            emulator.wait_for_tickets(printed + 1, timeout=1.0)
+            for ticket in emulator.tickets[printed:]:
+                logger.info(f"Ticket #{printed + 1} ({ticket.cut} cut, {ticket.bytes} bytes):\n{ticket.text}")
+                printed += 1
+    except KeyboardInterrupt:
+        logger.info("Printer emulator stopped by user.")
+    finally:
+        emulator.stop()
+
+
+if __name__ == "__main__":
+    main()
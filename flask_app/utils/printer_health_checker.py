@@ -1,15 +1,25 @@
 """
 Printer Health Checker & Monitor
 
-Cyclically checks printer connectivity for both food and drink printers.
-Supports testing real hardware over TCP port 9100.
+Cyclically checks printer connectivity for the food and drink printers (or
+any set of named printers). Supports testing real hardware over TCP port 9100.
+
+Inside the app the monitor runs as a background thread (see start()) and
+keeps the latest result of every probe in memory, so status endpoints read a
+cached snapshot instead of opening sockets on the request thread.
 """
+import sys
+import json
 import time
 import socket
 import logging
 import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Lock, Thread
 from typing import Dict, Any
 from config import Config
+from services.Printer import split_address
 
 # No module-level basicConfig() here: when imported by the Flask app or tests
 # this module must use the centrally configured root logger (see
@@ -47,64 +57,182 @@ def check_printer_socket(ip: str, port: int = 9100, timeout: float = 1.5) -> Dic
         }
 
 
+# Upper bounds (ms) of the connect-latency histogram buckets; slower
+# successful probes land in the "+Inf" bucket
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 1500)
+DEFAULT_WINDOWS_SECONDS = (60, 900, 3600)
+
+PRINTER_LABELS = {
+    "food_printer": "Speisen-Drucker",
+    "drinks_printer": "Getränke-Drucker",
+}
+
+
+def summarize_samples(samples, buckets_ms=LATENCY_BUCKETS_MS) -> Dict[str, Any]:
+    """Availability and connect-latency histogram for (timestamp, reachable, latency_ms) samples."""
+    latencies = sorted(latency for _, reachable, latency in samples if reachable and latency is not None)
+    counts = [0] * (len(buckets_ms) + 1)
+    for latency in latencies:
+        index = next((i for i, bound in enumerate(buckets_ms) if latency <= bound), len(buckets_ms))
+        counts[index] += 1
+
+    def quantile(q):
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    up = sum(1 for _, reachable, _ in samples if reachable)
+    return {
+        "samples": len(samples),
+        "availability_pct": round(100.0 * up / len(samples), 2) if samples else None,
+        "latency_ms": {
+            "p50": quantile(0.50),
+            "p95": quantile(0.95),
+            "max": latencies[-1] if latencies else None,
+            "histogram": {
+                **{f"le_{bound}": count for bound, count in zip(buckets_ms, counts)},
+                "le_inf": counts[-1],
+            },
+        },
+    }
+
+
 class PrinterHealthMonitor:
-    """Monitors configured printers in a loop and logs status changes."""
+    """Monitors configured printers in a loop and logs status changes.
+
+    Probes any number of printers concurrently. Besides the latest status it
+    keeps every probe result for the longest configured window, so stats()
+    can report availability and connect-latency histograms per window — a
+    slow Wi-Fi printer shows up there before it starts dropping tickets.
+    """
 
-    def __init__(self, food_ip: str = None, drinks_ip: str = None):
+    def __init__(self, food_ip: str = None, drinks_ip: str = None,
+                 printers: Dict[str, str] = None, windows=DEFAULT_WINDOWS_SECONDS):
         self.food_ip = food_ip or Config.FOOD_PRINTER_IP
         self.drinks_ip = drinks_ip or Config.DRINKS_PRINTER_IP
-        self.last_state = {
-            "food": None,
-            "drinks": None
+        # name -> "host[:port]"; defaults to the food and drinks printers
+        self.printers = dict(printers) if printers else {
+            "food_printer": self.food_ip,
+            "drinks_printer": self.drinks_ip,
         }
+        self.windows = tuple(sorted(windows))
+        self.last_state = {name: None for name in self.printers}
+        # Latest probe result per printer; replaced as a whole after every
+        # round so readers never see a half-updated snapshot
+        self._status: Dict[str, Any] = {}
+        self._history = {name: deque() for name in self.printers}
+        self._history_lock = Lock()
+        self._executor = ThreadPoolExecutor(max_workers=min(32, max(1, len(self.printers))),
+                                            thread_name_prefix="printer-probe")
+        self._stop_event = Event()
+        self._thread = None
+
+    def _probe(self, ip: str) -> Dict[str, Any]:
+        host, port = split_address(ip)
+        return check_printer_socket(host, port)
 
     def check_all(self) -> Dict[str, Any]:
-        """Check both printers and return current health status dict."""
-        food_res = check_printer_socket(self.food_ip)
-        drinks_res = check_printer_socket(self.drinks_ip)
-
-        current = {
-            "food_printer": {
-                "ip": self.food_ip,
-                **food_res
-            },
-            "drinks_printer": {
-                "ip": self.drinks_ip,
-                **drinks_res
-            }
-        }
+        """Check all printers concurrently and return current health status dict."""
+        results = dict(zip(self.printers, self._executor.map(self._probe, self.printers.values())))
+        now = time.time()
 
-        # Log status changes
-        if self.last_state["food"] != food_res["reachable"]:
-            status_str = "ONLINE 🟢" if food_res["reachable"] else "OFFLINE 🔴"
-            logger.info(f"Speisen-Drucker ({self.food_ip}) status changed -> {status_str} ({food_res['latency_ms'] or food_res['error']})")
-            self.last_state["food"] = food_res["reachable"]
+        current = {}
+        for name, ip in self.printers.items():
+            res = results[name]
+            previous = self._status.get(name)
+            changed = previous is None or previous["reachable"] != res["reachable"]
+            current[name] = {
+                "ip": ip,
+                **res,
+                "checked_at": now,
+                "last_change": now if changed else previous["last_change"],
+            }
 
-        if self.last_state["drinks"] != drinks_res["reachable"]:
-            status_str = "ONLINE 🟢" if drinks_res["reachable"] else "OFFLINE 🔴"
-            logger.info(f"Getränke-Drucker ({self.drinks_ip}) status changed -> {status_str} ({drinks_res['latency_ms'] or drinks_res['error']})")
-            self.last_state["drinks"] = drinks_res["reachable"]
+            # Log status changes
+            if self.last_state[name] != res["reachable"]:
+                status_str = "ONLINE 🟢" if res["reachable"] else "OFFLINE 🔴"
+                logger.info(f"{PRINTER_LABELS.get(name, name)} ({ip}) status changed -> {status_str} ({res['latency_ms'] or res['error']})")
+                self.last_state[name] = res["reachable"]
 
+        self._record(now, current)
+        self._status = current
         return current
 
-    def run_loop(self, interval_seconds: float = 10.0, max_ticks: int = None):
-        """Runs the monitoring loop every interval_seconds."""
+    def _record(self, now: float, current: Dict[str, Any]):
+        horizon = now - self.windows[-1] if self.windows else now
+        with self._history_lock:
+            for name, res in current.items():
+                history = self._history[name]
+                history.append((now, res["reachable"], res["latency_ms"]))
+                while history and history[0][0] < horizon:
+                    history.popleft()
+
+    def status(self) -> Dict[str, Any]:
+        """Latest cached status per printer (empty until the first probe round finished)."""
+        return self._status
+
+    def stats(self) -> Dict[str, Any]:
+        """Availability and latency histogram per printer for every window, keyed like "60s"."""
+        now = time.time()
+        with self._history_lock:
+            histories = {name: list(history) for name, history in self._history.items()}
+
+        result = {}
+        for name, history in histories.items():
+            result[name] = {
+                "ip": self.printers[name],
+                "current": self._status.get(name),
+                "windows": {
+                    f"{int(window)}s": summarize_samples([s for s in history if s[0] >= now - window])
+                    for window in self.windows
+                },
+            }
+        return result
+
+    def start(self, interval_seconds: float = 5.0):
+        """Probe in a background thread every interval_seconds until stop() is called."""
+        self._stop_event.clear()
+        self._thread = Thread(target=self._run, args=(interval_seconds,), daemon=True, name="printer-health")
+        self._thread.start()
+
+    def _run(self, interval_seconds: float):
+        while not self._stop_event.is_set():
+            try:
+                self.check_all()
+            except Exception:
+                logger.exception("Error while probing printers")
+            self._stop_event.wait(interval_seconds)
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def run_loop(self, interval_seconds: float = 10.0, max_ticks: int = None, as_json: bool = False):
+        """Runs the monitoring loop every interval_seconds.
+
+        With as_json, every tick writes one JSON line (status + stats) to stdout
+        instead of the human-readable log line.
+        """
         logger.info(f"Starting Printer Health Monitor (Interval: {interval_seconds}s)")
-        logger.info(f"Monitoring Food Printer IP: {self.food_ip}")
-        logger.info(f"Monitoring Drinks Printer IP: {self.drinks_ip}")
+        for name, ip in self.printers.items():
+            logger.info(f"Monitoring {PRINTER_LABELS.get(name, name)} IP: {ip}")
 
         tick = 0
         try:
             while max_ticks is None or tick < max_ticks:
                 status = self.check_all()
-                food_st = "🟢 OK" if status["food_printer"]["reachable"] else "🔴 FAIL"
-                drinks_st = "🟢 OK" if status["drinks_printer"]["reachable"] else "🔴 FAIL"
-                
-                food_lat = f"{status['food_printer']['latency_ms']}ms" if status["food_printer"]["reachable"] else status["food_printer"]["error"]
-                drinks_lat = f"{status['drinks_printer']['latency_ms']}ms" if status["drinks_printer"]["reachable"] else status["drinks_printer"]["error"]
-
-                logger.info(f"[Tick #{tick+1}] Speisen: {food_st} ({food_lat}) | Getränke: {drinks_st} ({drinks_lat})")
-                
+                if as_json:
+                    sys.stdout.write(json.dumps({"tick": tick + 1, "printers": self.stats()}) + "\n")
+                    sys.stdout.flush()
+                else:
+                    parts = []
+                    for name, res in status.items():
+                        state = "🟢 OK" if res["reachable"] else "🔴 FAIL"
+                        latency = f"{res['latency_ms']}ms" if res["reachable"] else res["error"]
+                        parts.append(f"{PRINTER_LABELS.get(name, name)}: {state} ({latency})")
+                    logger.info(f"[Tick #{tick+1}] " + " | ".join(parts))
+
                 tick += 1
                 time.sleep(interval_seconds)
         except KeyboardInterrupt:
@@ -113,17 +241,26 @@ class PrinterHealthMonitor:
 
 def main():
     from utils.logging_config import setup_logging
-    setup_logging(Config.LOG_LEVEL, Config.LOG_DIR)
+    setup_logging(Config.LOG_LEVEL, Config.LOG_DIR, Config.LOG_JSON, Config.LOG_QUEUE_SIZE)
 
     parser = argparse.ArgumentParser(description="Cyclic Printer Health Checker for Real Hardware")
     parser.add_argument("--interval", type=float, default=10.0, help="Check interval in seconds (default: 10)")
     parser.add_argument("--food-ip", type=str, default=None, help="Override Food Printer IP")
     parser.add_argument("--drinks-ip", type=str, default=None, help="Override Drinks Printer IP")
+    parser.add_argument("--printer", action="append", default=[], metavar="NAME=HOST[:PORT]",
+                        help="Monitor this printer instead of food/drinks (repeatable)")
+    parser.add_argument("--windows", type=str, default=None,
+                        help="Comma-separated stats windows in seconds (default: 60,900,3600)")
     parser.add_argument("--ticks", type=int, default=None, help="Max check ticks (default: infinite)")
+    parser.add_argument("--json", action="store_true", help="Print one JSON line with status and histograms per tick")
     args = parser.parse_args()
 
-    monitor = PrinterHealthMonitor(food_ip=args.food_ip, drinks_ip=args.drinks_ip)
-    monitor.run_loop(interval_seconds=args.interval, max_ticks=args.ticks)
+    printers = dict(entry.split("=", 1) for entry in args.printer) or None
+    windows = tuple(float(w) for w in args.windows.split(",")) if args.windows else DEFAULT_WINDOWS_SECONDS
+
+    monitor = PrinterHealthMonitor(food_ip=args.food_ip, drinks_ip=args.drinks_ip,
+                                   printers=printers, windows=windows)
+    monitor.run_loop(interval_seconds=args.interval, max_ticks=args.ticks, as_json=args.json)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,83 @@
+"""
+On-demand sampling profiler over every thread of the process.
+
+`sample_stacks()` runs in the calling thread (the admin request), grabs
+`sys._current_frames()` `hz` times a second for `seconds` seconds and
+counts identical stacks. Request threads, print workers, the asyncio
+dispatcher, the health monitor etc. are all covered; the profiling thread
+leaves itself out. Nothing runs or is hooked while no profile is being
+taken, so it costs nothing when inactive.
+
+The result renders in the collapsed-stack format read by flamegraph.pl,
+speedscope and similar tools, one line per distinct stack, root first:
+
+    thread:print-food;threading.py:Thread._bootstrap;...;Printer.py:Printer.print_orders 42
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from threading import Lock
+from typing import Optional
+
+_busy = Lock()
+
+
+class ProfilerBusy(Exception):
+    """Another profile is already being taken"""
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_qualname}".replace(";", ",")
+
+
+def _stack(frame, thread_name: str) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.append(f"thread:{thread_name}".replace(";", ","))
+    return ";".join(reversed(labels))
+
+
+def sample_stacks(seconds: float, hz: float = 100.0, thread_filter: Optional[str] = None) -> Counter:
+    """
+    Sample all threads' stacks for `seconds` at `hz` samples per second.
+
+    thread_filter keeps only threads whose name contains it (e.g. "print").
+    Returns a Counter of collapsed stacks. Raises ProfilerBusy if another
+    profile is running.
+    """
+    if not _busy.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already being taken")
+    try:
+        own = threading.get_ident()
+        interval = 1.0 / hz
+        stacks = Counter()
+        deadline = time.perf_counter() + seconds
+        next_sample = time.perf_counter()
+        while next_sample < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            frames = sys._current_frames()
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                name = names.get(ident, f"thread-{ident}")
+                if thread_filter and thread_filter not in name:
+                    continue
+                stacks[_stack(frame, name)] += 1
+            del frames  # don't keep other threads' frames alive between samples
+            next_sample += interval
+            delay = next_sample - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return stacks
+    finally:
+        _busy.release()
+
+
+def collapse(stacks: Counter) -> str:
+    """Collapsed-stack text, most frequent stacks first"""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
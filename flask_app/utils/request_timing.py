@@ -0,0 +1,140 @@
+"""
+Per-route request timing for the Flask app.
+
+`init_app(app)` (called from main.create_app) measures every request's wall
+time and the time it spent in the database, keyed by route endpoint (e.g.
+`order.place_order`, `menu.get_menu`). It then:
+
+- adds a `Server-Timing` header (`app` and `db` durations, the SQL statement
+  count in the `db` description), shown in the browser dev tools,
+- keeps the last ROUTE_TIMING_SAMPLES wall/DB times per route in memory for
+  rolling percentiles (`/admin/timing`),
+- logs requests slower than SLOW_REQUEST_MS with their SQL statement count.
+
+DB time is accumulated by OrderLogger.get_connection() through `track_db()`
+while a request is being timed. Print workers and other background threads
+have no request and are not tracked.
+"""
+import logging
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any, Dict
+
+from flask import g, request
+
+from config import Config
+
+log = logging.getLogger(__name__)
+
+_current: ContextVar = ContextVar("request_timing", default=None)
+
+
+class RequestTiming:
+    """DB time and statement count of the request being handled"""
+    __slots__ = ("start", "db_seconds", "statements")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.db_seconds = 0.0
+        self.statements = 0
+
+    def count_statement(self, statement):
+        self.statements += 1
+
+
+@contextmanager
+def track_db(conn):
+    """Add the time spent in this block and the statements run on `conn` to the current request, if any"""
+    timing = _current.get()
+    if timing is None:
+        yield conn
+        return
+    conn.set_trace_callback(timing.count_statement)
+    start = time.perf_counter()
+    try:
+        yield conn
+    finally:
+        timing.db_seconds += time.perf_counter() - start
+        conn.set_trace_callback(None)
+
+
+def summarize(samples) -> Dict[str, Any]:
+    """count/p50/p95/p99/max (nearest-rank) of millisecond samples"""
+    if not samples:
+        return {"count": 0, "p50": None, "p95": None, "p99": None, "max": None}
+    ordered = sorted(samples)
+
+    def rank(p):
+        return round(ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)], 2)
+
+    return {"count": len(ordered), "p50": rank(50), "p95": rank(95), "p99": rank(99), "max": round(ordered[-1], 2)}
+
+
+class RouteTimings:
+    """Rolling wall/DB times in milliseconds per route endpoint"""
+
+    def __init__(self, samples: int = 1000):
+        self.samples = samples
+        self._routes: Dict[str, Dict[str, deque]] = {}
+        self._lock = Lock()
+
+    def record(self, endpoint: str, wall_ms: float, db_ms: float):
+        with self._lock:
+            route = self._routes.get(endpoint)
+            if route is None:
+                route = self._routes[endpoint] = {
+                    "wall_ms": deque(maxlen=self.samples), "db_ms": deque(maxlen=self.samples)
+                }
+            route["wall_ms"].append(wall_ms)
+            route["db_ms"].append(db_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        """Percentiles per endpoint, the blueprint being the part before the dot"""
+        with self._lock:
+            routes = {endpoint: {key: list(values) for key, values in route.items()}
+                      for endpoint, route in self._routes.items()}
+        return {
+            endpoint: {
+                "blueprint": endpoint.split(".", 1)[0] if "." in endpoint else None,
+                "wall_ms": summarize(route["wall_ms"]),
+                "db_ms": summarize(route["db_ms"]),
+            }
+            for endpoint, route in sorted(routes.items())
+        }
+
+
+def init_app(app):
+    """Time every request of `app`; stats end up in app.route_timings"""
+    app.route_timings = RouteTimings(Config.ROUTE_TIMING_SAMPLES)
+
+    @app.before_request
+    def start_timing():
+        timing = RequestTiming()
+        g.request_timing = timing
+        g.request_timing_token = _current.set(timing)
+
+    @app.after_request
+    def finish_timing(response):
+        timing = g.pop("request_timing", None)
+        if timing is None:
+            return response
+        _current.reset(g.pop("request_timing_token"))
+        wall_ms = (time.perf_counter() - timing.start) * 1000
+        db_ms = timing.db_seconds * 1000
+        endpoint = request.endpoint or "unmatched"
+
+        app.route_timings.record(endpoint, wall_ms, db_ms)
+        response.headers.add(
+            "Server-Timing",
+            f'app;dur={wall_ms:.1f}, db;dur={db_ms:.1f};desc="{timing.statements} SQL statement(s)"',
+        )
+        if wall_ms >= Config.SLOW_REQUEST_MS:
+            log.warning(
+                f"Slow request {request.method} {request.path} ({endpoint}): {wall_ms:.1f} ms, "
+                f"DB {db_ms:.1f} ms in {timing.statements} SQL statement(s), status {response.status_code}"
+            )
+        return response
@@ -0,0 +1,28 @@
+"""
+WSGI entry point for production servers (gunicorn -c gunicorn.conf.py).
+
+The app is built once per worker process, not at import. create_app()
+starts the print, journal and metrics threads, and threads don't survive the
+fork of a preloaded gunicorn master, so the master only imports this module.
+gunicorn.conf.py calls init() in each worker as soon as it has booted. Other
+WSGI servers get the app built on the first request.
+"""
+from threading import Lock
+
+from main import create_app
+
+app = None
+_lock = Lock()
+
+
+def init():
+    """Build this process' app (once) and return it"""
+    global app
+    with _lock:
+        if app is None:
+            app = create_app()
+    return app
+
+
+def application(environ, start_response):
+    return (app or init())(environ, start_response)
@@ -11,7 +11,7 @@ function Dashboard({ type = 'food' }) {
         try {
             // Backend endpoints use 'food' and 'drinks' (plural for drinks)
             const endpointType = type === 'drink' ? 'drinks' : type;
-            const response = await axios.get(`/api/orders/dashboard/${endpointType}`);
+            const response = await axios.get(`/api/orders/dashboard/${endpointType}?compact=1`);
             // Filter already happens server-side; keep only what matches this dashboard's type
             const processedKey = type === 'drink' ? 'drink_processed' : 'food_processed';
             const validOrders = response.data.orders?.filter(order =>